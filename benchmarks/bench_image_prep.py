@@ -0,0 +1,78 @@
+"""
+Benchmark: PDF size and render time with and without print-resolution
+photo derivatives.
+
+Usage:
+    python -m benchmarks.bench_image_prep [--cards 20] [--photos-per-card 3] [--dpi 200] [--quality 80]
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.image_prep import ImagePrepOptions, prepare_entries
+from src.pdf_generator import generate_pdf
+
+
+def make_photo(path, seed, size=(4032, 3024)):
+    """Photo synthétique (dégradé + bruit) qui se compresse comme une vraie photo"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    base = np.stack(np.broadcast_arrays((x + y) / 2, np.abs(x - y), 255 - x), axis=-1)
+    noisy = np.clip(base + rng.normal(0, 6, base.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(noisy).save(path, 'JPEG', quality=92)
+
+
+def build_entries(photo_dir, cards, photos_per_card):
+    entries = []
+    for i in range(cards):
+        images = []
+        for p in range(photos_per_card):
+            path = os.path.join(photo_dir, f"{i:03d}_{p}.jpg")
+            make_photo(path, seed=i * 10 + p)
+            images.append({"url": f"https://cdn.example.com/{i}_{p}.jpg", "local_path": path})
+        entries.append({"full_date": f"Mar {i % 28 + 1}th 25", "day_count": f"Day {i + 1}", "plant_state": None,
+                        "stage_change": "", "actions": ["Water"], "images": images, "tree_logs": {}})
+    return entries
+
+
+def render(entries, output_dir, filename, image_options=None):
+    start = time.perf_counter()
+    path = generate_pdf("Benchmark", copy.deepcopy(entries), {"strain": {"name": "Bench"}, "environment": {"Type": "Indoor"}},
+                        output_dir=output_dir, filename=filename, image_options=image_options)
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+def run(cards, photos_per_card, dpi, quality):
+    with tempfile.TemporaryDirectory() as tmp:
+        entries = build_entries(tmp, cards, photos_per_card)
+        options = ImagePrepOptions(dpi=dpi, quality=quality, cache_dir=os.path.join(tmp, "derived"))
+
+        stats = prepare_entries(copy.deepcopy(entries), options)
+        print(f"{stats['images']} photos: {stats['bytes_before'] / 1e6:.1f} MB -> {stats['bytes_after'] / 1e6:.1f} MB "
+              f"({stats['bytes_before'] / max(stats['bytes_after'], 1):.1f}x smaller), prepared in {stats['seconds']:.2f}s "
+              f"(target {options.target_size[0]}x{options.target_size[1]} px)")
+        cached = prepare_entries(copy.deepcopy(entries), options)
+        print(f"second pass (cached derivatives): {cached['seconds']:.3f}s")
+
+        original_time, original_size = render(entries, tmp, "original.pdf")
+        prepared_time, prepared_size = render(entries, tmp, "prepared.pdf", image_options=options)
+        print(f"{'':>10} {'render s':>9} {'PDF MB':>8}")
+        print(f"{'original':>10} {original_time:>9.2f} {original_size / 1e6:>8.2f}")
+        print(f"{'prepared':>10} {prepared_time:>9.2f} {prepared_size / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=20)
+    parser.add_argument('--photos-per-card', type=int, default=3)
+    parser.add_argument('--dpi', type=int, default=200)
+    parser.add_argument('--quality', type=int, default=80)
+    args = parser.parse_args()
+    run(args.cards, args.photos_per_card, args.dpi, args.quality)
@@ -0,0 +1,189 @@
+"""
+Benchmark suite: each `_extract_*` parser, the `/generate` data mapping
+(`growlog_to_report`), `generate_pdf` and the video pipeline on synthetic
+growlogs of increasing size. Results are written as JSON; pass a previous
+result file with `--compare` to print the ratio of every timing.
+
+Usage:
+    python -m benchmarks.bench_suite [--cards 10 100 1000] [--only extract mapping pdf video]
+                                     [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.bench_image_prep import make_photo
+from benchmarks.fixtures import generate_growlog_html
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.image_prep import ImagePrepOptions
+from src.pdf_generator import generate_pdf, growlog_to_report
+from src.testid_index import DataTestIdIndex, make_soup
+from src.video_generator import generate_video
+
+GROUPS = ("extract", "mapping", "pdf", "video")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Extracteurs par portée : page entière, carte de timeline, changement de stade
+PAGE_EXTRACTORS = ("_extract_title", "_extract_strain", "_extract_growing_stage", "_extract_environment",
+                   "_extract_medium", "_extract_stages", "_extract_photos", "_extract_timeline")
+CARD_EXTRACTORS = ("_extract_date", "_extract_actions", "_extract_event_photos", "_extract_tree_logs")
+STAGE_CHANGE_EXTRACTORS = ("_extract_stage_change_date", "_extract_stage_change_day_count",
+                           "_extract_stage_change_text", "_extract_stage_change_state")
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_extract(html, repeat):
+    scraper = GrowWithJaneScraper()
+    results = {"make_soup": best_of(repeat, lambda: make_soup(html))}
+    soup = make_soup(html)
+    results["index_build"] = best_of(repeat, lambda: DataTestIdIndex.build(soup))
+    index = DataTestIdIndex.build(soup)
+    cards = [index.scope(card) for card in index.all('growlog-page-timeline-card', 'div')]
+    stage_changes = [index.scope(sc) for sc in index.all('growlog-page-timeline-stage-change', 'div')]
+
+    for name in PAGE_EXTRACTORS:
+        extractor = getattr(scraper, name)
+        results[name] = best_of(repeat, lambda: extractor(index))
+    # Extracteurs appelés une fois par élément : temps cumulé sur tout le growlog
+    for names, scopes in ((CARD_EXTRACTORS, cards), (STAGE_CHANGE_EXTRACTORS, stage_changes)):
+        for name in names:
+            extractor = getattr(scraper, name)
+            results[name] = best_of(repeat, lambda: [extractor(scope) for scope in scopes])
+    results["parse_growlog"] = best_of(repeat, lambda: scraper._parse_growlog(soup, 'bench'))
+    return results
+
+
+def build_growlog_data(html, photo_dir, distinct_photos, photo_size):
+    """
+    Données scrapées du growlog synthétique, photos téléchargées comprises.
+    Les photos reprennent en boucle `distinct_photos` fichiers JPEG distincts.
+    """
+    growlog_data, card_photo_urls, main_photo_urls = GrowWithJaneScraper()._parse_growlog(make_soup(html), 'bench')
+    pool = []
+    for i in range(distinct_photos):
+        path = os.path.join(photo_dir, f"{i:04d}.jpg")
+        if not os.path.exists(path):
+            make_photo(path, seed=i, size=photo_size)
+        pool.append(path)
+    n = 0
+    for event, urls in zip(growlog_data["timeline"], card_photo_urls):
+        event["photos"] = []
+        for url in urls:
+            event["photos"].append({"url": url, "local_path": pool[n % len(pool)]})
+            n += 1
+    growlog_data["photos"] = [{"url": url, "local_path": pool[0]} for url in main_photo_urls]
+    return growlog_data
+
+
+def bench_mapping(growlog_data, repeat):
+    return {"growlog_to_report": best_of(repeat, lambda: growlog_to_report(growlog_data))}
+
+
+def bench_pdf(growlog_data, work_dir):
+    title, entries, metadata = growlog_to_report(copy.deepcopy(growlog_data))
+    options = ImagePrepOptions(cache_dir=os.path.join(work_dir, "derived"))
+    start = time.perf_counter()
+    pdf_path = generate_pdf(title, entries, metadata, output_dir=work_dir, filename="growlog.pdf",
+                            image_options=options)
+    return {"generate_pdf": time.perf_counter() - start}, pdf_path
+
+
+def bench_video(pdf_path, work_dir, profile):
+    start = time.perf_counter()
+    generate_video(pdf_path, "growlog.mp4", keep_frames=False, profile=profile, output_dir=work_dir)
+    return {"generate_video": time.perf_counter() - start}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(cards_list, groups, repeat, photos_per_card, stage_changes, distinct_photos, photo_size, profile):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        photo_dir = os.path.join(tmp, "photos")
+        os.makedirs(photo_dir)
+        for cards in cards_list:
+            html = generate_growlog_html(cards=cards, photos_per_card=photos_per_card, stage_changes=stage_changes)
+            timings = {}
+            if "extract" in groups:
+                timings.update({f"extract.{k}": v for k, v in bench_extract(html, repeat).items()})
+            if groups & {"mapping", "pdf", "video"}:
+                growlog_data = build_growlog_data(html, photo_dir, distinct_photos, photo_size)
+            if "mapping" in groups:
+                timings.update({f"mapping.{k}": v for k, v in bench_mapping(growlog_data, repeat).items()})
+            if groups & {"pdf", "video"}:
+                work_dir = os.path.join(tmp, f"cards_{cards}")
+                os.makedirs(work_dir)
+                pdf_timings, pdf_path = bench_pdf(growlog_data, work_dir)
+                if "pdf" in groups:
+                    timings.update({f"pdf.{k}": v for k, v in pdf_timings.items()})
+                if "video" in groups:
+                    timings.update({f"video.{k}": v for k, v in bench_video(pdf_path, work_dir, profile).items()})
+            for name, seconds in timings.items():
+                results.append({"cards": cards, "benchmark": name, "seconds": seconds})
+                print(f"{cards:>6} {name:<45} {seconds:>10.4f}")
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r["cards"], r["benchmark"]): r["seconds"] for r in json.load(f)["results"]}
+    print(f"\n{'cards':>6} {'benchmark':<45} {'baseline s':>10} {'current s':>10} {'ratio':>7}")
+    for r in results:
+        before = baseline.get((r["cards"], r["benchmark"]))
+        if before:
+            print(f"{r['cards']:>6} {r['benchmark']:<45} {before:>10.4f} {r['seconds']:>10.4f} "
+                  f"{r['seconds'] / before:>6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=3, help="best of N for the parsing and mapping timings")
+    parser.add_argument('--photos-per-card', type=int, default=3)
+    parser.add_argument('--stage-changes', type=int, default=4)
+    parser.add_argument('--distinct-photos', type=int, default=50, help="photo files reused across cards")
+    parser.add_argument('--photo-size', default="1600x1200")
+    parser.add_argument('--profile', default="720p", help="video profile")
+    parser.add_argument('--output', help="JSON results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', help="previous JSON results file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.photo_size.lower().split('x'))
+    env = environment()
+    results = run(args.cards, set(args.only), args.repeat, args.photos_per_card, args.stage_changes,
+                  args.distinct_photos, (width, height), args.profile)
+    output = args.output or os.path.join(RESULTS_DIR, f"{env['timestamp'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"environment": env, "parameters": vars(args), "results": results}, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,48 @@
+"""
+Benchmark: single-pass data-testid index vs repeated soup searches.
+
+Usage:
+    python -m benchmarks.bench_testid_index [--cards 100 1000] [--repeat 3]
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import generate_growlog_html
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.testid_index import HTML_PARSER, DataTestIdIndex, SoupLookup
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(cards_list, repeat):
+    scraper = GrowWithJaneScraper()
+    print(f"{'cards':>6} {'parser':>12} {'parse s':>9} {'soup extract s':>15} {'index extract s':>16} {'speedup':>8}")
+    for cards in cards_list:
+        html = generate_growlog_html(cards=cards)
+        parsers = ['html.parser'] + ([HTML_PARSER] if HTML_PARSER != 'html.parser' else [])
+        for parser in parsers:
+            parse_time, soup = best_of(repeat, lambda: BeautifulSoup(html, parser))
+            soup_time, soup_result = best_of(repeat, lambda: scraper._parse_growlog(soup, 'bench', index=SoupLookup(soup)))
+            index_time, index_result = best_of(
+                repeat, lambda: scraper._parse_growlog(soup, 'bench', index=DataTestIdIndex.build(soup))
+            )
+            assert soup_result == index_result, "index and soup extraction differ"
+            print(f"{cards:>6} {parser:>12} {parse_time:>9.3f} {soup_time:>15.3f} {index_time:>16.3f} {soup_time / index_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.cards, args.repeat)
@@ -0,0 +1,90 @@
+"""
+Benchmark: video generation time, file size and peak memory per output
+profile, as the number of photos grows. Each run happens in a fresh process
+so its peak RSS is its own.
+
+Usage:
+    python -m benchmarks.bench_video [--photos 20 100] [--profiles 720p 1080p] [--workers 1 4] [--size 4032x3024]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.bench_image_prep import make_photo
+from src.manifest import write_manifest
+from src.video_generator import FRAME_PREP_WORKERS, generate_video
+from src.video_profiles import VIDEO_PROFILES
+
+
+def peak_rss_mb():
+    """
+    Pic de mémoire résidente du processus. VmHWM est propre au processus ;
+    ru_maxrss conserverait le pic du parent à travers fork/exec.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss est en kilo-octets sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def encode(pdf_path, profile, workers, results):
+    start = time.perf_counter()
+    video_path = generate_video(pdf_path, f"{profile}_{workers}.mp4", keep_frames=False, frame_workers=workers,
+                                profile=profile, output_dir=os.path.dirname(pdf_path))
+    results.put((time.perf_counter() - start, os.path.getsize(video_path), peak_rss_mb()))
+
+
+def make_growlog(photos, size, work_dir):
+    growlog_dir = os.path.join(work_dir, f"growlog_{photos}")
+    os.makedirs(growlog_dir, exist_ok=True)
+    entries = []
+    for i in range(photos):
+        path = os.path.join(growlog_dir, f"{i:04d}.jpg")
+        make_photo(path, seed=i, size=size)
+        entries.append({"date": f"Mar {i % 28 + 1}th 25", "day_count": f"Day {i + 1}", "photos": [path]})
+    pdf_path = os.path.join(growlog_dir, "growlog.pdf")
+    write_manifest(pdf_path, "Benchmark", entries)
+    return pdf_path
+
+
+def run(pdf_path, profile, workers):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=encode, args=(pdf_path, profile, workers, results))
+    process.start()
+    measures = results.get()
+    process.join()
+    return measures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video generation benchmark")
+    parser.add_argument("--photos", type=int, nargs='+', default=[20, 100])
+    parser.add_argument("--profiles", nargs='+', choices=tuple(VIDEO_PROFILES), default=list(VIDEO_PROFILES))
+    parser.add_argument("--workers", type=int, nargs='+', default=[FRAME_PREP_WORKERS],
+                        help="threads de préparation des images")
+    parser.add_argument("--size", default="4032x3024", help="taille des photos synthétiques, LARGEURxHAUTEUR")
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    print(f"{'photos':>8} {'profile':>14} {'workers':>8} {'seconds':>9} {'size MB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for photos in args.photos:
+            pdf_path = make_growlog(photos, size, work_dir)
+            for profile in args.profiles:
+                for workers in args.workers:
+                    seconds, size_bytes, peak_mb = run(pdf_path, profile, workers)
+                    print(f"{photos:>8} {profile:>14} {workers:>8} {seconds:>9.2f} "
+                          f"{size_bytes / 1024 / 1024:>9.2f} {peak_mb:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
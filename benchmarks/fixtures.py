@@ -0,0 +1,249 @@
+"""
+Synthetic growlog pages for benchmarks and tests.
+
+The markup mirrors the `data-testid` structure of growithjane.com growlog
+pages, as read by `GrowWithJaneScraper` and `src/scraper.py`.
+"""
+import random
+from datetime import date, timedelta
+from html import escape
+from typing import Optional
+
+STAGES = ["germination", "seedling", "vegetative", "flowering", "harvest"]
+ACTIONS = [("Water", "{} ml"), ("Nutrients", "{} ml"), ("Defoliation", "{} leaves"), ("pH Adjust", "{} drops")]
+TREE_LOGS = [("Height", "{} cm"), ("pH", "6.{}"), ("EC", "1.{}"), ("Temperature", "2{} °C")]
+
+
+def display_date(d: date) -> str:
+    day = d.day
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{d.strftime('%b')} {day}{suffix} {d.strftime('%y')}"
+
+
+def _card_data(i, d, day_count, rng, photos_per_card, photo_base_url):
+    """Contenu d'une carte, partagé par le rendu HTML et les payloads JSON"""
+    return {
+        "id": f"card-{i}",
+        "date": d,
+        "day_count": day_count,
+        "actions": [(name, unit.format(rng.randint(1, 900))) for name, unit in rng.sample(ACTIONS, rng.randint(1, 3))],
+        "photos": [f"{photo_base_url}/{i:05d}_{p}_thumb@480_.jpg" for p in range(photos_per_card)],
+        "tree_logs": [(label, unit.format(rng.randint(1, 9))) for label, unit in rng.sample(TREE_LOGS, rng.randint(1, 3))],
+    }
+
+
+def _card(card):
+    reminders = "".join(
+        f'<div data-testid="growlog-page-timeline-reminder-item" class="flex gap-2">'
+        f'<i class="icon-water"></i>'
+        f'<span data-testid="growlog-page-timeline-reminder-item-name" class="font-bold">{name}</span>'
+        f'<span data-testid="growlog-page-timeline-reminder-extra-data-amount-value">{amount}</span>'
+        f'</div>'
+        for name, amount in card["actions"]
+    )
+    photos = "".join(
+        f'<div data-testid="growlog-page-timeline-photos-item" class="rounded-lg">'
+        f'<img class="h-[260px] w-full object-cover" src="{url}" alt=""></div>'
+        for url in card["photos"]
+    )
+    tree_logs = "".join(
+        f'<div data-testid="growlog-page-timeline-log-item" class="flex">'
+        f'<div data-testid="growlog-page-timeline-log-item-label" class="text-sm">{label}</div>'
+        f'<div data-testid="growlog-page-timeline-log-item-value" class="font-bold">{value}</div>'
+        f'</div>'
+        for label, value in card["tree_logs"]
+    )
+    day_count = card["day_count"]
+    return (
+        f'<div data-testid="growlog-page-timeline-card" class="flex flex-col rounded-lg border">'
+        f'<div class="flex flex-row-reverse justify-between" data-testid="growlog-page-timeline-card-date">'
+        f'<div class=""><svg width="16" height="16"><circle r="4"></circle></svg>{display_date(card["date"])}</div>'
+        f'<span class="" data-testid="growlog-page-timeline-card-date-age">Day {day_count}</span>'
+        f'</div>'
+        f'<div class="p-4">'
+        f'<div data-testid="growlog-page-timeline-reminders" class="flex flex-col">{reminders}</div>'
+        f'<div data-testid="growlog-page-timeline-photos" class="grid">{photos}</div>'
+        f'<div data-testid="growlog-page-timeline-tree-log" class="flex flex-wrap">{tree_logs}</div>'
+        f'<p class="text-base">{escape("Notes for day %d: all good." % day_count)}</p>'
+        f'</div></div>'
+    )
+
+
+def _stage_change(d, day_count, stage):
+    return (
+        f'<div data-testid="growlog-page-timeline-stage-change" class="flex flex-col rounded-lg">'
+        f'<div class="flex justify-between" data-testid="growlog-page-timeline-stage-change-date">'
+        f'<div class=""><svg width="16" height="16"><circle r="4"></circle></svg>{display_date(d)}</div>'
+        f'<span class="">Day {day_count}</span>'
+        f'</div>'
+        f'<div data-testid="growlog-page-timeline-stage-change-stage" class="p-4">'
+        f'<div class="flex"><div class="flex gap-2"><i class="icon-{stage} text-2xl"></i>'
+        f'<span>Stage changed to {stage.capitalize()}</span></div></div>'
+        f'</div></div>'
+    )
+
+
+def _stage_change_days(cards: int, stage_changes: int) -> dict:
+    """Day index -> stage name, stage changes spread evenly over the timeline."""
+    stage_changes = min(stage_changes, cards)
+    return {round(k * cards / max(stage_changes, 1)): STAGES[k % len(STAGES)] for k in range(stage_changes)}
+
+
+def _timeline(cards, photos_per_card, stage_changes, photo_base_url, seed, start):
+    """Timeline items, newest first: ("stage_change", (date, day count, stage)) or ("card", card data)."""
+    rng = random.Random(seed)
+    change_days = _stage_change_days(cards, stage_changes)
+    items = []
+    for i in range(cards):
+        d = start + timedelta(days=i)
+        if i in change_days:
+            items.append(("stage_change", (d, i + 1, change_days[i])))
+        items.append(("card", _card_data(i, d, i + 1, rng, photos_per_card, photo_base_url)))
+    items.reverse()
+    return items
+
+
+def generate_timeline_items(cards: int = 100, photos_per_card: int = 3, stage_changes: int = 4,
+                            photo_base_url: str = "https://cdn.example.com/photos", seed: int = 42,
+                            start: date = date(2025, 1, 1)) -> list:
+    """Timeline cards and stage-change blocks as HTML fragments, newest first."""
+    return [_stage_change(*data) if kind == "stage_change" else _card(data)
+            for kind, data in _timeline(cards, photos_per_card, stage_changes, photo_base_url, seed, start)]
+
+
+def generate_growlog_payloads(cards: int = 100, photos_per_card: int = 3, stage_changes: int = 4,
+                              photo_base_url: str = "https://cdn.example.com/photos", seed: int = 42,
+                              start: date = date(2025, 1, 1), title: str = "Synthetic Growlog",
+                              strain: str = "Synthetic Kush", slug: str = "synthetic",
+                              page_size: int = 20) -> list:
+    """
+    JSON responses (url, payload) a growlog page would fetch while scrolling:
+    the growlog with its first `page_size` timeline items, then one response
+    per further page. Same content as `generate_growlog_html` with the same
+    arguments, with ISO dates and numeric day counts as an API would send.
+    """
+    items = []
+    for kind, data in _timeline(cards, photos_per_card, stage_changes, photo_base_url, seed, start):
+        if kind == "stage_change":
+            d, day_count, stage = data
+            items.append({"id": f"stage-{day_count}", "type": "stageChange", "date": d.isoformat(),
+                          "dayCount": day_count, "stage": stage})
+        else:
+            items.append({
+                "id": data["id"],
+                "type": "log",
+                "date": f"{data['date'].isoformat()}T12:00:00Z",
+                "dayCount": data["day_count"],
+                "reminders": [{"name": name, "extraData": {"amount": amount}} for name, amount in data["actions"]],
+                "photos": [{"url": url} for url in data["photos"]],
+                "treeLogs": [{"label": label, "value": value} for label, value in data["tree_logs"]],
+            })
+    change_days = _stage_change_days(cards, stage_changes)
+    growlog = {
+        "id": slug,
+        "slug": slug,
+        "title": title,
+        "strain": {"name": strain},
+        "currentStage": change_days[max(change_days)] if change_days else "germination",
+        "environment": {"name": "Tent 80x80", "type": "Indoor", "exposureTime": "18 Hours",
+                        "size": "80 cm x 80 cm x 160 cm", "lights": ["LED - 240 W"]},
+        "medium": {"name": "Coco"},
+        "treeStages": [{"name": change_days[day], "date": (start + timedelta(days=day)).isoformat()}
+                       for day in sorted(change_days)],
+        "timeline": items[:page_size],
+    }
+    base = f"https://api.example.com/growlogs/{slug}"
+    payloads = [(base, {"growlog": growlog})]
+    for offset in range(page_size, len(items), page_size):
+        payloads.append((f"{base}/items?offset={offset}", {"items": items[offset:offset + page_size]}))
+    return payloads
+
+
+def _scroll_loader(items_url: str, offset: int) -> str:
+    """
+    Infinite scroll: near the bottom of the page, fetch the next items from
+    `items_url?offset=N`; the `X-Next-Offset` response header is absent once
+    the timeline is complete.
+    """
+    separator = '&' if '?' in items_url else '?'
+    return f"""<script>
+(function () {{
+  var section = document.querySelector('section');
+  var offset = {offset}, loading = false, done = false;
+  function more() {{
+    if (loading || done || window.innerHeight + window.scrollY < document.body.scrollHeight - 1000) return;
+    loading = true;
+    fetch('{items_url}{separator}offset=' + offset).then(function (response) {{
+      var next = response.headers.get('X-Next-Offset');
+      return response.text().then(function (html) {{
+        section.insertAdjacentHTML('beforeend', html);
+        if (next) {{ offset = parseInt(next, 10); }} else {{ done = true; }}
+        loading = false;
+        setTimeout(more, 0);
+      }});
+    }}, function () {{ loading = false; }});
+  }}
+  window.addEventListener('scroll', more);
+  more();
+}})();
+</script>"""
+
+
+def generate_growlog_html(cards: int = 100, photos_per_card: int = 3, stage_changes: int = 4,
+                          photo_base_url: str = "https://cdn.example.com/photos", seed: int = 42,
+                          start: date = date(2025, 1, 1), title: str = "Synthetic Growlog",
+                          strain: str = "Synthetic Kush", initial_items: Optional[int] = None,
+                          items_url: Optional[str] = None) -> str:
+    """
+    Return a rendered growlog page with `cards` timeline cards, newest first,
+    and `stage_changes` stage-change blocks spread evenly over the timeline
+    (stage names repeat beyond the five real stages).
+
+    With `items_url`, only the first `initial_items` items are in the page and
+    the rest are loaded on scroll from `items_url` (see `_scroll_loader`).
+    """
+    items = generate_timeline_items(cards, photos_per_card, stage_changes, photo_base_url, seed, start)
+    change_days = _stage_change_days(cards, stage_changes)
+    stage_changes = min(stage_changes, cards)
+    script = ""
+    if items_url is not None:
+        initial_items = len(items) if initial_items is None else initial_items
+        items = items[:initial_items]
+        script = _scroll_loader(items_url, initial_items)
+
+    stage_rows = "".join(
+        f'<div data-testid="growlog-page-tree-stages-item" class="flex">'
+        f'<span data-testid="growlog-page-tree-stages-item-name-value" class="capitalize{" text-primary" if k == stage_changes - 1 else ""}">{change_days[day]}</span>'
+        f'<div data-testid="growlog-page-tree-stages-item-name-date"><span>{display_date(start + timedelta(days=day))}</span></div>'
+        f'</div>'
+        for k, day in enumerate(sorted(change_days))
+    )
+    current_stage = change_days[max(change_days)] if change_days else "germination"
+
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{escape(title)} | Grow with Jane</title></head>
+<body><div id="__next"><main class="flex flex-row gap-4">
+<aside class="w-1/3">
+  <h1 class="text-2xl font-bold">{escape(title)}</h1>
+  <div data-testid="growlog-page-details-stage"><span class="capitalize">{current_stage}</span></div>
+  <div data-testid="growlog-page-strain-breeder" class="flex flex-col">
+    <span data-testid="growlog-page-strain-breeder-strain-name" class="text-sm">Strain</span>
+    <span class="text-lg font-bold">{escape(strain)}</span>
+  </div>
+  <div class="flex flex-col"><div>Tree Stages</div><div>{current_stage.capitalize()}</div></div>
+  <div data-testid="growlog-page-tree-stages" class="flex flex-col">{stage_rows}</div>
+  <div data-testid="growlog-page-environment-details" class="flex flex-col">
+    <div data-testid="growlog-page-environment-details-name"><span class="text-sm">Name</span><span data-testid="growlog-page-environment-details-name" class="text-lg">Tent 80x80</span></div>
+    <div data-testid="growlog-page-environment-details-type"><span class="text-sm">Type</span><span class="text-lg">Indoor</span></div>
+    <div data-testid="growlog-page-environment-details-exposure-time"><span class="text-sm">Exposure</span><span class="text-lg">18 Hours</span></div>
+    <div data-testid="growlog-page-environment-details-indoor-size"><span class="text-sm">Size</span><span class="text-lg">80 cm x 80 cm x 160 cm</span></div>
+    <div data-testid="growlog-page-environment-details-lights"><span class="text-sm">Lights</span>
+      <span data-testid="growlog-page-environment-details-lights-value"><p data-testid="growlog-page-environment-details-lights-item">LED - 240 W</p></span></div>
+  </div>
+  <div data-testid="growlog-page-medium-nutrients"><span data-testid="growlog-page-medium-nutrients-name-value-name">Coco</span></div>
+  <img class="growlog-photo" src="{photo_base_url}/cover.jpg" alt="cover">
+</aside>
+<section class="w-2/3 flex flex-col gap-4">
+{"".join(items)}
+</section>
+</main></div>{script}</body></html>"""
@@ -0,0 +1,259 @@
+"""
+Load test: concurrent `/generate` (and optionally `/generate_video`) requests
+against the web service, scraping the local mock site instead of
+growithjane.com. For each concurrency level, reports throughput, p50/p95/p99
+latency, error rate and the peak RSS of the service (web process, render
+workers and browsers).
+
+Unless `--target` / `--mock` are given, the mock site and the service
+(`uvicorn src.web_interface:app`) are started as subprocesses on free ports.
+
+Usage:
+    python -m benchmarks.load_test [--concurrency 1 2 4 8] [--requests-per-client 2] [--cards 50]
+                                   [--video] [--latency 0.05] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+import aiohttp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_FILENAME = re.compile(r'filename="?([^";]+)"?')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, p):
+    """Percentile au rang le plus proche ; None sans valeur"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * p / 100)) - 1]
+
+
+def _children(pid):
+    children = []
+    try:
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tid}/children') as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid) -> float:
+    """RSS cumulée d'un processus et de tous ses descendants (Linux, /proc)"""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _rss_kb(current)
+        pending.extend(_children(current))
+    return total / 1024
+
+
+class PeakRss:
+    """Échantillonne la RSS de l'arbre de processus du service pendant un palier"""
+
+    def __init__(self, pid, interval=0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            self.peak_mb = max(self.peak_mb, await asyncio.to_thread(process_tree_rss_mb, self.pid))
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self):
+        if self.pid:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+        return self
+
+    def __exit__(self, *exc):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def timed_post(session, url, data, expected_type):
+    """POST de formulaire : (succès, durée, réponse lue ou message d'erreur, en-têtes)"""
+    start = time.perf_counter()
+    try:
+        async with session.post(url, data=data) as response:
+            body = await response.read()
+            ok = response.status == 200 and response.content_type == expected_type
+            if ok:
+                return True, time.perf_counter() - start, body, response.headers
+            message = body[:200].decode('utf-8', 'replace')
+            return False, time.perf_counter() - start, f"HTTP {response.status}: {message}", response.headers
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return False, time.perf_counter() - start, f"{type(e).__name__}: {e}", {}
+
+
+async def client(session, target, mock, cards, requests, video, distinct, results):
+    for _ in range(requests):
+        slug = f"load-{uuid.uuid4().hex[:12]}" if distinct else "load-shared"
+        ok, seconds, body, headers = await timed_post(
+            session, f"{target}/generate", {"url": f"{mock}/growlogs/{slug}?cards={cards}"}, 'application/pdf')
+        results["generate"].append((ok, seconds, None if ok else body))
+        if not (ok and video):
+            continue
+        match = _FILENAME.search(headers.get('Content-Disposition', ''))
+        ok, seconds, body, _ = await timed_post(
+            session, f"{target}/generate_video", {"pdf_filename": match.group(1) if match else ""}, 'video/mp4')
+        results["generate_video"].append((ok, seconds, None if ok else body))
+
+
+def summarize(samples, wall_seconds):
+    latencies = [seconds for ok, seconds, _ in samples if ok]
+    errors = [error for ok, _, error in samples if not ok]
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "throughput_rps": len(latencies) / wall_seconds if wall_seconds else 0.0,
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+        "p99_seconds": percentile(latencies, 99),
+        "sample_errors": sorted(set(errors))[:3],
+    }
+
+
+async def run_level(target, mock, concurrency, requests_per_client, cards, video, distinct, service_pid, timeout):
+    results = {"generate": [], "generate_video": []}
+    session_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=session_timeout) as session:
+        with PeakRss(service_pid) as rss:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                client(session, target, mock, cards, requests_per_client, video, distinct, results)
+                for _ in range(concurrency)
+            ))
+            wall = time.perf_counter() - start
+    level = {"concurrency": concurrency, "wall_seconds": wall, "peak_rss_mb": rss.peak_mb if service_pid else None}
+    for endpoint, samples in results.items():
+        if samples:
+            level[endpoint] = summarize(samples, wall)
+    return level
+
+
+def wait_until_up(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def start_process(args, url):
+    process = subprocess.Popen([sys.executable, '-m', *args], cwd=ROOT_DIR)
+    try:
+        wait_until_up(url, process)
+    except BaseException:
+        process.terminate()
+        raise
+    return process
+
+
+def print_level(level):
+    rss = f"{level['peak_rss_mb']:.0f}" if level['peak_rss_mb'] is not None else "n/a"
+    for endpoint in ("generate", "generate_video"):
+        stats = level.get(endpoint)
+        if not stats:
+            continue
+        p = [f"{stats[k]:.2f}" if stats[k] is not None else "-" for k in ("p50_seconds", "p95_seconds", "p99_seconds")]
+        print(f"{level['concurrency']:>5} {endpoint:>15} {stats['requests']:>5} {stats['throughput_rps']:>8.3f} "
+              f"{p[0]:>7} {p[1]:>7} {p[2]:>7} {stats['error_rate'] * 100:>6.1f}% {rss:>9}")
+        for error in stats["sample_errors"]:
+            print(f"      error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests-per-client', type=int, default=2)
+    parser.add_argument('--cards', type=int, default=50, help="cards per mock growlog")
+    parser.add_argument('--video', action='store_true', help="request a video after each PDF")
+    parser.add_argument('--shared-growlog', action='store_true',
+                        help="every request scrapes the same growlog (exercises dedupe and caches)")
+    parser.add_argument('--target', help="URL of a running service (default: start one)")
+    parser.add_argument('--service-pid', type=int, help="PID of --target, for peak RSS")
+    parser.add_argument('--mock', help="URL of a running mock site (default: start one)")
+    parser.add_argument('--latency', type=float, default=0.05, help="mock page latency, in seconds")
+    parser.add_argument('--photo-latency', type=float, default=0.02, help="mock photo latency, in seconds")
+    parser.add_argument('--timeout', type=float, default=900, help="per-request timeout, in seconds")
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        mock = args.mock
+        if mock is None:
+            port = free_port()
+            mock = f"http://127.0.0.1:{port}"
+            processes.append(start_process(
+                ['benchmarks.mock_site', '--port', str(port), '--cards', str(args.cards),
+                 '--latency', str(args.latency), '--photo-latency', str(args.photo_latency)],
+                f"{mock}/stats"))
+        target, service_pid = args.target, args.service_pid
+        if target is None:
+            port = free_port()
+            target = f"http://127.0.0.1:{port}"
+            service = start_process(['uvicorn', 'src.web_interface:app', '--port', str(port)], f"{target}/stats")
+            processes.append(service)
+            service_pid = service.pid
+
+        print(f"{'conc':>5} {'endpoint':>15} {'reqs':>5} {'req/s':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+              f"{'errors':>7} {'RSS MB':>9}")
+        levels = []
+        for concurrency in args.concurrency:
+            level = asyncio.run(run_level(target, mock, concurrency, args.requests_per_client, args.cards,
+                                          args.video, not args.shared_growlog, service_pid, args.timeout))
+            print_level(level)
+            levels.append(level)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({"parameters": vars(args), "levels": levels}, f, indent=2)
+            print(f"Results written to {args.output}")
+    finally:
+        for process in processes:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Local mock of growithjane.com for load tests: infinite-scroll growlog pages
+with the real `data-testid` markup and a photo CDN serving generated JPEGs,
+each with configurable latency.
+
+Every growlog URL `/growlogs/<slug>` is a distinct, deterministic growlog
+(the slug seeds the generator); `?cards=N` overrides its length.
+
+Usage:
+    python -m benchmarks.mock_site [--port 8100] [--cards 100] [--page-size 20]
+                                   [--latency 0.05] [--photo-latency 0.02] [--jitter 0.02]
+"""
+import argparse
+import asyncio
+import io
+import random
+import zlib
+from functools import lru_cache
+
+from aiohttp import web
+
+from benchmarks.bench_image_prep import make_photo
+from benchmarks.fixtures import generate_growlog_html, generate_timeline_items
+
+
+class MockGrowlogSite:
+    """
+    Application aiohttp du faux site. `latency` s'applique aux pages et aux
+    fragments de timeline, `photo_latency` aux photos, chacune augmentée d'un
+    aléa uniforme dans [0, `jitter`].
+    """
+
+    def __init__(self, cards=100, photos_per_card=3, stage_changes=4, page_size=20, latency=0.05,
+                 photo_latency=0.02, jitter=0.0, photo_size=(1600, 1200)):
+        self.cards = cards
+        self.photos_per_card = photos_per_card
+        self.stage_changes = stage_changes
+        self.page_size = page_size
+        self.latency = latency
+        self.photo_latency = photo_latency
+        self.jitter = jitter
+        self.photo_size = photo_size
+        self.requests = {"pages": 0, "items": 0, "photos": 0, "photos_not_modified": 0}
+        # Une photo générée ne change jamais : cache des JPEG déjà encodés
+        self._photo = lru_cache(maxsize=512)(self._render_photo)
+        self._items = lru_cache(maxsize=64)(self._timeline_items)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/growlogs/{slug}', self.growlog_page),
+            web.get('/growlogs/{slug}/items', self.timeline_items),
+            web.get('/photos/{path:.+}', self.photo),
+            web.get('/stats', self.stats),
+        ])
+        return app
+
+    async def _delay(self, latency):
+        delay = latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _cards(self, request) -> int:
+        return int(request.query.get('cards', self.cards))
+
+    def _timeline_items(self, slug, cards, photo_base_url):
+        return generate_timeline_items(cards, self.photos_per_card, self.stage_changes, photo_base_url,
+                                       seed=zlib.crc32(slug.encode()))
+
+    def _photo_base_url(self, request, slug):
+        return f"{request.scheme}://{request.host}/photos/{slug}"
+
+    async def growlog_page(self, request):
+        await self._delay(self.latency)
+        self.requests["pages"] += 1
+        slug = request.match_info['slug']
+        cards = self._cards(request)
+        html = generate_growlog_html(cards, self.photos_per_card, self.stage_changes,
+                                     photo_base_url=self._photo_base_url(request, slug),
+                                     seed=zlib.crc32(slug.encode()), title=f"Growlog {slug}",
+                                     initial_items=self.page_size,
+                                     items_url=f"/growlogs/{slug}/items?cards={cards}")
+        return web.Response(text=html, content_type='text/html')
+
+    async def timeline_items(self, request):
+        await self._delay(self.latency)
+        self.requests["items"] += 1
+        slug = request.match_info['slug']
+        items = self._items(slug, self._cards(request), self._photo_base_url(request, slug))
+        offset = int(request.query.get('offset', 0))
+        end = offset + self.page_size
+        headers = {"X-Next-Offset": str(end)} if end < len(items) else {}
+        return web.Response(text="".join(items[offset:end]), content_type='text/html', headers=headers)
+
+    def _render_photo(self, path):
+        buffer = io.BytesIO()
+        make_photo(buffer, seed=zlib.crc32(path.encode()), size=self.photo_size)
+        return buffer.getvalue()
+
+    async def photo(self, request):
+        await self._delay(self.photo_latency)
+        path = request.match_info['path']
+        etag = f'"{zlib.crc32(path.encode()):08x}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.requests["photos_not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        self.requests["photos"] += 1
+        # Encodage JPEG hors de la boucle d'événements
+        body = await asyncio.to_thread(self._photo, path)
+        return web.Response(body=body, content_type='image/jpeg', headers={"ETag": etag})
+
+    async def stats(self, request):
+        return web.json_response(self.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--cards', type=int, default=100, help="cards per growlog (override with ?cards=N)")
+    parser.add_argument('--photos-per-card', type=int, default=3)
+    parser.add_argument('--stage-changes', type=int, default=4)
+    parser.add_argument('--page-size', type=int, default=20, help="timeline items per page / scroll load")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to pages and scroll loads")
+    parser.add_argument('--photo-latency', type=float, default=0.02, help="seconds added to photos")
+    parser.add_argument('--jitter', type=float, default=0.0, help="uniform random extra latency, in seconds")
+    parser.add_argument('--photo-size', default="1600x1200")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.photo_size.lower().split('x'))
+    site = MockGrowlogSite(args.cards, args.photos_per_card, args.stage_changes, args.page_size, args.latency,
+                           args.photo_latency, args.jitter, (width, height))
+    # Pas de journal d'accès : il coûterait plus cher que les réponses sous charge
+    web.run_app(site.app(), host=args.host, port=args.port, access_log=None)
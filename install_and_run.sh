@@ -29,7 +29,7 @@ fi
 # Installation des dépendances
 pip install --upgrade pip
 pip install -r requirements.txt
-pip install PyMuPDF opencv-python weasyprint pygobject  # Ajout des dépendances requises
+pip install PyMuPDF weasyprint pygobject  # Ajout des dépendances requises
 playwright install
 
 # Installation des bibliothèques requises sous Windows
@@ -0,0 +1,101 @@
+"""Artifacts module.
+Content-addressed storage of generated PDFs and videos: each artifact is
+stored as `<sha256>.<ext>`, so two growlogs can never overwrite each other's
+files and the hash doubles as a strong HTTP ETag. A stable alias per growlog
+(`growlogs/<slug>.<ext>`) points to its latest artifact.
+"""
+import hashlib
+import logging
+import os
+import re
+from typing import Optional
+
+from src.manifest import manifest_path_for
+from src.render_cache import file_digest
+
+logger = logging.getLogger('artifacts')
+
+TMP_PREFIX = '.tmp-'
+ALIAS_DIR = 'growlogs'
+_CONTENT_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+def growlog_slug(url: str) -> str:
+    """Nom de fichier stable pour un growlog : dernier segment de l'URL + hash court"""
+    last = url.rstrip('/').rsplit('/', 1)[-1]
+    base = re.sub(r'[^a-zA-Z0-9]+', '_', last).strip('_') or "growlog"
+    return f"{base}_{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+def content_digest(path: str) -> Optional[str]:
+    """sha256 d'un artefact : lu dans son nom s'il est stocké par contenu, calculé sinon"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if _CONTENT_NAME.match(stem):
+        return stem
+    return file_digest(path)
+
+
+class ArtifactStore:
+    """
+    Artefacts sous `root/<sha256>.<ext>` (le manifest d'un PDF suit sous
+    `root/<sha256>.manifest.json`) et alias `root/growlogs/<nom>.<ext>`,
+    liens symboliques remplacés atomiquement à chaque publication.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.alias_dir = os.path.join(root, ALIAS_DIR)
+        os.makedirs(self.alias_dir, exist_ok=True)
+
+    def publish(self, path: str, alias: Optional[str] = None) -> str:
+        """
+        Déplace le fichier `path` (et son manifest éventuel) vers son nom de
+        contenu, met à jour l'alias `alias` (nom de fichier, extension
+        comprise) et retourne le chemin de l'artefact.
+        """
+        ext = os.path.splitext(path)[1]
+        digest = file_digest(path)
+        target = os.path.join(self.root, digest + ext)
+        manifest = manifest_path_for(path)
+        if os.path.exists(manifest):
+            os.replace(manifest, manifest_path_for(target))
+        if os.path.exists(target):
+            # Même contenu déjà publié : l'artefact existant est conservé
+            os.remove(path)
+        else:
+            os.replace(path, target)
+        if alias:
+            self._link(os.path.basename(alias), digest + ext)
+        logger.info("Published %s%s", os.path.basename(target), f" as {alias}" if alias else "")
+        return target
+
+    def _link(self, alias: str, content_name: str):
+        link_path = os.path.join(self.alias_dir, alias)
+        tmp_path = os.path.join(self.alias_dir, f"{TMP_PREFIX}{os.getpid()}-{alias}")
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        os.symlink(os.path.join(os.pardir, content_name), tmp_path)
+        os.replace(tmp_path, link_path)
+
+    def resolve(self, alias: str) -> Optional[str]:
+        """Chemin de l'artefact désigné par un alias, None s'il n'existe pas"""
+        link_path = os.path.join(self.alias_dir, os.path.basename(alias))
+        target = os.path.realpath(link_path)
+        if not os.path.islink(link_path) or not os.path.exists(target):
+            return None
+        return target
+
+    def prune_aliases(self) -> int:
+        """Supprime les alias dont l'artefact a été évincé ; retourne leur nombre"""
+        removed = 0
+        for name in os.listdir(self.alias_dir):
+            link_path = os.path.join(self.alias_dir, name)
+            if os.path.islink(link_path) and not os.path.exists(link_path):
+                try:
+                    os.remove(link_path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
@@ -0,0 +1,184 @@
+"""Browser pool module.
+Keeps a few headless Chromium instances alive between scraping jobs and
+hands out isolated browser contexts.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+logger = logging.getLogger('browser_pool')
+
+
+def _process_rss_bytes(pid: int) -> int:
+    """RSS d'un processus d'après /proc (0 si indisponible, par ex. hors Linux)"""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _PooledBrowser:
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.browser: Optional[Browser] = None
+        self.jobs = 0
+        self.launched_at = 0.0
+
+
+class BrowserPool:
+    """
+    Pool de `size` navigateurs Chromium, chacun servant un job à la fois.
+
+    Chaque job reçoit un `BrowserContext` neuf (cookies, cache et stockage
+    isolés) qui est fermé à la fin du job. Un navigateur est relancé après
+    `max_jobs_per_browser` jobs, ou dès que ses processus dépassent
+    `max_memory_mb` de RSS. Les navigateurs sont lancés à la demande.
+    """
+
+    def __init__(self, size: int = 2, max_jobs_per_browser: int = 50, max_memory_mb: int = 1024,
+                 headless: bool = True):
+        self.size = max(1, size)
+        self.max_jobs_per_browser = max_jobs_per_browser
+        self.max_memory_mb = max_memory_mb
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[_PooledBrowser] = [_PooledBrowser(i) for i in range(self.size)]
+        self._idle: Optional[asyncio.Queue] = None
+        self._stats = {
+            "acquired": 0,
+            "hits": 0,
+            "launches": 0,
+            "recycled": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "launch_seconds_total": 0.0,
+            "ready_seconds_hit_total": 0.0,
+            "ready_seconds_miss_total": 0.0,
+        }
+
+    async def start(self):
+        if self._playwright is not None:
+            return
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        logger.info("Browser pool started (size=%s)", self.size)
+
+    async def close(self):
+        for slot in self._slots:
+            await self._close_browser(slot)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool closed")
+
+    async def _launch(self, slot: _PooledBrowser):
+        start = time.perf_counter()
+        slot.browser = await self._playwright.chromium.launch(headless=self.headless)
+        slot.jobs = 0
+        slot.launched_at = time.time()
+        elapsed = time.perf_counter() - start
+        self._stats["launches"] += 1
+        self._stats["launch_seconds_total"] += elapsed
+        logger.info("Browser %s launched in %.2fs", slot.slot, elapsed)
+
+    async def _close_browser(self, slot: _PooledBrowser):
+        if slot.browser is None:
+            return
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.warning("Error closing browser %s: %s", slot.slot, e)
+        slot.browser = None
+
+    async def browser_rss_bytes(self, browser: Browser) -> int:
+        """Somme des RSS de tous les processus Chromium (browser, renderers, GPU...)"""
+        try:
+            cdp = await browser.new_browser_cdp_session()
+            try:
+                info = await cdp.send("SystemInfo.getProcessInfo")
+            finally:
+                await cdp.detach()
+        except Exception as e:
+            logger.debug("Unable to read browser process info: %s", e)
+            return 0
+        return sum(_process_rss_bytes(proc["id"]) for proc in info.get("processInfo", []))
+
+    async def _needs_recycle(self, slot: _PooledBrowser) -> Optional[str]:
+        if slot.browser is None:
+            return None
+        if not slot.browser.is_connected():
+            return "disconnected"
+        if self.max_jobs_per_browser and slot.jobs >= self.max_jobs_per_browser:
+            return f"{slot.jobs} jobs"
+        if self.max_memory_mb:
+            rss = await self.browser_rss_bytes(slot.browser)
+            if rss > self.max_memory_mb * 1024 * 1024:
+                return f"{rss // (1024 * 1024)} MB RSS"
+        return None
+
+    @asynccontextmanager
+    async def context(self, **context_options) -> BrowserContext:
+        """Fournit un contexte isolé sur un navigateur du pool"""
+        if self._playwright is None:
+            await self.start()
+
+        wait_start = time.perf_counter()
+        slot = await self._idle.get()
+        wait = time.perf_counter() - wait_start
+        self._stats["acquired"] += 1
+        self._stats["wait_seconds_total"] += wait
+        self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait)
+
+        context = None
+        try:
+            hit = slot.browser is not None and slot.browser.is_connected()
+            if not hit:
+                await self._close_browser(slot)
+                await self._launch(slot)
+            context = await slot.browser.new_context(**context_options)
+            # Temps total entre la demande et un contexte utilisable
+            ready = time.perf_counter() - wait_start
+            if hit:
+                self._stats["hits"] += 1
+                self._stats["ready_seconds_hit_total"] += ready
+            else:
+                self._stats["ready_seconds_miss_total"] += ready
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning("Error closing browser context: %s", e)
+            slot.jobs += 1
+            try:
+                reason = await self._needs_recycle(slot)
+                if reason:
+                    logger.info("Recycling browser %s (%s)", slot.slot, reason)
+                    self._stats["recycled"] += 1
+                    await self._close_browser(slot)
+            finally:
+                self._idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        acquired = self._stats["acquired"]
+        hits = self._stats["hits"]
+        misses = acquired - hits
+        return {
+            **self._stats,
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "running_browsers": sum(1 for slot in self._slots if slot.browser is not None),
+            "hit_ratio": self._stats["hits"] / acquired if acquired else 0.0,
+            "wait_seconds_avg": self._stats["wait_seconds_total"] / acquired if acquired else 0.0,
+            "ready_seconds_hit_avg": self._stats["ready_seconds_hit_total"] / hits if hits else 0.0,
+            "ready_seconds_miss_avg": self._stats["ready_seconds_miss_total"] / misses if misses else 0.0,
+        }
@@ -0,0 +1,341 @@
+"""Bulk processing module.
+Runs scrape -> photo download -> PDF render (-> video) for a file of growlog
+URLs as a staged pipeline: each stage has its own concurrency limit, so
+browser time, network I/O and PDF rendering overlap across growlogs.
+
+Progress is appended to a journal in the work directory; re-running the
+same command resumes each growlog after its last completed stage.
+
+Usage:
+    python -m src.bulk urls.txt [--workdir output/bulk] [--video]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.artifacts import growlog_slug
+from src.browser_pool import BrowserPool
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.growlog_state import GrowlogStateStore
+from src.image_prep import ImagePrepOptions
+from src.logging_setup import setup_logging
+from src.pdf_generator import render_growlog_pdf
+from src.photo_cache import PhotoCache
+from src.render_cache import RenderCache
+from src.render_pool import RenderPool
+from src.video_generator import generate_video
+from src.video_profiles import DEFAULT_VIDEO_PROFILE, VIDEO_PROFILES
+
+logger = logging.getLogger('bulk')
+
+STAGES = ("scrape", "photos", "pdf", "video")
+
+
+@dataclass
+class StageStats:
+    """Compteurs d'une étape du pipeline"""
+    name: str
+    concurrency: int
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    busy: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    @property
+    def wall(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    def as_dict(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy, 3),
+            "wall_seconds": round(self.wall, 3),
+            "avg_seconds": round(self.busy / self.done, 3) if self.done else None,
+            "per_minute": round(60 * self.done / self.wall, 2) if self.wall else None,
+        }
+
+
+def read_urls(path: str) -> List[str]:
+    """Une URL par ligne ; lignes vides et commentaires (#) ignorés, doublons retirés"""
+    with open(path, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f]
+    return list(dict.fromkeys(url for url in urls if url and not url.startswith('#')))
+
+
+class Journal:
+    """
+    Journal JSONL des étapes terminées (une ligne par étape et par growlog).
+    Une ligne tronquée par un crash est ignorée à la relecture.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Dict[str, Dict[str, Dict]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.completed.setdefault(record["url"], {})[record["stage"]] = record
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def done(self, url: str, stage: str) -> Optional[Dict]:
+        return self.completed.get(url, {}).get(stage)
+
+    def record(self, url: str, stage: str, **details):
+        record = {"url": url, "stage": stage, "at": time.time(), **details}
+        self.completed.setdefault(url, {})[stage] = record
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _write_json(path: str, data: Dict):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _silent_remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_json(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class BulkPipeline:
+    """
+    Pipeline par étapes : chaque growlog traverse les étapes dans l'ordre,
+    chaque étape est bornée par son propre sémaphore.
+    """
+
+    def __init__(self, workdir: str, scraper: GrowWithJaneScraper, concurrency: Dict[str, int],
+                 video: bool = False, render_pool: Optional[RenderPool] = None,
+                 render_cache: Optional[RenderCache] = None, image_options: Optional[ImagePrepOptions] = None,
+                 video_profile: str = DEFAULT_VIDEO_PROFILE):
+        self.workdir = workdir
+        self.data_dir = os.path.join(workdir, "data")
+        self.pdf_dir = os.path.join(workdir, "pdf")
+        self.video_dir = os.path.join(workdir, "video")
+        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(self.pdf_dir, exist_ok=True)
+        self.scraper = scraper
+        self.video = video
+        # Rendus PDF/vidéo dans des processus séparés (threads si None)
+        self.render_pool = render_pool
+        self.render_cache = render_cache
+        self.image_options = image_options
+        self.video_profile = video_profile
+        self.stages = [stage for stage in STAGES if video or stage != "video"]
+        self.stats = {stage: StageStats(stage, max(1, concurrency.get(stage, 1))) for stage in self.stages}
+        self._limits = {stage: asyncio.Semaphore(self.stats[stage].concurrency) for stage in self.stages}
+        self.journal = Journal(os.path.join(workdir, "journal.jsonl"))
+        self.failures: List[Dict[str, str]] = []
+
+    def _data_path(self, url: str) -> str:
+        return os.path.join(self.data_dir, f"{growlog_slug(url)}.json")
+
+    async def _scrape(self, url: str, _) -> Dict:
+        growlog_data = await self.scraper.get_growlog_data(url, download_photos=False)
+        if not growlog_data:
+            raise RuntimeError("no data retrieved from the growlog")
+        _write_json(self._data_path(url), growlog_data)
+        return {"timeline": len(growlog_data.get("timeline", []))}
+
+    async def _photos(self, url: str, _) -> Dict:
+        growlog_data = _read_json(self._data_path(url))
+        failures = await self.scraper.download_growlog_photos(growlog_data)
+        _write_json(self._data_path(url), growlog_data)
+        return {"photo_errors": len(failures)}
+
+    async def _render(self, fn, *args, **kwargs):
+        if self.render_pool is not None:
+            return await self.render_pool.run(fn, *args, **kwargs)
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def _pdf(self, url: str, _) -> Dict:
+        # Le worker relit les données scrapées depuis leur fichier
+        pdf_path = await self._render(
+            render_growlog_pdf, self._data_path(url),
+            output_dir=self.pdf_dir, filename=f"{growlog_slug(url)}.pdf", cache=self.render_cache,
+            image_options=self.image_options,
+        )
+        return {"artifact": pdf_path}
+
+    async def _video(self, url: str, previous: Dict) -> Dict:
+        pdf_path = previous["pdf"]["artifact"]
+        # Images préparées dans un dossier temporaire, supprimé après l'encodage
+        video_path = await self._render(generate_video, pdf_path, f"{growlog_slug(url)}.mp4",
+                                        profile=self.video_profile, output_dir=self.video_dir, keep_frames=False)
+        if not video_path:
+            raise RuntimeError("no image found in the PDF")
+        return {"artifact": video_path}
+
+    def _is_complete(self, url: str, stage: str) -> bool:
+        if not self.journal.done(url, stage):
+            return False
+        # Les étapes suivantes relisent le fichier de données ou l'artefact
+        if stage in ("scrape", "photos"):
+            return os.path.exists(self._data_path(url))
+        return os.path.exists(self.journal.done(url, stage).get("artifact", ""))
+
+    async def process(self, url: str):
+        handlers = {"scrape": self._scrape, "photos": self._photos, "pdf": self._pdf, "video": self._video}
+        previous: Dict[str, Dict] = {}
+        redo = False
+        for stage in self.stages:
+            stats = self.stats[stage]
+            if not redo and self._is_complete(url, stage):
+                stats.skipped += 1
+                previous[stage] = self.journal.done(url, stage)
+                continue
+            # Une étape refaite invalide les suivantes
+            redo = True
+            async with self._limits[stage]:
+                start = time.perf_counter()
+                if stats.first_start is None:
+                    stats.first_start = start
+                try:
+                    details = await handlers[stage](url, previous)
+                except Exception as e:
+                    stats.failed += 1
+                    self.failures.append({"url": url, "stage": stage, "error": str(e) or type(e).__name__})
+                    logger.error("[%s] %s failed: %s", stage, url, e)
+                    return
+                finally:
+                    end = time.perf_counter()
+                    stats.busy += end - start
+                    stats.last_end = end
+            stats.done += 1
+            self.journal.record(url, stage, seconds=round(end - start, 3), **details)
+            previous[stage] = self.journal.done(url, stage)
+            logger.info("[%s] %s done in %.1fs", stage, url, end - start)
+
+    async def run(self, urls: List[str]) -> Dict:
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(self.process(url) for url in urls))
+        finally:
+            self.journal.close()
+        elapsed = time.perf_counter() - start
+        completed = sum(1 for url in urls if self._is_complete(url, self.stages[-1]))
+        return {
+            "growlogs": len(urls),
+            "completed": completed,
+            "failed": len(self.failures),
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {stage: self.stats[stage].as_dict() for stage in self.stages},
+            "failures": self.failures,
+            "render_pool": self.render_pool.stats() if self.render_pool is not None else None,
+        }
+
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"{summary['completed']}/{summary['growlogs']} growlogs completed, "
+        f"{summary['failed']} failed in {summary['elapsed_seconds']:.1f}s",
+        f"{'stage':<8} {'conc':>4} {'done':>5} {'skip':>5} {'fail':>5} {'busy s':>8} {'wall s':>8} {'avg s':>7} {'/min':>7}",
+    ]
+    for stage, s in summary["stages"].items():
+        avg = f"{s['avg_seconds']:.2f}" if s["avg_seconds"] is not None else "-"
+        rate = f"{s['per_minute']:.1f}" if s["per_minute"] is not None else "-"
+        lines.append(
+            f"{stage:<8} {s['concurrency']:>4} {s['done']:>5} {s['skipped']:>5} {s['failed']:>5} "
+            f"{s['busy_seconds']:>8.1f} {s['wall_seconds']:>8.1f} {avg:>7} {rate:>7}"
+        )
+    for failure in summary["failures"]:
+        lines.append(f"FAILED [{failure['stage']}] {failure['url']}: {failure['error']}")
+    return "\n".join(lines)
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate PDF (and video) reports for many growlogs.")
+    parser.add_argument('urls_file', help="file with one growlog URL per line")
+    parser.add_argument('--workdir', default=os.path.join('output', 'bulk'),
+                        help="journal, scraped data, photo and render caches, PDFs and videos "
+                             "(re-use it to resume)")
+    parser.add_argument('--video', action='store_true', help="also generate a video per growlog")
+    parser.add_argument('--video-profile', choices=tuple(VIDEO_PROFILES), default=DEFAULT_VIDEO_PROFILE)
+    parser.add_argument('--scrape-concurrency', type=int, default=2)
+    parser.add_argument('--photo-concurrency', type=int, default=4)
+    parser.add_argument('--pdf-concurrency', type=int, default=2)
+    parser.add_argument('--video-concurrency', type=int, default=1)
+    parser.add_argument('--downloads-per-growlog', type=int, default=8)
+    parser.add_argument('--image-dpi', type=int, default=200,
+                        help="resolution of the photos embedded in the PDF (0 keeps the originals)")
+    parser.add_argument('--image-quality', type=int, default=80)
+    parser.add_argument('--engine', choices=("network", "dom"), default="dom")
+    parser.add_argument('--restart', action='store_true', help="ignore the journal and start over")
+    parser.add_argument('--summary-json', help="also write the summary to this file")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    setup_logging(level=None if args.verbose else "WARNING")
+
+    urls = read_urls(args.urls_file)
+    os.makedirs(args.workdir, exist_ok=True)
+    if args.restart:
+        _silent_remove(os.path.join(args.workdir, "journal.jsonl"))
+
+    browser_pool = BrowserPool(size=args.scrape_concurrency)
+    scraper = GrowWithJaneScraper(
+        verbose=args.verbose,
+        max_concurrent_downloads=args.downloads_per_growlog,
+        photo_cache=PhotoCache(os.path.join(args.workdir, "photos")),
+        browser_pool=browser_pool,
+        engine=args.engine,
+        state_store=GrowlogStateStore(os.path.join(args.workdir, "state")),
+    )
+    render_pool = RenderPool(max_workers=args.pdf_concurrency + (args.video_concurrency if args.video else 0))
+    pipeline = BulkPipeline(
+        args.workdir, scraper, video=args.video, render_pool=render_pool,
+        render_cache=RenderCache(os.path.join(args.workdir, "render_cache")),
+        image_options=ImagePrepOptions(dpi=args.image_dpi, quality=args.image_quality) if args.image_dpi else None,
+        video_profile=args.video_profile,
+        concurrency={
+            "scrape": args.scrape_concurrency,
+            "photos": args.photo_concurrency,
+            "pdf": args.pdf_concurrency,
+            "video": args.video_concurrency,
+        },
+    )
+    await browser_pool.start()
+    try:
+        summary = await pipeline.run(urls)
+    finally:
+        await browser_pool.close()
+        render_pool.close()
+
+    print(format_summary(summary))
+    if args.summary_json:
+        _write_json(os.path.abspath(args.summary_json), summary)
+    return 0 if not summary["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
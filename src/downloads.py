@@ -0,0 +1,107 @@
+"""Downloads module.
+File responses for generated artifacts with a strong ETag, conditional
+requests (`If-None-Match`, `If-Range`) and single byte ranges (`Range`), so
+repeated and resumed downloads of large PDFs and videos cost almost nothing.
+Starlette's FileResponse always sends the whole file.
+"""
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from src.artifacts import content_digest
+
+CHUNK_SIZE = 64 * 1024
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (début, fin incluse) demandés par un en-tête Range. None si l'en-tête
+    doit être ignoré (syntaxe invalide, plusieurs plages) : le fichier
+    entier est alors envoyé. RangeNotSatisfiable si la plage est hors du fichier.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffixe : les N derniers octets
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparaison faible de If-None-Match (RFC 9110) : le préfixe W/ est ignoré"""
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+async def _read_range(path: str, start: int, end: int):
+    async with await anyio.open_file(path, 'rb') as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request: Request, path: str, media_type: str, filename: Optional[str] = None,
+                  immutable: bool = False) -> Response:
+    """
+    Réponse pour le téléchargement de `path`. L'ETag est le sha256 du contenu
+    (lu dans le nom des artefacts stockés par contenu) ; `immutable` autorise
+    la mise en cache longue par le client.
+    """
+    filename = filename or os.path.basename(path)
+    etag = f'"{content_digest(path)}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable" if immutable else "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(path)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range : la plage n'est servie que si le client a encore la même version
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update({
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            })
+            return StreamingResponse(_read_range(path, start, end), status_code=206, headers=headers,
+                                     media_type=media_type)
+
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
@@ -3,229 +3,516 @@ from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 from playwright.async_api import async_playwright
 import time
 import asyncio
 import aiohttp
 import aiofiles
+from contextlib import asynccontextmanager
 from urllib.parse import urlparse
 
+from src.browser_pool import BrowserPool
+from src.growlog_state import (COUNT_KNOWN_CARDS_JS, HEAD_KEYS_JS, HEAD_SIZE, ITEM_KEYS_JS, KNOWN_CARDS_TO_STOP,
+                               SET_KNOWN_CARDS_JS, GrowlogStateStore, merge_items)
+from src.logging_setup import log_sampling, sampled
+from src.metrics import CARDS, PHOTOS, stage
+from src.network_capture import RENDERED_ITEMS_JS, JsonResponseCapture, build_growlog_data, missing_rendered_items
+from src.photo_cache import PhotoCache
+from src.request_blocking import RequestBlocker
+from src.scrolling import scroll_to_end
+from src.testid_index import DataTestIdIndex, make_soup
+
+# Dossier de sortie dans le conteneur (voir Dockerfile)
+DEFAULT_OUTPUT_DIR = os.path.join('/app', 'output')
+
+
 class GrowWithJaneScraper:
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, max_concurrent_downloads: int = 8, download_timeout: float = 60,
+                 photo_cache: Optional[PhotoCache] = None, browser_pool: Optional[BrowserPool] = None,
+                 scroll_options: Optional[Dict] = None, block_resources: bool = True,
+                 blocker_options: Optional[Dict] = None, engine: str = "dom",
+                 state_store: Optional[GrowlogStateStore] = None, output_dir: str = DEFAULT_OUTPUT_DIR):
         self.base_url = "https://growithjane.com"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         self.verbose = verbose
+        self.max_concurrent_downloads = max(1, max_concurrent_downloads)
+        self.download_timeout = download_timeout
+        # Logger partagé, configuré par `setup_logging` : `verbose` ne fait que
+        # filtrer les messages, sans toucher au niveau ni aux handlers
         self.logger = logging.getLogger('grow_with_jane_scraper')
-        if verbose:
-            self.logger.setLevel(logging.INFO)
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-        
-        # Créer les dossiers pour les photos avec le chemin absolu
-        self.photos_dir = os.path.join('/app', 'output', 'photos')
-        os.makedirs(self.photos_dir, exist_ok=True)
-
-    async def _download_photo(self, url: str, session: aiohttp.ClientSession) -> Optional[str]:
-        """Télécharge une photo et retourne son chemin local"""
-        try:
-            # Générer un nom de fichier simple basé sur un timestamp
-            timestamp = int(time.time() * 1000)
-            filename = f"photo_{timestamp}.jpg"
-            
-            # Utiliser le chemin absolu pour le fichier local
-            local_path = os.path.join(self.photos_dir, filename)
-            
-            # Vérifier si la photo existe déjà
-            if os.path.exists(local_path):
-                if self.verbose:
-                    self.logger.info(f"Photo already exists: {filename}")
-                return local_path
-            
-            # Télécharger la photo
-            async with session.get(url) as response:
-                if response.status == 200:
-                    async with aiofiles.open(local_path, 'wb') as f:
-                        await f.write(await response.read())
-                    if self.verbose:
-                        self.logger.info(f"Downloaded photo: {filename}")
-                    return local_path
-                else:
-                    if self.verbose:
-                        self.logger.error(f"Failed to download photo: {url} (Status: {response.status})")
-                    return None
-        except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error downloading photo {url}: {str(e)}")
-            return None
 
-    async def _download_photos(self, urls: List[str]) -> List[Dict[str, str]]:
-        """Télécharge une liste de photos et retourne leurs chemins locaux"""
-        downloaded_photos = []
-        async with aiohttp.ClientSession() as session:
-            for url in urls:
-                local_path = await self._download_photo(url, session)
-                if local_path:
-                    downloaded_photos.append({
-                        "url": url,
-                        "local_path": local_path
-                    })
-        return downloaded_photos
-
-    async def get_growlog_data(self, growlog_url: str) -> Dict:
+        # Sans cache fourni, les photos vont dans `output_dir`/photos (créé au premier téléchargement)
+        self.output_dir = output_dir
+        self._photo_cache = photo_cache
+        self.browser_pool = browser_pool
+        # Paramètres de détection de fin de timeline (voir scrolling.scroll_to_end)
+        self.scroll_options = scroll_options or {}
+        # Filtre de requêtes : images, polices, médias et trackers sont annulés
+        # dans le navigateur (les photos sont téléchargées par notre client HTTP)
+        self.block_resources = block_resources
+        self.blocker_options = blocker_options or {}
+        # "network" : données reconstruites depuis les réponses JSON capturées,
+        # avec repli sur le DOM ; "dom" : analyse BeautifulSoup uniquement
+        if engine not in ("network", "dom"):
+            raise ValueError(f"Unknown extraction engine: {engine}")
+        self.engine = engine
+        # État par URL du dernier scraping (re-scraping incrémental), désactivé si None
+        self.state_store = state_store
+
+    @property
+    def photo_cache(self) -> PhotoCache:
+        if self._photo_cache is None:
+            self._photo_cache = PhotoCache(os.path.join(self.output_dir, 'photos'))
+        return self._photo_cache
+
+    async def _download_photo(self, url: str, session: aiohttp.ClientSession) -> str:
+        """Retourne le chemin local d'une photo via le cache (lève une exception en cas d'échec)"""
+        local_path = await self.photo_cache.fetch(url, session)
+        if self.verbose and sampled("photo"):
+            self.logger.info("Photo ready: %s", os.path.basename(local_path))
+        return local_path
+
+    async def _download_photos(self, urls: List[str]) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
         """
-        Récupère les données d'un growlog spécifique
+        Télécharge un lot de photos via une seule session HTTP, avec au plus
+        `max_concurrent_downloads` requêtes simultanées.
+
+        Retourne un dict url -> chemin local pour les photos téléchargées et la
+        liste des échecs ({"url", "error"}). Un échec n'interrompt pas le lot.
         """
+        unique_urls = list(dict.fromkeys(urls))
+        downloaded: Dict[str, str] = {}
+        failures: List[Dict[str, str]] = []
+        if not unique_urls:
+            return downloaded, failures
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+
+        async def fetch(url: str, session: aiohttp.ClientSession):
+            async with semaphore:
+                try:
+                    downloaded[url] = await self._download_photo(url, session)
+                except Exception as e:
+                    if self.verbose and sampled("photo_error"):
+                        self.logger.error("Error downloading photo %s: %s", url, e)
+                    failures.append({"url": url, "error": str(e) or type(e).__name__})
+
+        timeout = aiohttp.ClientTimeout(total=self.download_timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent_downloads)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector, headers=self.headers) as session:
+            with log_sampling(self.logger):
+                await asyncio.gather(*(fetch(url, session) for url in unique_urls))
+
+        PHOTOS.inc(len(downloaded), result="ok")
+        PHOTOS.inc(len(failures), result="failed")
+
+        # Respecter le budget disque du cache sans supprimer les photos de ce lot
+        await asyncio.to_thread(self.photo_cache.evict, downloaded.values())
+
+        if self.verbose:
+            self.logger.info("Downloaded %s/%s photos (%s failures)", len(downloaded), len(unique_urls), len(failures))
+            self.logger.info("Photo cache stats: %s", self.photo_cache.stats)
+        return downloaded, failures
+
+    @staticmethod
+    def _map_photos(urls: List[str], downloaded: Dict[str, str]) -> List[Dict[str, str]]:
+        """Associe les URLs d'une carte à leurs chemins locaux, dans l'ordre d'origine"""
+        return [{"url": url, "local_path": downloaded[url]} for url in urls if url in downloaded]
+
+    @asynccontextmanager
+    async def _browser_context(self):
+        """Contexte navigateur issu du pool partagé, ou d'un Chromium lancé pour ce scraping"""
+        if self.browser_pool is not None:
+            async with self.browser_pool.context() as context:
+                yield context
+            return
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                yield await browser.new_context()
+            finally:
+                await browser.close()
+
+    async def get_growlog_data(self, growlog_url: str, download_photos: bool = True) -> Dict:
+        """
+        Récupère les données d'un growlog spécifique.
+
+        Avec `download_photos=False`, les photos ne sont pas téléchargées :
+        `growlog_data["pending_photos"]` décrit le travail restant, à terminer
+        avec `download_growlog_photos` (étape séparée du pipeline bulk).
+
+        Avec un `state_store`, un growlog déjà vu n'est pas re-scrapé si la
+        tête de sa timeline n'a pas changé ; sinon le défilement s'arrête dès
+        que des cartes connues apparaissent et les nouvelles cartes sont
+        fusionnées avec le résultat précédent.
+
+        Les logs répétés pour chaque carte ou photo sont échantillonnés (voir
+        `log_sampling`) : leur volume reste borné quelle que soit la taille du
+        growlog.
+        """
+        with log_sampling(self.logger):
+            return await self._get_growlog_data(growlog_url, download_photos)
+
+    async def _get_growlog_data(self, growlog_url: str, download_photos: bool) -> Dict:
         try:
             if self.verbose:
-                self.logger.info(f"\n=== STARTING SCRAPING: {growlog_url} ===")
+                self.logger.info("\n=== STARTING SCRAPING: %s ===", growlog_url)
 
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
+            record = self.state_store.load(growlog_url) if self.state_store is not None else None
+            known_cards = record["card_keys"] if record else []
+            mode = "incremental" if known_cards else "full"
+            scroll_stats = None
+
+            async with self._browser_context() as context:
+                blocker = None
+                if self.block_resources:
+                    blocker = RequestBlocker(**self.blocker_options)
+                    await blocker.install(context)
                 page = await context.new_page()
-                
-                if self.verbose:
-                    self.logger.info("Loading page...")
-                await page.goto(growlog_url)
-                await page.wait_for_load_state('networkidle')
+                capture = None
+                # En mode incrémental, seule la tête de la timeline est rendue :
+                # l'extraction passe par le DOM, aligné sur les clés des cartes
+                if self.engine == "network" and mode == "full":
+                    capture = JsonResponseCapture()
+                    capture.attach(page)
 
                 if self.verbose:
-                    self.logger.info("Scrolling to load all content...")
-                
-                last_height = await page.evaluate('document.body.scrollHeight')
-                scroll_count = 0
-                while True:
-                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await asyncio.sleep(2)
-                    
-                    new_height = await page.evaluate('document.body.scrollHeight')
-                    if new_height == last_height:
-                        break
-                    last_height = new_height
-                    scroll_count += 1
-                    
-                    if self.verbose and scroll_count % 5 == 0:
-                        self.logger.info(f"Scrolled {scroll_count} times...")
+                    self.logger.info("Loading page...")
+                with stage("scrape", "page_load"):
+                    await page.goto(growlog_url)
+                    await page.wait_for_load_state('networkidle')
 
-                if self.verbose:
-                    self.logger.info("Content loaded, starting extraction...")
-                
-                content = await page.content()
-                soup = BeautifulSoup(content, 'html.parser')
-
-                # --- Extraction de l'environnement, du medium et du strain ---
-                environment = self._extract_environment(soup)
-                medium = self._extract_medium(soup)
-                if medium:
-                    environment["Medium"] = medium
-                strain = self._extract_strain(soup)
-
-                growlog_data = {
-                    "url": growlog_url,
-                    "title": self._extract_title(soup),
-                    "strain": strain,
-                    "growing_stage": self._extract_growing_stage(soup),
-                    "timeline": [],
-                    "environment": environment,
-                    "stages": self._extract_stages(soup)
-                }
-
-                # --- Extraction des changements de stage ---
-                stage_changes = []
-                sc_blocks = soup.find_all('div', attrs={'data-testid': 'growlog-page-timeline-stage-change'})
-                for sc in sc_blocks:
-                    date = self._extract_stage_change_date(sc)
-                    day_count = self._extract_stage_change_day_count(sc)
-                    stage_change_text = self._extract_stage_change_text(sc)
-                    plant_state = self._extract_stage_change_state(sc)
+                head_keys = await page.evaluate(HEAD_KEYS_JS, HEAD_SIZE)
+                if record and head_keys and head_keys == record["head_keys"]:
+                    mode = "unchanged"
                     if self.verbose:
-                        self.logger.info(f"Stage change found: date='{date}', day_count='{day_count}', text='{stage_change_text}', state='{plant_state}'")
-                    stage_changes.append({
-                        "date": date,
-                        "day_count": day_count,
-                        "stage_change": stage_change_text,
-                        "plant_state": plant_state
-                    })
-
-                # --- Extraction des cartes classiques de timeline ---
-                timeline_elements = soup.find_all('div', attrs={'data-testid': 'growlog-page-timeline-card'})
-                for element in timeline_elements:
-                    date = self._extract_date(element)
-                    actions = self._extract_actions(element)
-                    photo_urls = self._extract_event_photos(element)
-                    downloaded_photos = await self._download_photos(photo_urls)
-                    tree_logs = self._extract_tree_logs(element)
+                        self.logger.info("Timeline head unchanged since last scrape, reusing stored data")
+                else:
                     if self.verbose:
-                        self.logger.info(f"Timeline card: date='{date}', actions={actions}, tree_logs={tree_logs}")
-                    event = {
-                        "date": date,
-                        "actions": actions,
-                        "photos": downloaded_photos,
-                        "tree_logs": tree_logs,
-                        "plant_state": None
-                    }
-                    growlog_data["timeline"].append(event)
+                        self.logger.info("Scrolling to load all content...")
+
+                    stop_condition = None
+                    if mode == "incremental":
+                        await page.evaluate(SET_KNOWN_CARDS_JS, known_cards)
+                        needed = min(KNOWN_CARDS_TO_STOP, len(known_cards))
+
+                        async def stop_condition(p):
+                            return await p.evaluate(COUNT_KNOWN_CARDS_JS) >= needed
+
+                    with stage("scrape", "scroll"):
+                        scroll_stats = await scroll_to_end(page, stop_condition=stop_condition, **self.scroll_options)
+                    if scroll_stats.stop_reason != "stop_condition":
+                        # Fin de timeline atteinte sans recouvrement suffisant
+                        mode = "full"
+                    if self.verbose:
+                        self.logger.info("Scrolled %s times in %.1fs (%s, %s)", scroll_stats.steps,
+                                         scroll_stats.duration, scroll_stats.stop_reason, mode)
+                        self.logger.info("Content loaded, starting extraction...")
+
+                    item_keys = await page.evaluate(ITEM_KEYS_JS)
+                    parsed = None
+                    if capture is not None:
+                        with stage("scrape", "network_parse"):
+                            await capture.drain()
+                            capture.detach()
+                            await capture.capture_embedded_state(page)
+                            rendered = await page.evaluate(RENDERED_ITEMS_JS)
+                            parsed = self._parse_captured(capture, growlog_url, rendered)
+                    engine_used = "network" if parsed else "dom"
+                    content = None
+                    if not parsed:
+                        with stage("scrape", "page_content"):
+                            content = await page.content()
+
+            # Le navigateur est libéré avant l'analyse et les téléchargements
+            if mode == "unchanged":
+                growlog_data = record["growlog_data"]
+                card_photo_urls = record["card_photo_urls"]
+                main_photo_urls = record["main_photo_urls"]
+                card_keys, stage_keys = record["card_keys"], record["stage_keys"]
+                engine_used = None
+                new_cards = 0
+            else:
+                if parsed is None:
+                    with stage("scrape", "soup_parse"):
+                        soup = make_soup(content)
+                        parsed = self._parse_growlog(soup, growlog_url)
+                growlog_data, card_photo_urls, main_photo_urls = parsed
+                card_keys, stage_keys = item_keys["cards"], item_keys["stage_changes"]
+                if len(card_keys) != len(growlog_data["timeline"]):
+                    # Clés du DOM non alignées sur la timeline : pas d'incrémental au prochain passage
+                    card_keys = []
+                if len(stage_keys) != len(growlog_data["stage_changes"]):
+                    stage_keys = []
+                new_cards = len(growlog_data["timeline"])
+                if record:
+                    new_cards = self._reuse_stored_cards(growlog_data, card_photo_urls, card_keys, record)
+                if mode == "incremental":
+                    card_photo_urls, card_keys = self._merge_with_record(growlog_data, card_photo_urls,
+                                                                         card_keys, stage_keys, record)
+                    stage_keys = growlog_data.pop("_stage_keys")
+            CARDS.inc(new_cards, mode=mode)
+
+            growlog_data.setdefault("photos", [])
+            growlog_data["scrape_stats"] = {
+                "scroll": scroll_stats.as_dict() if scroll_stats else None,
+                "engine": engine_used,
+                "mode": mode,
+                "new_cards": new_cards,
+            }
+            if blocker is not None:
+                growlog_data["scrape_stats"]["blocked"] = blocker.report()
+            # Ce qu'il reste à faire après le navigateur : photos puis état du growlog
+            growlog_data["pending_photos"] = {
+                "url": growlog_url,
+                "cards": card_photo_urls,
+                "main": main_photo_urls,
+                "head_keys": head_keys,
+                "card_keys": card_keys,
+                "stage_keys": stage_keys,
+            }
+            if download_photos:
+                await self.download_growlog_photos(growlog_data)
+
+            if self.verbose:
+                self.logger.info("\n=== EXTRACTION SUMMARY ===")
+                self.logger.info("Title: %s", growlog_data['title'])
+                self.logger.info("Strain: %s", growlog_data['strain'])
+                self.logger.info("Growing Stage: %s", growlog_data['growing_stage'])
+                self.logger.info("Timeline Entries: %s", len(growlog_data['timeline']))
+                self.logger.info("Total Photos: %s", len(growlog_data['photos']))
+                self.logger.info("Environment Parameters: %s", len(growlog_data['environment']))
+                self.logger.info("Stages: %s", growlog_data['stages'])
+                if growlog_data.get("photo_errors"):
+                    self.logger.warning("Failed photo downloads: %s", len(growlog_data['photo_errors']))
+                self.logger.info("Scrape stats: %s", growlog_data['scrape_stats'])
+
+            return growlog_data
 
-                growlog_data["stage_changes"] = stage_changes
-                
-                # Télécharger les photos principales
-                main_photo_urls = self._extract_photos(soup)
-                growlog_data["photos"] = await self._download_photos(main_photo_urls)
-                
-                if self.verbose:
-                    self.logger.info("\n=== EXTRACTION SUMMARY ===")
-                    self.logger.info(f"Title: {growlog_data['title']}")
-                    self.logger.info(f"Strain: {growlog_data['strain']}")
-                    self.logger.info(f"Growing Stage: {growlog_data['growing_stage']}")
-                    self.logger.info(f"Timeline Entries: {len(growlog_data['timeline'])}")
-                    self.logger.info(f"Total Photos: {len(growlog_data['photos'])}")
-                    self.logger.info(f"Environment Parameters: {len(growlog_data['environment'])}")
-                    self.logger.info(f"Stages: {growlog_data['stages']}")
-                
-                await browser.close()
-                return growlog_data
-                
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error during scraping: {str(e)}")
+                self.logger.error("Error during scraping: %s", e)
             return {}
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    async def download_growlog_photos(self, growlog_data: Dict) -> List[Dict[str, str]]:
+        """
+        Télécharge en un seul lot les photos manquantes d'un growlog scrapé
+        (nouvelles cartes, fichiers évincés du cache), les rattache à leurs
+        cartes dans l'ordre puis enregistre l'état du growlog.
+        Retourne la liste des échecs, aussi placée dans `photo_errors`.
+        """
+        pending = growlog_data.pop("pending_photos", None)
+        if pending is None:
+            return growlog_data.get("photo_errors", [])
+        with stage("scrape", "photo_download"):
+            failures = await self._attach_photos(growlog_data, pending["cards"], pending["main"])
+        growlog_data["photo_errors"] = failures
+
+        if self.state_store is not None:
+            try:
+                self.state_store.save(pending["url"], growlog_data, pending["cards"], pending["main"],
+                                      pending["head_keys"], pending["card_keys"], pending["stage_keys"])
+            except OSError as e:
+                self.logger.warning("Could not save growlog state for %s: %s", pending['url'], e)
+        return failures
+
+    @staticmethod
+    def _photos_present(photos: List[Dict[str, str]], urls: List[str]) -> bool:
+        """Vrai si toutes les photos d'une carte sont déjà sur le disque"""
+        return [p["url"] for p in photos] == list(urls) and all(os.path.exists(p["local_path"]) for p in photos)
+
+    def _reuse_stored_cards(self, growlog_data: Dict, card_photo_urls: List[List[str]],
+                            card_keys: List[str], record: Dict) -> int:
+        """
+        Reprend les photos locales des cartes déjà connues. Retourne le nombre
+        de cartes nouvelles par rapport au dernier scraping.
+        """
+        stored = {
+            key: event for key, event in zip(record["card_keys"], record["growlog_data"]["timeline"])
+        }
+        new_cards = 0
+        for event, urls, key in zip(growlog_data["timeline"], card_photo_urls, card_keys):
+            previous = stored.get(key)
+            if previous is None:
+                new_cards += 1
+            elif self._photos_present(previous["photos"], urls):
+                event["photos"] = previous["photos"]
+        return new_cards
+
+    @staticmethod
+    def _merge_with_record(growlog_data: Dict, card_photo_urls: List[List[str]], card_keys: List[str],
+                           stage_keys: List[str], record: Dict) -> Tuple[List[List[str]], List[str]]:
+        """
+        Complète la tête de timeline fraîchement extraite avec la suite stockée
+        (cartes et changements de stage). Les clés fusionnées des changements de
+        stage sont placées temporairement dans `growlog_data["_stage_keys"]`.
+        """
+        stored = record["growlog_data"]
+        cards, card_keys, _ = merge_items(
+            list(zip(growlog_data["timeline"], card_photo_urls)), card_keys,
+            list(zip(stored["timeline"], record["card_photo_urls"])), record["card_keys"],
+        )
+        growlog_data["timeline"] = [event for event, _ in cards]
+        if stage_keys and record["stage_keys"]:
+            growlog_data["stage_changes"], growlog_data["_stage_keys"], _ = merge_items(
+                growlog_data["stage_changes"], stage_keys, stored["stage_changes"], record["stage_keys"],
+            )
+        else:
+            growlog_data["_stage_keys"] = stage_keys
+        return [urls for _, urls in cards], card_keys
+
+    async def _attach_photos(self, growlog_data: Dict, card_photo_urls: List[List[str]],
+                             main_photo_urls: List[str]) -> List[Dict[str, str]]:
+        """
+        Télécharge en un seul lot les photos qui ne sont pas déjà présentes
+        (cartes nouvelles ou fichiers évincés) et les rattache aux cartes.
+        """
+        missing = [
+            (event, urls) for event, urls in zip(growlog_data["timeline"], card_photo_urls)
+            if not self._photos_present(event["photos"], urls)
+        ]
+        main_missing = not self._photos_present(growlog_data.get("photos", []), main_photo_urls)
+        all_urls = [url for _, urls in missing for url in urls] + (main_photo_urls if main_missing else [])
+        downloaded, failures = await self._download_photos(all_urls)
+        for event, urls in missing:
+            event["photos"] = self._map_photos(urls, downloaded)
+        if main_missing:
+            growlog_data["photos"] = self._map_photos(main_photo_urls, downloaded)
+        return failures
+
+    def _parse_captured(self, capture: JsonResponseCapture, growlog_url: str,
+                        rendered: Dict) -> Optional[Tuple[Dict, List[List[str]], List[str]]]:
+        """
+        Construit `growlog_data` depuis les réponses JSON capturées. Retourne
+        None (repli sur le DOM) si le mapping échoue ou si ses éléments ne
+        correspondent pas à ceux affichés par la page (`RENDERED_ITEMS_JS` :
+        dates et nombre de photos de chaque carte).
+        """
+        try:
+            growlog_data = build_growlog_data(capture.payloads, growlog_url)
+            missing = missing_rendered_items(growlog_data, rendered) if growlog_data is not None else 0
+        except Exception as e:
+            self.logger.warning("Unable to map JSON responses, falling back to DOM: %s", e)
+            return None
+        if growlog_data is None:
+            if self.verbose:
+                self.logger.info("No timeline found in %s JSON responses, falling back to DOM", len(capture.payloads))
+            return None
+        if missing:
+            if self.verbose:
+                self.logger.info("%s rendered timeline items missing from JSON responses, falling back to DOM",
+                                 missing)
+            return None
+        if self.verbose:
+            self.logger.info("Built growlog from %s JSON responses (%s bytes)", len(capture.payloads), capture.bytes)
+        card_photo_urls = [event.pop("photo_urls") for event in growlog_data["timeline"]]
+        return growlog_data, card_photo_urls, []
+
+    def _parse_growlog(self, soup: BeautifulSoup, growlog_url: str,
+                       index: Optional[DataTestIdIndex] = None) -> Tuple[Dict, List[List[str]], List[str]]:
+        """
+        Construit `growlog_data` à partir du DOM rendu. Les photos des cartes ne
+        sont pas encore téléchargées : leurs URLs sont retournées à part, dans
+        l'ordre des cartes, avec celles des photos principales.
+
+        Le document est parcouru une seule fois pour construire l'index
+        `data-testid` ; les extracteurs ne travaillent ensuite que sur l'index.
+        """
+        if index is None:
+            index = DataTestIdIndex.build(soup)
+
+        # --- Extraction de l'environnement, du medium et du strain ---
+        environment = self._extract_environment(index)
+        medium = self._extract_medium(index)
+        if medium:
+            environment["Medium"] = medium
+        strain = self._extract_strain(index)
+
+        growlog_data = {
+            "url": growlog_url,
+            "title": self._extract_title(index),
+            "strain": strain,
+            "growing_stage": self._extract_growing_stage(index),
+            "timeline": [],
+            "environment": environment,
+            "stages": self._extract_stages(index)
+        }
+
+        # --- Extraction des changements de stage ---
+        stage_changes = []
+        sc_blocks = index.all('growlog-page-timeline-stage-change', 'div')
+        for sc_element in sc_blocks:
+            sc = index.scope(sc_element)
+            date = self._extract_stage_change_date(sc)
+            day_count = self._extract_stage_change_day_count(sc)
+            stage_change_text = self._extract_stage_change_text(sc)
+            plant_state = self._extract_stage_change_state(sc)
+            if self.verbose and sampled("stage_change"):
+                self.logger.info("Stage change found: date='%s', day_count='%s', text='%s', state='%s'", date, day_count, stage_change_text, plant_state)
+            stage_changes.append({
+                "date": date,
+                "day_count": day_count,
+                "stage_change": stage_change_text,
+                "plant_state": plant_state
+            })
+
+        # --- Extraction des cartes classiques de timeline ---
+        timeline_elements = index.all('growlog-page-timeline-card', 'div')
+        card_photo_urls = []
+        for card in timeline_elements:
+            element = index.scope(card)
+            date = self._extract_date(element)
+            actions = self._extract_actions(element)
+            photo_urls = self._extract_event_photos(element)
+            tree_logs = self._extract_tree_logs(element)
+            if self.verbose and sampled("card"):
+                self.logger.info("Timeline card: date='%s', actions=%s, tree_logs=%s", date, actions, tree_logs)
+            event = {
+                "date": date,
+                "actions": actions,
+                "photos": [],
+                "tree_logs": tree_logs,
+                "plant_state": None
+            }
+            growlog_data["timeline"].append(event)
+            card_photo_urls.append(photo_urls)
+
+        growlog_data["stage_changes"] = stage_changes
+        return growlog_data, card_photo_urls, self._extract_photos(index)
+
+    def _extract_title(self, index: DataTestIdIndex) -> str:
         """Extrait le titre du growlog"""
         try:
             if self.verbose:
                 self.logger.info("Searching for title element...")
-                self.logger.info(f"Page title: {soup.title.string if soup.title else 'No title found'}")
-            
-            title_elem = soup.find('h1', class_='text-2xl')
+
+            all_h1 = index.tags('h1')
+            title_elem = next((h1 for h1 in all_h1 if 'text-2xl' in h1.get('class', [])), None)
             if title_elem:
                 if self.verbose:
-                    self.logger.info(f"Found title element: {title_elem}")
+                    self.logger.info("Found title element: %s", title_elem)
                 title = title_elem.text.strip()
                 if self.verbose:
-                    self.logger.info(f"Extracted title: {title}")
+                    self.logger.info("Extracted title: %s", title)
                 return title
             elif self.verbose:
                 self.logger.warning("No title element found with class 'text-2xl'")
-                # Chercher tous les h1 pour debug
-                all_h1 = soup.find_all('h1')
-                self.logger.info(f"All h1 elements found: {[h1.text.strip() for h1 in all_h1]}")
+                # Lister tous les h1 pour debug
+                self.logger.info("All h1 elements found: %s", [h1.text.strip() for h1 in all_h1])
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting title: {str(e)}")
+                self.logger.error("Error extracting title: %s", e)
         return ""
 
-    def _extract_strain(self, soup: BeautifulSoup) -> str:
+    def _extract_strain(self, index: DataTestIdIndex) -> str:
         try:
-            strain_section = soup.find('div', attrs={'data-testid': 'growlog-page-strain-breeder'})
+            strain_section = index.first('growlog-page-strain-breeder', 'div')
             if strain_section:
-                strain_name_el = strain_section.find('span', attrs={'data-testid': 'growlog-page-strain-breeder-strain-name'})
+                strain_name_el = index.first('growlog-page-strain-breeder-strain-name', 'span')
                 if strain_name_el:
                     # Cherche le nom juste après le label "Strain"
                     value_el = strain_section.find('span', class_='text-lg font-bold')
@@ -233,36 +520,37 @@ class GrowWithJaneScraper:
                         return value_el.text.strip()
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting strain: {str(e)}")
+                self.logger.error("Error extracting strain: %s", e)
         return "Unknown"
 
-    def _extract_growing_stage(self, soup: BeautifulSoup) -> str:
+    def _extract_growing_stage(self, index: DataTestIdIndex) -> str:
         """Extrait le stade de croissance actuel"""
         try:
-            stage_elem = soup.find('div', string='Tree Stages')
-            if stage_elem:
+            stage_elems = index.labelled('Tree Stages')
+            if stage_elems:
+                stage_elem = stage_elems[0]
                 stage_div = stage_elem.find_next('div')
                 if stage_div:
                     stage = stage_div.text.strip()
                     if self.verbose:
-                        self.logger.info(f"Extracted growing stage: {stage}")
+                        self.logger.info("Extracted growing stage: %s", stage)
                     return stage
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting growing stage: {str(e)}")
+                self.logger.error("Error extracting growing stage: %s", e)
         return ""
 
-    def _extract_timeline(self, soup: BeautifulSoup) -> List[Dict]:
+    def _extract_timeline(self, index: DataTestIdIndex) -> List[Dict]:
         """Extrait la timeline des événements"""
         timeline = []
         try:
             if self.verbose:
                 self.logger.info("\n=== TIMELINE EXTRACTION ===")
             
-            timeline_elements = soup.find_all('div', attrs={'data-testid': 'growlog-page-timeline-card'})
+            timeline_elements = [index.scope(card) for card in index.all('growlog-page-timeline-card', 'div')]
             
             if self.verbose:
-                self.logger.info(f"Found {len(timeline_elements)} timeline entries")
+                self.logger.info("Found %s timeline entries", len(timeline_elements))
             
             for i, element in enumerate(timeline_elements, 1):
                 try:
@@ -276,46 +564,46 @@ class GrowWithJaneScraper:
                         "photos": photos
                     }
                     
-                    if self.verbose:
-                        self.logger.info(f"\nEntry {i}:")
-                        self.logger.info(f"  Date: {date}")
+                    if self.verbose and sampled("card"):
+                        self.logger.info("\nEntry %s:", i)
+                        self.logger.info("  Date: %s", date)
                         if actions:
-                            self.logger.info(f"  Actions: {', '.join(actions)}")
+                            self.logger.info("  Actions: %s", ', '.join(actions))
                         if photos:
-                            self.logger.info(f"  Photos: {len(photos)} found")
+                            self.logger.info("  Photos: %s found", len(photos))
                     
                     timeline.append(event)
                 except Exception as e:
-                    if self.verbose:
-                        self.logger.error(f"Error processing entry {i}: {str(e)}")
+                    if self.verbose and sampled("card_error"):
+                        self.logger.error("Error processing entry %s: %s", i, e)
                     continue
                 
             return timeline
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting timeline: {str(e)}")
+                self.logger.error("Error extracting timeline: %s", e)
             return []
 
-    def _extract_date(self, element: BeautifulSoup) -> str:
+    def _extract_date(self, element: DataTestIdIndex) -> str:
         """Extrait la date d'un événement"""
         try:
-            date_elem = element.find('div', attrs={'data-testid': 'growlog-page-timeline-card-date'})
+            date_elem = element.first('growlog-page-timeline-card-date', 'div')
             if date_elem:
                 date_div = date_elem.find('div', class_='')
                 if date_div:
                     return date_div.text.strip()
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting date: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting date: %s", e)
         return ""
 
-    def _extract_actions(self, element: BeautifulSoup) -> List[str]:
+    def _extract_actions(self, element: DataTestIdIndex) -> List[str]:
         """Extrait les actions effectuées"""
         actions = []
         try:
-            reminders_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-reminders'})
+            reminders_section = element.first('growlog-page-timeline-reminders', 'div')
             if reminders_section:
-                reminder_items = reminders_section.find_all('div', attrs={'data-testid': 'growlog-page-timeline-reminder-item'})
+                reminder_items = element.all('growlog-page-timeline-reminder-item', 'div')
                 
                 for item in reminder_items:
                     try:
@@ -326,141 +614,141 @@ class GrowWithJaneScraper:
                             action = f"{action_name.text.strip()}: {action_value.text.strip()}"
                             actions.append(action)
                     except Exception as e:
-                        if self.verbose:
-                            self.logger.error(f"Error processing action: {str(e)}")
+                        if self.verbose and sampled("card_error"):
+                            self.logger.error("Error processing action: %s", e)
                         continue
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting actions: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting actions: %s", e)
         return actions
 
-    def _extract_photos(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_photos(self, index: DataTestIdIndex) -> List[str]:
         """Extrait les URLs des photos"""
         photos = []
-        photo_elements = soup.find_all('img', class_='growlog-photo')
+        photo_elements = [img for img in index.tags('img') if 'growlog-photo' in img.get('class', [])]
         for photo in photo_elements:
             if photo.get('src'):
                 photos.append(photo['src'])
         if self.verbose:
-            self.logger.info(f"Extracted {len(photos)} photos")
+            self.logger.info("Extracted %s photos", len(photos))
         return photos
 
-    def _extract_event_photos(self, element: BeautifulSoup) -> List[str]:
+    def _extract_event_photos(self, element: DataTestIdIndex) -> List[str]:
         """Extrait les URLs des photos d'un événement spécifique"""
         photos = []
         try:
-            photos_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-photos'})
+            photos_section = element.first('growlog-page-timeline-photos', 'div')
             if photos_section:
                 photo_items = photos_section.find_all('img', class_='h-[260px]')
                 for photo in photo_items:
                     if photo.get('src'):
                         photos.append(photo['src'])
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting photos: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting photos: %s", e)
         return photos
 
-    def _extract_environment(self, soup: BeautifulSoup) -> dict:
+    def _extract_environment(self, index: DataTestIdIndex) -> dict:
         environment = {}
         try:
-            env_section = soup.find('div', attrs={'data-testid': 'growlog-page-environment-details'})
+            env_section = index.first('growlog-page-environment-details', 'div')
             if env_section:
                 # Name
-                name_item = env_section.find('div', attrs={'data-testid': 'growlog-page-environment-details-name'})
+                name_item = index.first('growlog-page-environment-details-name', 'div')
                 if name_item:
                     name_value = name_item.find('span', attrs={'data-testid': 'growlog-page-environment-details-name'})
                     if name_value:
                         environment["Name"] = name_value.text.strip()
                 # Type
-                type_item = env_section.find('div', attrs={'data-testid': 'growlog-page-environment-details-type'})
+                type_item = index.first('growlog-page-environment-details-type', 'div')
                 if type_item:
                     type_value = type_item.find('span', class_='text-lg')
                     if type_value:
                         environment["Type"] = type_value.text.strip()
                 # Exposure Time
-                exposure_item = env_section.find('div', attrs={'data-testid': 'growlog-page-environment-details-exposure-time'})
+                exposure_item = index.first('growlog-page-environment-details-exposure-time', 'div')
                 if exposure_item:
                     exposure_value = exposure_item.find('span', class_='text-lg')
                     if exposure_value:
                         environment["Exposure Time"] = exposure_value.text.strip()
                 # Environment Size
-                size_item = env_section.find('div', attrs={'data-testid': 'growlog-page-environment-details-indoor-size'})
+                size_item = index.first('growlog-page-environment-details-indoor-size', 'div')
                 if size_item:
                     size_value = size_item.find('span', class_='text-lg')
                     if size_value:
                         environment["Environment Size"] = size_value.text.strip()
                 # Lights
-                lights_item = env_section.find('div', attrs={'data-testid': 'growlog-page-environment-details-lights'})
+                lights_item = index.first('growlog-page-environment-details-lights', 'div')
                 if lights_item:
                     lights_value = lights_item.find('p', attrs={'data-testid': 'growlog-page-environment-details-lights-item'})
                     if lights_value:
                         environment["Lights"] = lights_value.text.strip()
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting environment: {str(e)}")
+                self.logger.error("Error extracting environment: %s", e)
         return environment
 
-    def _extract_tree_logs(self, element: BeautifulSoup) -> dict:
+    def _extract_tree_logs(self, element: DataTestIdIndex) -> dict:
         """Extrait les Tree Logs d'une carte de timeline"""
         tree_logs = {}
         try:
-            tree_log_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-tree-log'})
+            tree_log_section = element.first('growlog-page-timeline-tree-log', 'div')
             if not tree_log_section:
-                if self.verbose:
+                if self.verbose and sampled("tree_log"):
                     self.logger.info("No tree log section found in this card")
                 return tree_logs
-            log_items = tree_log_section.find_all('div', attrs={'data-testid': 'growlog-page-timeline-log-item'})
-            if self.verbose:
-                self.logger.info(f"Found {len(log_items)} tree log items")
+            log_items = element.all('growlog-page-timeline-log-item', 'div')
+            if self.verbose and sampled("tree_log"):
+                self.logger.info("Found %s tree log items", len(log_items))
             for item in log_items:
                 label_el = item.find('div', attrs={'data-testid': 'growlog-page-timeline-log-item-label'})
                 value_el = item.find('div', attrs={'data-testid': 'growlog-page-timeline-log-item-value'})
                 label = label_el.text.strip() if label_el else ""
                 value = value_el.text.strip() if value_el else ""
-                if self.verbose:
-                    self.logger.info(f"Tree log item: label='{label}', value='{value}'")
+                if self.verbose and sampled("tree_log_item"):
+                    self.logger.info("Tree log item: label='%s', value='%s'", label, value)
                 if label and value:
                     tree_logs[label] = value
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting tree logs: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting tree logs: %s", e)
         return tree_logs
 
-    def _extract_stage_change_date(self, element: BeautifulSoup) -> str:
+    def _extract_stage_change_date(self, element: DataTestIdIndex) -> str:
         try:
-            date_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-stage-change-date'})
+            date_section = element.first('growlog-page-timeline-stage-change-date', 'div')
             date_div = date_section.find('div', class_='') if date_section else None
             return date_div.text.strip() if date_div else ""
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting stage change date: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting stage change date: %s", e)
             return ""
 
-    def _extract_stage_change_day_count(self, element: BeautifulSoup) -> str:
+    def _extract_stage_change_day_count(self, element: DataTestIdIndex) -> str:
         try:
-            date_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-stage-change-date'})
+            date_section = element.first('growlog-page-timeline-stage-change-date', 'div')
             day_count_span = date_section.find('span') if date_section else None
             return day_count_span.text.strip() if day_count_span else ""
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting stage change day count: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting stage change day count: %s", e)
             return ""
 
-    def _extract_stage_change_text(self, element: BeautifulSoup) -> str:
+    def _extract_stage_change_text(self, element: DataTestIdIndex) -> str:
         try:
-            stage_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-stage-change-stage'})
+            stage_section = element.first('growlog-page-timeline-stage-change-stage', 'div')
             if stage_section:
                 text_span = stage_section.find('span')
                 return text_span.text.strip() if text_span else ""
             return ""
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting stage change text: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting stage change text: %s", e)
             return ""
 
-    def _extract_stage_change_state(self, element: BeautifulSoup) -> str:
+    def _extract_stage_change_state(self, element: DataTestIdIndex) -> str:
         try:
-            stage_section = element.find('div', attrs={'data-testid': 'growlog-page-timeline-stage-change-stage'})
+            stage_section = element.first('growlog-page-timeline-stage-change-stage', 'div')
             if stage_section:
                 icon = stage_section.find('i')
                 if icon and icon.has_attr('class'):
@@ -469,16 +757,16 @@ class GrowWithJaneScraper:
                             return c.replace('icon-', '')
             return ""
         except Exception as e:
-            if self.verbose:
-                self.logger.error(f"Error extracting stage change state: {str(e)}")
+            if self.verbose and sampled("card_error"):
+                self.logger.error("Error extracting stage change state: %s", e)
             return ""
 
-    def _extract_stages(self, soup: BeautifulSoup) -> list:
+    def _extract_stages(self, index: DataTestIdIndex) -> list:
         stages = []
         try:
-            stages_section = soup.find('div', attrs={'data-testid': 'growlog-page-tree-stages'})
+            stages_section = index.first('growlog-page-tree-stages', 'div')
             if stages_section:
-                stage_items = stages_section.find_all('div', attrs={'data-testid': 'growlog-page-tree-stages-item'})
+                stage_items = index.all('growlog-page-tree-stages-item', 'div')
                 for item in stage_items:
                     name_el = item.find('span', attrs={'data-testid': 'growlog-page-tree-stages-item-name-value'})
                     date_el = item.find('div', attrs={'data-testid': 'growlog-page-tree-stages-item-name-date'})
@@ -488,17 +776,17 @@ class GrowWithJaneScraper:
                         stages.append({"name": name, "date": date})
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting stages: {str(e)}")
+                self.logger.error("Error extracting stages: %s", e)
         return stages
 
-    def _extract_medium(self, soup: BeautifulSoup) -> str:
+    def _extract_medium(self, index: DataTestIdIndex) -> str:
         try:
-            medium_section = soup.find('span', attrs={'data-testid': 'growlog-page-medium-nutrients-name-value-name'})
+            medium_section = index.first('growlog-page-medium-nutrients-name-value-name', 'span')
             if medium_section:
                 return medium_section.text.strip()
         except Exception as e:
             if self.verbose:
-                self.logger.error(f"Error extracting medium: {str(e)}")
+                self.logger.error("Error extracting medium: %s", e)
         return ""
 
     def save_to_json(self, data: Dict, filename: str):
@@ -506,7 +794,7 @@ class GrowWithJaneScraper:
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
         if self.verbose:
-            self.logger.info(f"Data saved to {filename}")
+            self.logger.info("Data saved to %s", filename)
 
 async def main():
     scraper = GrowWithJaneScraper(verbose=True)
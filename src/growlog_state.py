@@ -0,0 +1,123 @@
+"""Growlog state module.
+Per-URL record of the last scrape, used to skip unchanged growlogs and to
+re-scrape active ones incrementally.
+
+Growlogs are append-only diaries displayed newest first: an incremental
+scrape only scrolls until it reaches cards that are already known, then
+merges the fresh head of the timeline with the stored tail.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Nombre d'éléments en tête de timeline comparés pour détecter un growlog inchangé
+HEAD_SIZE = 5
+# Nombre de cartes déjà connues à atteindre avant d'arrêter le défilement
+KNOWN_CARDS_TO_STOP = 3
+
+# Clé d'un élément de timeline dans la page : texte de sa date + première photo
+_ITEM_KEY_JS = """
+const itemKey = (el) => {
+    const date = el.querySelector("[data-testid$='-date']");
+    const img = el.querySelector("img");
+    return (date ? date.textContent.trim() : "") + "|" + (img ? img.getAttribute("src") || "" : "");
+};
+"""
+
+HEAD_KEYS_JS = """
+(n) => {
+""" + _ITEM_KEY_JS + """
+    return Array.from(document.querySelectorAll(
+        "div[data-testid='growlog-page-timeline-card'], div[data-testid='growlog-page-timeline-stage-change']"
+    )).slice(0, n).map(el => el.getAttribute("data-testid") + ":" + itemKey(el));
+}
+"""
+
+ITEM_KEYS_JS = """
+() => {
+""" + _ITEM_KEY_JS + """
+    const keys = (testid) => Array.from(document.querySelectorAll(`div[data-testid='${testid}']`)).map(itemKey);
+    return {
+        cards: keys("growlog-page-timeline-card"),
+        stage_changes: keys("growlog-page-timeline-stage-change"),
+    };
+}
+"""
+
+SET_KNOWN_CARDS_JS = "keys => { window.__gwjKnownCards = new Set(keys); }"
+
+COUNT_KNOWN_CARDS_JS = """
+() => {
+""" + _ITEM_KEY_JS + """
+    const known = window.__gwjKnownCards || new Set();
+    let count = 0;
+    for (const el of document.querySelectorAll("div[data-testid='growlog-page-timeline-card']")) {
+        if (known.has(itemKey(el))) count++;
+    }
+    return count;
+}
+"""
+
+
+class GrowlogStateStore:
+    """Un fichier JSON par URL de growlog, écrit de façon atomique"""
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.rstrip('/').encode('utf-8')).hexdigest()
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    def load(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, url: str, growlog_data: Dict, card_photo_urls: List[List[str]], main_photo_urls: List[str],
+             head_keys: List[str], card_keys: List[str], stage_keys: List[str]):
+        record = {
+            "url": url,
+            "updated_at": time.time(),
+            "head_keys": head_keys,
+            "card_keys": card_keys,
+            "stage_keys": stage_keys,
+            "card_photo_urls": card_photo_urls,
+            "main_photo_urls": main_photo_urls,
+            "growlog_data": growlog_data,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(url))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def merge_items(fresh: List, fresh_keys: List[str], stored: List, stored_keys: List[str]) -> Tuple[List, List[str], int]:
+    """
+    Fusionne la tête fraîchement extraite d'une liste avec la liste stockée.
+
+    Les éléments frais remplacent tout ce qui précède, dans la liste stockée,
+    le dernier élément frais déjà connu ; la suite de la liste stockée est
+    conservée. Retourne (éléments, clés, nombre d'éléments nouveaux).
+    Sans recouvrement, la liste fraîche est considérée comme complète.
+    """
+    position = {key: i for i, key in enumerate(stored_keys)}
+    known = [position[key] for key in fresh_keys if key in position]
+    new_count = sum(1 for key in fresh_keys if key not in position)
+    if not known:
+        return list(fresh), list(fresh_keys), new_count
+    tail_start = max(known) + 1
+    return list(fresh) + list(stored[tail_start:]), list(fresh_keys) + list(stored_keys[tail_start:]), new_count
@@ -0,0 +1,141 @@
+"""Image preparation module.
+Downscales and recompresses growlog photos to print resolution before they
+are embedded in the PDF: WeasyPrint then decodes and embeds small JPEGs
+instead of multi-megapixel originals.
+
+Derivatives are cached on disk, keyed by the content of the source file
+and the preparation options: the photo cache refreshing a file's mtime
+does not invalidate its derivative.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageOps
+
+from src.render_cache import file_digest
+
+logger = logging.getLogger('image_prep')
+
+# Pixels CSS par pouce (référence CSS, utilisée par WeasyPrint)
+CSS_PX_PER_INCH = 96
+TMP_PREFIX = '.tmp-'
+
+
+@dataclass(frozen=True)
+class ImagePrepOptions:
+    """
+    Taille de l'emplacement d'une photo dans `template.html` (pixels CSS),
+    résolution cible et qualité JPEG des dérivés.
+
+    En impression, les photos occupent 45 % de la largeur utile sur 200px de
+    haut (`object-fit: cover`), soit environ 300x200 px CSS.
+    """
+    slot_width: int = 300
+    slot_height: int = 200
+    dpi: int = 200
+    quality: int = 80
+    cache_dir: str = os.path.join('/app', 'output', 'photos', 'derived')
+
+    @property
+    def target_size(self):
+        scale = self.dpi / CSS_PX_PER_INCH
+        return round(self.slot_width * scale), round(self.slot_height * scale)
+
+
+def derivative_path(source: str, options: ImagePrepOptions) -> str:
+    digest = file_digest(source)
+    if digest is None:
+        raise FileNotFoundError(source)
+    params = asdict(options)
+    params.pop('cache_dir')
+    key = f"{digest}|{sorted(params.items())}"
+    return os.path.join(options.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.jpg')
+
+
+def prepare_image(source: str, options: ImagePrepOptions) -> str:
+    """
+    Retourne le chemin d'un dérivé couvrant l'emplacement à la résolution
+    cible (jamais agrandi). Si le dérivé n'est pas plus léger que l'original,
+    l'original est utilisé.
+    """
+    target = derivative_path(source, options)
+    if os.path.exists(target):
+        # Date d'utilisation pour l'éviction LRU du dossier des dérivés
+        try:
+            os.utime(target, None)
+        except OSError:
+            pass
+        return target
+
+    target_w, target_h = options.target_size
+    with Image.open(source) as img:
+        # Décodage JPEG directement à une échelle réduite (1/2, 1/4, 1/8)
+        img.draft('RGB', (target_w, target_h))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        # `object-fit: cover` : l'image doit couvrir les deux dimensions
+        scale = max(target_w / img.width, target_h / img.height)
+        if scale < 1:
+            img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                             Image.LANCZOS)
+        os.makedirs(options.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=options.cache_dir, prefix=TMP_PREFIX, suffix='.jpg')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, 'JPEG', quality=options.quality, optimize=True, progressive=True)
+            if os.path.getsize(tmp_path) >= os.path.getsize(source):
+                os.remove(tmp_path)
+                return source
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return target
+
+
+def prepare_entries(entries: List[Dict], options: ImagePrepOptions, max_workers: Optional[int] = None) -> Dict:
+    """
+    Remplace, dans les entrées du rapport, le `local_path` de chaque image par
+    son dérivé (l'original reste dans `original_path`). Les images sont
+    traitées en parallèle ; une image illisible garde son original.
+    Retourne les statistiques de la préparation.
+    """
+    start = time.perf_counter()
+    images = [img for entry in entries for img in entry.get('images', []) if img.get('local_path')]
+    sources = list(dict.fromkeys(img['local_path'] for img in images if os.path.exists(img['local_path'])))
+
+    def prepare(source):
+        try:
+            return prepare_image(source, options)
+        except Exception as e:
+            logger.warning("Could not prepare image %s: %s", source, e)
+            return source
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1)) as executor:
+        prepared = dict(zip(sources, executor.map(prepare, sources)))
+
+    for img in images:
+        derived = prepared.get(img['local_path'])
+        if derived and derived != img['local_path']:
+            img['original_path'] = img['local_path']
+            img['local_path'] = derived
+
+    bytes_before = sum(os.path.getsize(source) for source in sources)
+    bytes_after = sum(os.path.getsize(path) for path in prepared.values())
+    stats = {
+        "images": len(sources),
+        "derived": sum(1 for source, path in prepared.items() if source != path),
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "seconds": time.perf_counter() - start,
+    }
+    logger.info("Prepared %s images: %s -> %s bytes in %.2fs", stats['images'], bytes_before, bytes_after, stats['seconds'])
+    return stats
@@ -0,0 +1,213 @@
+"""Jobs module.
+Asynchronous job queue behind the web API: a submit returns a job id at
+once, an in-process worker pool runs the job, and its stage, status and
+artifact path are stored in a SQLite job table so finished artifacts can be
+served again, even after a restart, without redoing any work.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.logging_setup import log_sampling
+
+logger = logging.getLogger('jobs')
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Un handler reçoit le job (id, kind, params...) et une fonction pour publier
+# l'étape en cours ; il retourne le chemin de l'artefact produit
+JobHandler = Callable[[Dict, Callable[[str], None]], Awaitable[str]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    stage TEXT,
+    error TEXT,
+    artifact TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status);
+"""
+
+
+class JobStore:
+    """Table des jobs (SQLite), partagée entre les workers d'un même processus"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, args=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    @staticmethod
+    def _as_dict(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def create(self, kind: str, params: Dict, dedupe_key: Optional[str] = None) -> Dict:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, params, dedupe_key, status, stage, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), dedupe_key, QUEUED, QUEUED, time.time()),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._as_dict(rows[0] if rows else None)
+
+    def find_active(self, kind: str, dedupe_key: str) -> Optional[Dict]:
+        """Job identique encore en attente ou en cours"""
+        rows = self._execute(
+            "SELECT * FROM jobs WHERE kind = ? AND dedupe_key = ? AND status IN (?, ?) ORDER BY created_at DESC LIMIT 1",
+            (kind, dedupe_key, QUEUED, RUNNING),
+        )
+        return self._as_dict(rows[0] if rows else None)
+
+    def find_by_artifact_name(self, kind: str, name: str) -> Optional[Dict]:
+        """Dernier job terminé dont l'artefact porte ce nom de fichier"""
+        rows = self._execute(
+            "SELECT * FROM jobs WHERE kind = ? AND status = ? AND artifact LIKE ? ORDER BY finished_at DESC",
+            (kind, DONE, f"%{name}"),
+        )
+        for row in rows:
+            if os.path.basename(row["artifact"]) == name:
+                return self._as_dict(row)
+        return None
+
+    def unfinished(self) -> List[Dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING))
+        return [self._as_dict(row) for row in rows]
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    File de jobs servie par `concurrency` workers asyncio.
+
+    Une soumission identique (même `dedupe_key`) à un job en attente ou en
+    cours retourne ce job au lieu d'en créer un nouveau. Au démarrage, les
+    jobs interrompus par un arrêt du serveur sont remis en file.
+    """
+
+    def __init__(self, store: JobStore, handlers: Dict[str, JobHandler], concurrency: int = 2):
+        self.store = store
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._finished: Dict[str, asyncio.Event] = {}
+
+    async def start(self):
+        if self._workers:
+            return
+        for job in self.store.unfinished():
+            logger.info("Resuming interrupted job %s (%s)", job['id'], job['kind'])
+            self.store.update(job["id"], status=QUEUED, stage=QUEUED)
+            self._enqueue(job["id"])
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _enqueue(self, job_id: str):
+        self._finished.setdefault(job_id, asyncio.Event())
+        self._queue.put_nowait(job_id)
+
+    def submit(self, kind: str, params: Dict, dedupe_key: Optional[str] = None) -> Dict:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if dedupe_key is not None:
+            active = self.store.find_active(kind, dedupe_key)
+            if active is not None:
+                return active
+        job = self.store.create(kind, params, dedupe_key)
+        self._enqueue(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str) -> Dict:
+        """Attend la fin d'un job soumis dans ce processus"""
+        event = self._finished.get(job_id)
+        if event is not None:
+            await event.wait()
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            return
+        self.store.update(job_id, status=RUNNING, stage=RUNNING, started_at=time.time())
+
+        def set_stage(stage: str):
+            self.store.update(job_id, stage=stage)
+
+        try:
+            # Une portée d'échantillonnage des logs répétés par job
+            with log_sampling(logger):
+                artifact = await self.handlers[job["kind"]](job, set_stage)
+            self.store.update(job_id, status=DONE, stage=DONE, artifact=artifact, finished_at=time.time())
+            logger.info("Job %s (%s) done: %s", job_id, job['kind'], artifact)
+        except asyncio.CancelledError:
+            # Arrêt du serveur : le job sera repris au prochain démarrage
+            raise
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, stage=FAILED, error=str(e) or type(e).__name__,
+                              finished_at=time.time())
+            logger.error("Job %s (%s) failed: %s", job_id, job['kind'], e)
+        finally:
+            event = self._finished.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def stats(self) -> Dict:
+        return {"workers": self.concurrency, "queued_in_memory": self._queue.qsize(), "jobs": self.store.counts()}
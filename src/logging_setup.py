@@ -0,0 +1,136 @@
+"""Logging setup module.
+Configuration centrale du logging (un seul handler sur le logger racine,
+texte ou JSON) et échantillonnage des logs émis pour chaque carte ou photo.
+
+Les modules ne configurent jamais le logging eux-mêmes : seuls les points
+d'entrée (application web, CLI, workers de rendu) appellent `setup_logging`.
+"""
+import contextvars
+import json
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+TEXT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Niveau et format du dernier `setup_logging`, repris par les workers de rendu
+_settings = (None, None)
+
+# Attributs standard d'un LogRecord : tout le reste vient de `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement : ts, level, logger, message, champs `extra` et exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> logging.Handler:
+    """
+    Installe un unique handler sur le logger racine, au niveau `level`
+    (défaut : `LOG_LEVEL`, INFO) et au format `fmt`, "text" ou "json"
+    (défaut : `LOG_FORMAT`, text).
+
+    Idempotent : un nouvel appel remplace le handler installé précédemment
+    au lieu d'en ajouter un, et retire ceux d'un éventuel `basicConfig`.
+    """
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown log format: {fmt}")
+
+    handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+    root = logging.getLogger()
+    for previous in list(root.handlers):
+        root.removeHandler(previous)
+        previous.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+    global _settings
+    _settings = (level, fmt)
+    return handler
+
+
+def logging_settings():
+    """(niveau, format) du processus, à passer à `setup_logging` dans un processus fils"""
+    return _settings
+
+
+class LogSampler:
+    """
+    Décide, par étape ("card", "photo"...), quels logs répétés émettre : les
+    `first` premiers, puis un sur `every` (0 : aucun). Le volume de logs par
+    requête reste ainsi borné quelle que soit la taille du growlog.
+    """
+
+    def __init__(self, first: Optional[int] = None, every: Optional[int] = None):
+        self.first = int(os.getenv("LOG_SAMPLE_FIRST", 5)) if first is None else first
+        self.every = int(os.getenv("LOG_SAMPLE_EVERY", 0)) if every is None else every
+        self.seen: Dict[str, int] = {}
+        self.emitted: Dict[str, int] = {}
+
+    def allow(self, stage: str) -> bool:
+        n = self.seen.get(stage, 0)
+        self.seen[stage] = n + 1
+        if n < self.first or (self.every > 0 and (n - self.first + 1) % self.every == 0):
+            self.emitted[stage] = self.emitted.get(stage, 0) + 1
+            return True
+        return False
+
+    def suppressed(self) -> Dict[str, int]:
+        """Nombre de logs écartés par étape"""
+        return {stage: n - self.emitted.get(stage, 0) for stage, n in self.seen.items()
+                if n > self.emitted.get(stage, 0)}
+
+
+_current_sampler: contextvars.ContextVar[Optional[LogSampler]] = contextvars.ContextVar('log_sampler', default=None)
+
+
+@contextmanager
+def log_sampling(logger: logging.Logger, first: Optional[int] = None, every: Optional[int] = None):
+    """
+    Ouvre une portée d'échantillonnage (une requête, un growlog) ; `sampled`
+    y consulte son `LogSampler`. Une portée imbriquée réutilise celle qui
+    l'englobe, et seule la plus externe journalise à la fin le nombre de logs
+    écartés. Portée par un `ContextVar`, elle suit les tâches asyncio et
+    `asyncio.to_thread` sans fuir vers les requêtes concurrentes.
+    """
+    sampler = _current_sampler.get()
+    if sampler is not None:
+        yield sampler
+        return
+    sampler = LogSampler(first, every)
+    token = _current_sampler.set(sampler)
+    try:
+        yield sampler
+    finally:
+        _current_sampler.reset(token)
+        suppressed = sampler.suppressed()
+        if suppressed:
+            logger.info("Sampled repeated logs, suppressed: %s", suppressed, extra={"suppressed": suppressed})
+
+
+def sampled(stage: str) -> bool:
+    """Vrai si le prochain log répété de `stage` doit être émis (toujours vrai hors d'une portée)"""
+    sampler = _current_sampler.get()
+    return sampler is None or sampler.allow(stage)
@@ -0,0 +1,77 @@
+"""Manifest module.
+Sidecar file written next to each generated PDF: the report entries in
+chronological order, each with its date and the local paths of its photos.
+Video generation reads it to build frames from the cached photos and their
+real dates instead of mining the PDF.
+"""
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+
+logger = logging.getLogger('manifest')
+
+
+def manifest_path_for(pdf_path: str) -> str:
+    return os.path.splitext(pdf_path)[0] + MANIFEST_SUFFIX
+
+
+def write_manifest(pdf_path: str, title: str, entries: List[Dict]) -> str:
+    """
+    `entries` : [{"date", "day_count", "photos": [chemins locaux]}], du plus
+    ancien au plus récent. Écriture atomique.
+    """
+    path = manifest_path_for(pdf_path)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "title": title,
+        "pdf": os.path.basename(pdf_path),
+        "entries": entries,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def load_manifest(pdf_path: str) -> Optional[Dict]:
+    """Manifest d'un PDF, ou None s'il n'existe pas ou est illisible"""
+    try:
+        with open(manifest_path_for(pdf_path), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def manifest_photos(manifest: Dict) -> Optional[List[Dict[str, str]]]:
+    """
+    Photos du manifest, dans l'ordre : [{"path", "date"}]. None si une photo
+    référencée n'existe plus (cache purgé) : le manifest est alors périmé et
+    la vidéo doit être construite depuis le PDF plutôt qu'avec des trous.
+    """
+    photos = [
+        {"path": path, "date": entry.get("date", "")}
+        for entry in manifest.get("entries", [])
+        for path in entry.get("photos", [])
+    ]
+    missing = [photo["path"] for photo in photos if not os.path.exists(photo["path"])]
+    if missing:
+        logger.warning("Stale manifest for %s: %s of %s photos missing (first: %s)",
+                       manifest.get("pdf"), len(missing), len(photos), missing[0])
+        return None
+    return photos
@@ -0,0 +1,240 @@
+"""Metrics module.
+In-process counters, gauges and latency histograms for the scraping and
+rendering pipelines, exposed in the Prometheus text format (version 0.0.4)
+without depending on prometheus_client.
+
+Renders run in the worker processes of the render pool: their counters and
+histograms are drained after each call and merged into the web process
+registry (see `render_pool`), gauges stay local to the process.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Secondes : du parsing d'une page (centièmes) au rendu d'un long growlog (minutes)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Métrique nommée, avec une série par combinaison de valeurs de `labelnames`"""
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._series.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in series
+        ]
+
+    def drain(self):
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series):
+        with self._lock:
+            for key, value in series.items():
+                self._series[key] = self._series.get(key, 0) + value
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._series.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in series
+        ]
+
+
+class Histogram(Metric):
+    """Histogramme cumulatif : compteurs par borne supérieure `le`, somme et nombre d'observations"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        counts, _ = self._series.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = self.header()
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def drain(self):
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series):
+        with self._lock:
+            for key, (counts, total) in series.items():
+                current, current_total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+                self._series[key] = ([a + b for a, b in zip(current, counts)], current_total + total)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def drain(self) -> Dict:
+        """Retire et retourne les compteurs et histogrammes accumulés (picklable)"""
+        return {name: metric.drain() for name, metric in self._metrics.items()
+                if not isinstance(metric, Gauge)}
+
+    def merge(self, drained: Dict):
+        """Ajoute les valeurs retournées par `drain()` dans un autre processus"""
+        for name, series in drained.items():
+            metric = self._metrics.get(name)
+            if metric is not None and series:
+                metric.merge(series)
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'growlog_stage_seconds', 'Duration of each pipeline stage in seconds', ('pipeline', 'stage'))
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    'growlog_stage_in_flight', 'Pipeline stages currently running', ('pipeline', 'stage'))
+STAGE_ERRORS = REGISTRY.counter(
+    'growlog_stage_errors_total', 'Pipeline stages that raised an exception', ('pipeline', 'stage'))
+CARDS = REGISTRY.counter('growlog_cards_total', 'Timeline cards extracted from growlogs', ('mode',))
+PHOTOS = REGISTRY.counter('growlog_photos_total', 'Growlog photos fetched, by result', ('result',))
+PHOTO_BYTES = REGISTRY.counter('growlog_photo_bytes_downloaded_total', 'Bytes of photos downloaded')
+PDF_PAGES = REGISTRY.counter('growlog_pdf_pages_total', 'Pages of rendered PDFs')
+VIDEO_FRAMES = REGISTRY.counter('growlog_video_frames_total', 'Frames encoded into videos')
+
+
+@contextmanager
+def stage(pipeline: str, name: str):
+    """
+    Mesure une étape : durée dans `growlog_stage_seconds`, étape en cours dans
+    `growlog_stage_in_flight`, exceptions dans `growlog_stage_errors_total`.
+    Utilisable autour de code synchrone ou de `await`.
+    """
+    STAGE_IN_FLIGHT.inc(pipeline=pipeline, stage=name)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(pipeline=pipeline, stage=name)
+        raise
+    finally:
+        STAGE_IN_FLIGHT.dec(pipeline=pipeline, stage=name)
+        STAGE_SECONDS.observe(time.perf_counter() - start, pipeline=pipeline, stage=name)
@@ -0,0 +1,323 @@
+"""Network capture module.
+Extraction engine that builds `growlog_data` from the JSON payloads the
+growlog page fetches while it scrolls, instead of re-parsing the DOM.
+
+The GrowWithJane API is not documented: payloads are mapped with tolerant
+key aliases, and the caller falls back to the DOM parser whenever the
+captured data does not cover every timeline item rendered on the page
+(same dates, same photo counts), or when the mapping fails.
+"""
+import asyncio
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from playwright.async_api import Page
+
+logger = logging.getLogger('network_capture')
+
+# "day" n'en fait pas partie : c'est un nombre de jours, pas un timestamp
+DATE_KEYS = ("date", "eventDate", "event_date", "createdAt", "created_at", "timestamp")
+PHOTO_KEYS = ("photos", "images", "pictures", "media")
+PHOTO_URL_KEYS = ("url", "src", "uri", "original", "originalUrl", "thumbnail", "thumbnailUrl")
+ACTION_KEYS = ("reminders", "actions", "activities")
+TREE_LOG_KEYS = ("treeLogs", "tree_logs", "treeLog", "logs", "measurements")
+STAGE_KEYS = ("stage", "newStage", "stageName", "plantStage", "state")
+NAME_KEYS = ("name", "title", "label", "type")
+DAY_COUNT_KEYS = ("dayCount", "day_count", "day")
+CURRENT_STAGE_KEYS = ("currentStage", "growingStage", "current_stage")
+VALUE_KEYS = ("value", "amount", "quantity")
+UNIT_KEYS = ("unit", "units")
+CONTAINER_KEYS = ("timeline", "events", "entries", "items", "edges")
+
+ENVIRONMENT_FIELDS = {
+    "Name": ("name",),
+    "Type": ("type", "environmentType"),
+    "Exposure Time": ("exposureTime", "exposure_time", "lightHours", "lightSchedule"),
+    "Environment Size": ("size", "indoorSize", "dimensions"),
+    "Lights": ("lights", "lamps"),
+}
+
+# Éléments de timeline rendus par la page : (date, nombre de photos) par
+# carte et date de chaque changement de stade, pour valider le mapping JSON
+RENDERED_ITEMS_JS = """
+() => {
+    const text = (el, selector) => {
+        const node = el.querySelector(selector);
+        return node ? node.textContent.trim() : "";
+    };
+    const all = (testid) => Array.from(document.querySelectorAll(`div[data-testid='${testid}']`));
+    return {
+        cards: all("growlog-page-timeline-card").map(el => [
+            text(el, "[data-testid='growlog-page-timeline-card-date'] > div"),
+            el.querySelectorAll("[data-testid='growlog-page-timeline-photos'] img").length,
+        ]),
+        stage_changes: all("growlog-page-timeline-stage-change").map(
+            el => text(el, "[data-testid='growlog-page-timeline-stage-change-date'] > div")),
+    };
+}
+"""
+
+
+class JsonResponseCapture:
+    """Collecte les réponses JSON (XHR/fetch) d'une page pendant le défilement"""
+
+    def __init__(self):
+        self.payloads: List[Tuple[str, Any]] = []
+        self.bytes = 0
+        self._pending: List[asyncio.Task] = []
+        self._page: Optional[Page] = None
+
+    def attach(self, page: Page):
+        self._page = page
+        page.on("response", self._on_response)
+
+    def detach(self):
+        if self._page is not None:
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        self._pending.append(asyncio.ensure_future(self._read(response)))
+
+    async def _read(self, response):
+        try:
+            body = await response.body()
+            self.bytes += len(body)
+            self.payloads.append((response.url, json.loads(body)))
+        except Exception as e:
+            logger.debug("Unreadable JSON response %s: %s", response.url, e)
+
+    async def capture_embedded_state(self, page: Page):
+        """Ajoute l'état initial sérialisé dans la page (rendu serveur), s'il existe"""
+        try:
+            state = await page.evaluate("() => window.__NEXT_DATA__ || window.__NUXT__ || null")
+        except Exception as e:
+            logger.debug("Unable to read embedded page state: %s", e)
+            return
+        if state:
+            self.payloads.insert(0, (page.url, state))
+
+    async def drain(self):
+        """Attend la lecture de toutes les réponses déjà reçues"""
+        pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.gather(*pending)
+
+
+def _first(obj: dict, keys) -> Any:
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, dict):
+        value = _first(value, NAME_KEYS)
+    return str(value).strip() if value is not None else ""
+
+
+def _walk(node: Any) -> Iterator[dict]:
+    """Parcourt tous les objets JSON imbriqués, en ordre de document"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def format_display_date(value: Any) -> str:
+    """
+    Formate une date ISO / timestamp comme sur la page (ex. 'Mar 5th 25').
+    Une valeur qui n'est pas une date valide est retournée telle quelle.
+    """
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            dt = datetime.fromtimestamp(value / 1000 if value > 1e11 else value)
+        else:
+            dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except (OverflowError, OSError, ValueError):
+        return str(value).strip()
+    day = dt.day
+    suffix = "th" if 11 <= day % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{dt.strftime('%b')} {day}{suffix} {dt.strftime('%y')}"
+
+
+def _day_count(entry: dict) -> str:
+    """Nombre de jours affiché comme sur la page ("Day 12")"""
+    value = _text(_first(entry, DAY_COUNT_KEYS))
+    return f"Day {value}" if value.isdigit() else value
+
+
+def _photo_urls(entry: dict) -> List[str]:
+    urls = []
+    for photo in _first(entry, PHOTO_KEYS) or []:
+        url = photo if isinstance(photo, str) else (_first(photo, PHOTO_URL_KEYS) if isinstance(photo, dict) else None)
+        if isinstance(url, str) and url.startswith("http"):
+            urls.append(url)
+    return urls
+
+
+def _actions(entry: dict) -> List[str]:
+    actions = []
+    for item in _first(entry, ACTION_KEYS) or []:
+        if not isinstance(item, dict):
+            continue
+        name = _text(_first(item, NAME_KEYS))
+        value = _first(item, VALUE_KEYS)
+        if value is None and isinstance(item.get("extraData"), dict):
+            value = _first(item["extraData"], VALUE_KEYS)
+        unit = _first(item, UNIT_KEYS)
+        if name and value is not None:
+            actions.append(f"{name}: {value}{' ' + str(unit) if unit else ''}")
+    return actions
+
+
+def _tree_logs(entry: dict) -> Dict[str, str]:
+    logs = _first(entry, TREE_LOG_KEYS)
+    if isinstance(logs, dict):
+        return {str(k): _text(v) for k, v in logs.items() if _text(v)}
+    tree_logs = {}
+    for item in logs or []:
+        if isinstance(item, dict):
+            label = _text(_first(item, ("label",) + NAME_KEYS))
+            value = _first(item, VALUE_KEYS)
+            if label and value is not None:
+                tree_logs[label] = _text(value)
+    return tree_logs
+
+
+def _is_stage_change(entry: dict) -> bool:
+    kind = str(entry.get("type") or entry.get("kind") or "").lower()
+    return "stage" in kind and _first(entry, STAGE_KEYS) is not None
+
+
+def _is_timeline_entry(entry: dict) -> bool:
+    # Un objet qui contient lui-même une liste d'entrées (le growlog) n'en est pas une
+    if any(isinstance(entry.get(key), list) for key in CONTAINER_KEYS):
+        return False
+    return _first(entry, DATE_KEYS) is not None and any(
+        key in entry for key in PHOTO_KEYS + ACTION_KEYS + TREE_LOG_KEYS
+    )
+
+
+def _environment(node: dict) -> Dict[str, str]:
+    environment = {}
+    for label, keys in ENVIRONMENT_FIELDS.items():
+        value = _first(node, keys)
+        if isinstance(value, list):
+            value = " | ".join(_text(v) for v in value if _text(v))
+        elif isinstance(value, dict) and label == "Environment Size":
+            value = " x ".join(str(value[k]) for k in ("width", "length", "height") if k in value)
+        if value:
+            environment[label] = _text(value)
+    return environment
+
+
+def build_growlog_data(payloads: List[Tuple[str, Any]], growlog_url: str) -> Optional[Dict]:
+    """
+    Construit le même dict que le parseur DOM (`timeline`, `stage_changes`,
+    `environment`, `stages`, `strain`...) à partir des payloads capturés.
+    Les photos des cartes sont laissées sous forme d'URLs dans `photo_urls`.
+    Retourne None si aucune entrée de timeline n'a été reconnue.
+    """
+    growlog_data = {
+        "url": growlog_url,
+        "title": "",
+        "strain": "Unknown",
+        "growing_stage": "",
+        "timeline": [],
+        "environment": {},
+        "stages": [],
+        "stage_changes": [],
+    }
+    slug = growlog_url.rstrip("/").rsplit("/", 1)[-1]
+    seen = set()
+    medium = None
+
+    for _, payload in payloads:
+        for node in _walk(payload):
+            # Une même entrée peut revenir dans plusieurs réponses paginées
+            node_id = node.get("id")
+            if node_id is not None:
+                identity = (str(node_id), tuple(sorted(node.keys())))
+                if identity in seen:
+                    continue
+                seen.add(identity)
+
+            if _is_stage_change(node):
+                growlog_data["stage_changes"].append({
+                    "date": format_display_date(_first(node, DATE_KEYS) or ""),
+                    "day_count": _day_count(node),
+                    "stage_change": _text(node.get("title") or node.get("text"))
+                    or f"Stage changed to {_text(_first(node, STAGE_KEYS)).capitalize()}",
+                    "plant_state": _text(_first(node, STAGE_KEYS)).lower(),
+                })
+            elif _is_timeline_entry(node):
+                growlog_data["timeline"].append({
+                    "date": format_display_date(_first(node, DATE_KEYS)),
+                    "actions": _actions(node),
+                    "photos": [],
+                    "photo_urls": _photo_urls(node),
+                    "tree_logs": _tree_logs(node),
+                    "plant_state": None,
+                })
+
+            strain = node.get("strain")
+            if isinstance(strain, dict) and _text(strain.get("name")):
+                growlog_data["strain"] = _text(strain.get("name"))
+            elif isinstance(strain, str) and strain.strip():
+                growlog_data["strain"] = strain.strip()
+
+            environment = node.get("environment")
+            if isinstance(environment, dict) and not growlog_data["environment"]:
+                growlog_data["environment"] = _environment(environment)
+            if medium is None and _text(node.get("medium")):
+                medium = _text(node.get("medium"))
+
+            current_stage = _first(node, CURRENT_STAGE_KEYS)
+            if current_stage is not None and not growlog_data["growing_stage"]:
+                growlog_data["growing_stage"] = _text(current_stage).capitalize()
+
+            stages = node.get("treeStages") or node.get("stages")
+            if isinstance(stages, list) and not growlog_data["stages"]:
+                growlog_data["stages"] = [
+                    {"name": _text(_first(s, NAME_KEYS)), "date": format_display_date(_first(s, DATE_KEYS) or "")}
+                    for s in stages if isinstance(s, dict) and _first(s, NAME_KEYS)
+                ]
+
+            if not growlog_data["title"] and node.get("slug") == slug and isinstance(node.get("title"), str):
+                growlog_data["title"] = node["title"].strip()
+
+    if not growlog_data["timeline"]:
+        return None
+    if medium:
+        growlog_data["environment"]["Medium"] = medium
+    if not growlog_data["growing_stage"] and growlog_data["stages"]:
+        # Sinon, le dernier stade atteint
+        growlog_data["growing_stage"] = growlog_data["stages"][-1]["name"].capitalize()
+    return growlog_data
+
+
+def missing_rendered_items(growlog_data: Dict, rendered: Dict) -> int:
+    """
+    Nombre d'éléments rendus par la page (résultat de `RENDERED_ITEMS_JS`)
+    sans équivalent dans `growlog_data` : même date et, pour une carte, même
+    nombre de photos. Non nul, le mapping JSON est incomplet ou erroné.
+    """
+    cards = Counter((event["date"], len(event["photo_urls"])) for event in growlog_data["timeline"])
+    stage_changes = Counter(sc["date"] for sc in growlog_data["stage_changes"])
+    missing_cards = Counter((date, photos) for date, photos in rendered["cards"]) - cards
+    missing_stage_changes = Counter(rendered["stage_changes"]) - stage_changes
+    return sum(missing_cards.values()) + sum(missing_stage_changes.values())
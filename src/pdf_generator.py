@@ -3,28 +3,108 @@ Handles the generation of PDF reports using WeasyPrint.
 """
 from jinja2 import Environment, FileSystemLoader
 from weasyprint import HTML
+import weasyprint
+import json
 import os
 import logging
+import tempfile
+from datetime import datetime
+from src.image_prep import prepare_entries
+from src.manifest import write_manifest
+from src.metrics import PDF_PAGES, stage
+from src.render_cache import render_key
+
+WEASYPRINT_VERSION = getattr(weasyprint, '__version__', '')
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
 logger = logging.getLogger('pdf_generator')
 
-def generate_pdf(title, entries, metadata, template_path="templates/template.html", verbose=False):
+def parse_display_date(date_str):
+    """Convertit une date affichée par GrowWithJane ("Mar 5th 25") en datetime, None si invalide"""
+    for suffix in ['st', 'nd', 'rd', 'th']:
+        date_str = date_str.replace(suffix, '')
+    try:
+        return datetime.strptime(date_str.strip(), "%b %d %y")
+    except Exception:
+        return None
+
+def growlog_to_report(growlog_data):
+    """
+    Convertit les données du scraper au format attendu par le template.
+    Retourne (title, entries, metadata) pour `generate_pdf`.
+    """
+    title = growlog_data.get("title", "Growlog")
+    if not title or not title.strip():
+        title = "Growlog"
+
+    stage_changes = []
+    for sc in growlog_data.get("stage_changes", []):
+        d = parse_display_date(sc.get("date", ""))
+        if d and sc.get("plant_state"):
+            stage_changes.append({"date": d, "plant_state": sc.get("plant_state")})
+    stage_changes.sort(key=lambda x: x["date"])
+    entries = []
+    for event in growlog_data.get("timeline", []):
+        event_date = parse_display_date(event.get("date", ""))
+        plant_state = None
+        for sc in reversed(stage_changes):
+            if event_date and sc["date"] <= event_date:
+                plant_state = sc["plant_state"]
+                break
+        entry = {
+            "full_date": event.get("date", ""),
+            "day_count": event.get("day_count", ""),
+            "plant_state": plant_state,
+            "stage_change": event.get("stage_change", ""),
+            "actions": event.get("actions", []),
+            "images": event.get("photos", []),
+            "tree_logs": event.get("tree_logs", {})
+        }
+        entries.append(entry)
+
+    # Préparer le metadata avec les stages, strain et environment enrichis
+    metadata = {
+        "strain": {
+            "brand": "Unknown",  # Peut être enrichi si tu as la marque
+            "name": growlog_data.get("strain", "Unknown strain")
+        },
+        "environment": growlog_data.get("environment", {}),
+        "stages": growlog_data.get("stages", [])
+    }
+    return title, entries, metadata
+
+def manifest_entries(entries):
+    """Entrées du manifest vidéo, du plus ancien au plus récent"""
+    manifest = [
+        {
+            "date": entry.get("full_date", ""),
+            "day_count": entry.get("day_count", ""),
+            "photos": [os.path.abspath(img["local_path"]) for img in entry.get("images", []) if img.get("local_path")],
+        }
+        for entry in entries
+    ]
+    # La timeline est affichée de la plus récente à la plus ancienne
+    manifest.reverse()
+    dates = [parse_display_date(entry["date"]) for entry in manifest]
+    if all(dates):
+        order = sorted(range(len(manifest)), key=lambda i: dates[i])
+        manifest = [manifest[i] for i in order]
+    return manifest
+
+def generate_pdf(title, entries, metadata, template_path="templates/template.html", verbose=False,
+                 output_dir=None, filename=None, cache=None, image_options=None):
     """Generate a styled PDF using an HTML template and WeasyPrint."""
     if verbose:
         logger.info("Generating PDF...")
 
     # Utiliser le chemin absolu pour le dossier de sortie
-    output_dir = os.path.join('/app', 'output')
+    output_dir = output_dir or os.path.join('/app', 'output')
     os.makedirs(output_dir, exist_ok=True)
 
     # Utiliser le nom de la plante si disponible, sinon le titre, sinon 'growlog'
-    plant_name = metadata.get('strain', {}).get('name')
-    safe_title = (plant_name or title or "growlog").strip() or "growlog"
-    filename = f"{safe_title.replace(' ', '_')}.pdf"
+    if filename is None:
+        plant_name = metadata.get('strain', {}).get('name')
+        safe_title = (plant_name or title or "growlog").strip() or "growlog"
+        filename = f"{safe_title.replace(' ', '_')}.pdf"
     output_path = os.path.join(output_dir, filename)
     
     # Clean up the metadata to remove any Medium references
@@ -63,6 +143,29 @@ def generate_pdf(title, entries, metadata, template_path="templates/template.htm
     if 'Medium' in metadata['environment']:
         metadata['environment'].pop('Medium', None)
 
+    # Manifest pour la vidéo : dates et photos originales, avant la préparation des images
+    write_manifest(output_path, title, manifest_entries(entries))
+
+    # Cache de rendu : clé calculée sur les données normalisées, le template
+    # et le contenu des images (chemins encore absolus à ce stade)
+    key = None
+    if cache is not None:
+        with stage("pdf", "cache_lookup"):
+            with open(template_path, 'rb') as f:
+                template_source = f.read()
+            key = render_key(title, entries, metadata, template_source, weasyprint=WEASYPRINT_VERSION,
+                             image_options=image_options.target_size + (image_options.quality,) if image_options else None)
+            hit = cache.fetch(key, output_path)
+        if hit:
+            if verbose:
+                logger.info("PDF served from render cache: %s", output_path)
+            return output_path
+
+    # Dérivés à la résolution d'impression plutôt que les originaux
+    if image_options is not None:
+        with stage("pdf", "image_prep"):
+            prepare_entries(entries, image_options)
+
     # S'assurer que les chemins d'images sont corrects
     for entry in entries:
         if 'images' in entry:
@@ -71,15 +174,44 @@ def generate_pdf(title, entries, metadata, template_path="templates/template.htm
                     # Convertir le chemin en chemin relatif par rapport à /app
                     img['local_path'] = os.path.relpath(img['local_path'], '/app')
 
-    env = Environment(loader=FileSystemLoader("."))
-    template = env.get_template(template_path)
-
-    html_content = template.render(title=title, entries=entries, metadata=metadata)
+    with stage("pdf", "template"):
+        env = Environment(loader=FileSystemLoader("."))
+        template = env.get_template(template_path)
+        html_content = template.render(title=title, entries=entries, metadata=metadata)
     
     # Créer le PDF avec WeasyPrint en spécifiant le répertoire de base
-    HTML(string=html_content, base_url='/app').write_pdf(output_path)
+    # Écrire dans un fichier temporaire puis le renommer : un PDF existant,
+    # éventuellement lié en dur au cache de rendu, n'est jamais tronqué
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.tmp-', suffix='.pdf')
+    os.close(fd)
+    try:
+        # Mise en page puis écriture, mesurées séparément
+        with stage("pdf", "layout"):
+            document = HTML(string=html_content, base_url='/app').render()
+        with stage("pdf", "write"):
+            document.write_pdf(tmp_path)
+        os.replace(tmp_path, output_path)
+        PDF_PAGES.inc(len(document.pages))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if key is not None:
+        cache.store(key, output_path)
 
     if verbose:
-        logger.info(f"PDF generated successfully: {output_path}")
+        logger.info("PDF generated successfully: %s", output_path)
+
+    return output_path
 
-    return output_path
\ No newline at end of file
+def render_growlog_pdf(data_path, output_dir=None, filename=None, verbose=False, cache=None, image_options=None):
+    """
+    Génère le PDF d'un growlog scrapé enregistré en JSON à `data_path`.
+    Point d'entrée des workers de rendu : seul le chemin traverse la frontière
+    entre processus, pas les données.
+    """
+    with open(data_path, 'r', encoding='utf-8') as f:
+        growlog_data = json.load(f)
+    title, entries, metadata = growlog_to_report(growlog_data)
+    return generate_pdf(title, entries, metadata, verbose=verbose, output_dir=output_dir, filename=filename,
+                        cache=cache, image_options=image_options)
@@ -0,0 +1,189 @@
+"""Photo cache module.
+Content-addressed on-disk cache for growlog photos, with HTTP revalidation
+and a size-bounded LRU eviction.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import aiofiles
+import aiohttp
+
+from src.metrics import PHOTO_BYTES
+
+logger = logging.getLogger('photo_cache')
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+META_SUFFIX = '.meta.json'
+TMP_PREFIX = '.tmp-'
+
+
+class PhotoCache:
+    """
+    Stocke chaque photo sous `<sha256(url)><ext>` dans `cache_dir`, avec un
+    fichier `<sha256(url)>.meta.json` contenant l'ETag et le Last-Modified.
+
+    - Les écritures sont atomiques (fichier temporaire puis `os.replace`), deux
+      requêtes concurrentes ne peuvent donc jamais produire un fichier tronqué.
+    - Une entrée validée il y a moins de `fresh_for` secondes est servie sans
+      requête réseau ; au-delà elle est revalidée par une requête conditionnelle.
+    - La date de modification du fichier sert d'horodatage LRU : `evict()`
+      supprime les photos les moins récemment utilisées au-delà de `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3, fresh_for: float = 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"hits": 0, "revalidated": 0, "downloads": 0, "bytes_downloaded": 0, "evicted": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def path_for(self, url: str) -> str:
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext not in PHOTO_EXTENSIONS:
+            ext = '.jpg'
+        return os.path.join(self.cache_dir, self.key_for(url) + ext)
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, self.key_for(url) + META_SUFFIX)
+
+    def _read_meta(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url: str, meta: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path(url))
+        except BaseException:
+            _silent_remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    async def fetch(self, url: str, session: aiohttp.ClientSession) -> str:
+        """Retourne le chemin local de la photo, en la téléchargeant ou revalidant si besoin"""
+        key = self.key_for(url)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._fetch(url, session)
+        finally:
+            if not lock.locked() and self._locks.get(key) is lock:
+                self._locks.pop(key, None)
+
+    async def _fetch(self, url: str, session: aiohttp.ClientSession) -> str:
+        local_path = self.path_for(url)
+        meta = self._read_meta(url) if os.path.exists(local_path) else None
+
+        if meta and time.time() - meta.get("validated_at", 0) < self.fresh_for:
+            self.stats["hits"] += 1
+            self._touch(local_path)
+            return local_path
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and meta:
+                meta["validated_at"] = time.time()
+                self._write_meta(url, meta)
+                self._touch(local_path)
+                self.stats["revalidated"] += 1
+                return local_path
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history,
+                    status=response.status, message=f"HTTP {response.status}"
+                )
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TMP_PREFIX)
+            os.close(fd)
+            size = 0
+            try:
+                async with aiofiles.open(tmp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        size += len(chunk)
+                        await f.write(chunk)
+                os.replace(tmp_path, local_path)
+            except BaseException:
+                _silent_remove(tmp_path)
+                raise
+
+            self._write_meta(url, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "validated_at": time.time(),
+                "size": size,
+            })
+        self.stats["downloads"] += 1
+        self.stats["bytes_downloaded"] += size
+        PHOTO_BYTES.inc(size)
+        return local_path
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.startswith(TMP_PREFIX):
+                    continue
+                if os.path.splitext(entry.name)[1].lower() in PHOTO_EXTENSIONS:
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def usage(self) -> dict:
+        entries = self._entries()
+        return {"files": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """Supprime les photos les moins récemment utilisées jusqu'à respecter `max_bytes`"""
+        keep = {os.path.abspath(p) for p in keep}
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            _silent_remove(path)
+            _silent_remove(os.path.splitext(path)[0] + META_SUFFIX)
+            freed += size
+            self.stats["evicted"] += 1
+        if freed:
+            logger.info("Photo cache eviction freed %s bytes", freed)
+        return freed
+
+
+def _silent_remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
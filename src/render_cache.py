@@ -0,0 +1,171 @@
+"""Render cache module.
+Content-hash keyed cache of rendered PDFs: a growlog whose entries,
+metadata, template and images have not changed is not rendered again.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('render_cache')
+
+TMP_PREFIX = '.tmp-'
+CACHE_SUFFIX = '.pdf'
+
+# Empreintes des images déjà hachées : chemin -> (taille, mtime, sha256)
+_image_digests: Dict[str, Tuple[int, int, str]] = {}
+
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 du contenu d'un fichier, mémorisé tant que taille et mtime ne changent pas"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # Une seule entrée par chemin : le mémo ne grossit pas à chaque `utime`
+    path = os.path.abspath(path)
+    memo = _image_digests.get(path)
+    if memo is not None and memo[:2] == (st.st_size, st.st_mtime_ns):
+        return memo[2]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _image_digests[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def _normalize(value):
+    """Forme JSON stable : les images sont représentées par le hash de leur contenu"""
+    if isinstance(value, dict):
+        normalized = {str(k): _normalize(v) for k, v in value.items()}
+        if 'local_path' in value:
+            normalized['content_sha256'] = file_digest(value['local_path'])
+        return normalized
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def render_key(title: str, entries: List[Dict], metadata: Dict, template_source: bytes, **extra) -> str:
+    """Clé de rendu : hash des données normalisées, du template et des images"""
+    h = hashlib.sha256()
+    h.update(json.dumps(
+        {"title": title, "entries": _normalize(entries), "metadata": _normalize(metadata), "extra": _normalize(extra)},
+        sort_keys=True, ensure_ascii=False,
+    ).encode('utf-8'))
+    h.update(b'\0')
+    h.update(template_source)
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    PDFs rendus, stockés sous `<clé>.pdf` dans `cache_dir`.
+
+    Un hit est copié (ou lié en dur) vers le chemin de sortie demandé et son
+    mtime est rafraîchi ; `evict()` supprime les entrées plus vieilles que
+    `max_age` secondes, puis les moins récemment utilisées au-delà de
+    `max_bytes`. L'objet ne contient que sa configuration : il peut être
+    passé aux workers du pool de rendu, qui partagent le même dossier.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 ** 3, max_age: float = 30 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Place le PDF en cache à `output_path` ; False si la clé est absente"""
+        cached = self._path(key)
+        if not os.path.exists(cached):
+            return False
+        try:
+            _place(cached, output_path)
+            os.utime(cached, None)
+        except FileNotFoundError:
+            # Évincé entre-temps par un autre processus
+            return False
+        return True
+
+    def store(self, key: str, rendered_path: str):
+        """Ajoute un PDF fraîchement rendu au cache, puis applique les limites"""
+        _place(rendered_path, self._path(key))
+        self.evict(keep=(self._path(key),))
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_SUFFIX) or name.startswith(TMP_PREFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self, keep=()) -> int:
+        """Supprime les entrées expirées, puis les plus anciennes au-delà de `max_bytes`"""
+        keep = {os.path.abspath(p) for p in keep}
+        now = time.time()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            expired = now - mtime > self.max_age
+            if not expired and total <= self.max_bytes:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Render cache eviction removed %s PDFs", removed)
+        return removed
+
+    def usage(self) -> Dict:
+        entries = self._entries()
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age,
+        }
+
+
+def _place(source: str, destination: str):
+    """Lien dur (ou copie) atomique de `source` vers `destination`"""
+    directory = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TMP_PREFIX)
+    os.close(fd)
+    os.remove(tmp_path)
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,164 @@
+"""Render pool module.
+Runs CPU-heavy rendering (WeasyPrint PDFs, timelapse videos) in a
+ProcessPoolExecutor so the event loop keeps serving requests.
+
+Only small arguments cross the process boundary: callers write large
+payloads (scraped growlog data) to a file and pass its path, and workers
+return the path of the artifact they wrote.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from src.logging_setup import logging_settings, setup_logging
+from src.metrics import REGISTRY, stage
+
+logger = logging.getLogger('render_pool')
+
+
+def _timed_call(fn: Callable, args, kwargs):
+    """
+    Exécuté dans le worker : retourne (résultat, début, durée d'exécution,
+    métriques enregistrées par le worker depuis le dernier appel)
+    """
+    started = time.time()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, started, time.perf_counter() - start, REGISTRY.drain()
+
+
+class RenderPoolFull(RuntimeError):
+    """Le pool de rendu est saturé : le rendu est refusé plutôt que mis en attente sans limite"""
+
+
+class RenderPool:
+    """
+    Pool de processus de rendu. Au plus `max_workers` rendus s'exécutent et
+    `max_queue` attendent dans l'exécuteur ; au-delà, `run` attend au plus
+    `acquire_timeout` secondes (0 : pas d'attente) qu'une place se libère,
+    puis lève `RenderPoolFull` (contre-pression sur les jobs).
+
+    Les fonctions soumises doivent être importables au niveau module.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, mp_context: str = "spawn",
+                 acquire_timeout: float = 0.0):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.acquire_timeout = max(0.0, acquire_timeout)
+        self._mp_context = multiprocessing.get_context(mp_context)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "broken_pool_restarts": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "exec_seconds_total": 0.0,
+            "exec_seconds_max": 0.0,
+        }
+        self._by_task: Dict[str, Dict[str, float]] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Les workers "spawn" n'héritent pas de la configuration du logging
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._mp_context,
+                                                 initializer=setup_logging, initargs=logging_settings())
+        return self._executor
+
+    def full(self) -> bool:
+        """Vrai si toutes les places (rendus en cours et en file) sont prises"""
+        return self._stats["in_flight"] >= self.max_workers + self.max_queue
+
+    async def _acquire_slot(self, name: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        if self.acquire_timeout > 0:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+                return
+            except asyncio.TimeoutError:
+                pass
+        logger.warning("Render pool full, %s rejected (%s running, %s queued)", name, self.max_workers,
+                       self.max_queue)
+        raise RenderPoolFull(f"Render pool full ({self.max_workers} running, {self.max_queue} queued)")
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Exécute `fn(*args, **kwargs)` dans un worker et retourne son résultat.
+        Lève `RenderPoolFull` si aucune place ne se libère à temps.
+        """
+        stats = self._stats
+        submitted = time.time()
+        try:
+            # Attente comprise : `growlog_stage_in_flight` compte aussi les rendus en file
+            with stage("render_pool", fn.__name__):
+                await self._acquire_slot(fn.__name__)
+                stats["submitted"] += 1
+                stats["in_flight"] += 1
+                try:
+                    future = asyncio.get_running_loop().run_in_executor(
+                        self._get_executor(), _timed_call, fn, args, kwargs
+                    )
+                    try:
+                        result, started, exec_seconds, metrics = await future
+                    except BrokenProcessPool:
+                        # Un worker est mort (OOM, crash natif) : repartir d'un pool neuf
+                        stats["broken_pool_restarts"] += 1
+                        self._reset_executor()
+                        raise
+                finally:
+                    stats["in_flight"] -= 1
+                    self._slots.release()
+        except RenderPoolFull:
+            stats["rejected"] += 1
+            raise
+        except BaseException:
+            stats["failed"] += 1
+            raise
+
+        REGISTRY.merge(metrics)
+        wait_seconds = max(0.0, started - submitted)
+        stats["completed"] += 1
+        stats["wait_seconds_total"] += wait_seconds
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait_seconds)
+        stats["exec_seconds_total"] += exec_seconds
+        stats["exec_seconds_max"] = max(stats["exec_seconds_max"], exec_seconds)
+        task = self._by_task.setdefault(fn.__name__, {"count": 0, "wait_seconds": 0.0, "exec_seconds": 0.0})
+        task["count"] += 1
+        task["wait_seconds"] += wait_seconds
+        task["exec_seconds"] += exec_seconds
+        logger.info("%s rendered in %.2fs after waiting %.2fs", fn.__name__, exec_seconds, wait_seconds)
+        return result
+
+    def _reset_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        completed = stats["completed"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / completed if completed else 0.0
+        stats["exec_seconds_avg"] = stats["exec_seconds_total"] / completed if completed else 0.0
+        stats["queued"] = max(0, stats["in_flight"] - self.max_workers)
+        stats["max_workers"] = self.max_workers
+        stats["max_queue"] = self.max_queue
+        stats["tasks"] = {name: dict(task) for name, task in self._by_task.items()}
+        return stats
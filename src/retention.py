@@ -0,0 +1,241 @@
+"""Retention module.
+Keeps the output directory within byte and age budgets: each artifact class
+(published PDFs and videos, video frame folders, job work directories,
+photo caches, render cache) has its own limits, enforced by a periodic
+sweep that evicts the least recently used entries first. Entries being
+served or generated are never removed.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('retention')
+
+TMP_PREFIX = '.tmp-'
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Budget d'une classe d'artefacts.
+
+    `unit` : "file" (les fichiers de `path`, regroupés par nom avant le
+    premier point : `<sha>.pdf` et `<sha>.manifest.json` forment une seule
+    entrée) ou "dir" (chaque sous-dossier de `path` est une entrée).
+    `cleanup` est appelé après une éviction (alias cassés, etc.).
+    """
+    name: str
+    path: str
+    max_bytes: int
+    max_age: float
+    unit: str = "file"
+    cleanup: Optional[Callable[[], int]] = None
+
+
+@dataclass
+class Entry:
+    key: str
+    paths: List[str]
+    size: int
+    last_used: float
+
+
+def _tree_stat(path: str) -> Tuple[int, float]:
+    """Taille totale et date de modification la plus récente des fichiers d'un dossier"""
+    size, newest = 0, 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+    # Dossier vide : sa propre date
+    return size, newest or os.stat(path).st_mtime
+
+
+def _remove(path: str):
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class RetentionManager:
+    """
+    Applique les `RetentionPolicy` : supprime d'abord les entrées plus
+    vieilles que `max_age`, puis les moins récemment utilisées (mtime,
+    rafraîchi par `mark_used`) tant que la classe dépasse `max_bytes`.
+
+    Ne sont jamais supprimées : les entrées retenues par `hold()` (dossier
+    et photos d'un job en cours, PDF source d'une vidéo) et celles utilisées
+    depuis moins de `grace` secondes, ce qui couvre les rendus lancés dans
+    un autre processus et le début des téléchargements (un fichier supprimé
+    pendant son envoi reste lisible par la réponse qui l'a ouvert).
+    """
+
+    def __init__(self, policies: List[RetentionPolicy], grace: float = 600, interval: float = 3600):
+        self.policies = policies
+        self.grace = grace
+        self.interval = interval
+        self._holds: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_sweep: Dict = {}
+        for policy in policies:
+            os.makedirs(policy.path, exist_ok=True)
+
+    # Entrées protégées
+
+    def acquire(self, path: str):
+        path = os.path.abspath(path)
+        with self._lock:
+            self._holds[path] = self._holds.get(path, 0) + 1
+
+    def release(self, path: str):
+        path = os.path.abspath(path)
+        with self._lock:
+            count = self._holds.get(path, 0) - 1
+            if count > 0:
+                self._holds[path] = count
+            else:
+                self._holds.pop(path, None)
+
+    @contextmanager
+    def hold(self, *paths: str):
+        """Protège `paths` (fichiers ou dossiers) de l'éviction pendant le bloc"""
+        for path in paths:
+            self.acquire(path)
+        try:
+            yield
+        finally:
+            for path in paths:
+                self.release(path)
+
+    def _is_held(self, entry: Entry) -> bool:
+        with self._lock:
+            return any(os.path.abspath(path) in self._holds for path in entry.paths)
+
+    @staticmethod
+    def mark_used(path: str):
+        """Rafraîchit la date d'utilisation d'un artefact servi (horodatage LRU)"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    # Inventaire et éviction
+
+    def entries(self, policy: RetentionPolicy) -> List[Entry]:
+        entries: Dict[str, Entry] = {}
+        try:
+            names = os.listdir(policy.path)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name.startswith(TMP_PREFIX):
+                continue
+            path = os.path.join(policy.path, name)
+            try:
+                if policy.unit == "dir":
+                    if not os.path.isdir(path) or os.path.islink(path):
+                        continue
+                    size, last_used = _tree_stat(path)
+                    entries[name] = Entry(name, [path], size, last_used)
+                    continue
+                if os.path.islink(path) or not os.path.isfile(path):
+                    continue
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = name.split('.', 1)[0]
+            entry = entries.setdefault(key, Entry(key, [], 0, 0))
+            entry.paths.append(path)
+            entry.size += st.st_size
+            entry.last_used = max(entry.last_used, st.st_mtime)
+        return list(entries.values())
+
+    def sweep_policy(self, policy: RetentionPolicy, now: Optional[float] = None) -> Dict:
+        now = now or time.time()
+        entries = sorted(self.entries(policy), key=lambda e: e.last_used)
+        total = sum(entry.size for entry in entries)
+        removed, freed = 0, 0
+        for entry in entries:
+            expired = now - entry.last_used > policy.max_age
+            if not expired and total <= policy.max_bytes:
+                break
+            if now - entry.last_used < self.grace or self._is_held(entry):
+                continue
+            for path in entry.paths:
+                _remove(path)
+            total -= entry.size
+            removed += 1
+            freed += entry.size
+        if removed and policy.cleanup is not None:
+            policy.cleanup()
+        if removed:
+            logger.info("Retention %s: removed %s entries, freed %s bytes", policy.name, removed, freed)
+        return {"removed": removed, "freed_bytes": freed, "bytes": total}
+
+    def sweep(self) -> Dict:
+        """Applique toutes les politiques ; retourne le bilan par classe"""
+        start = time.time()
+        results = {policy.name: self.sweep_policy(policy, now=start) for policy in self.policies}
+        self.last_sweep = {
+            "at": start,
+            "seconds": time.time() - start,
+            "removed": sum(r["removed"] for r in results.values()),
+            "freed_bytes": sum(r["freed_bytes"] for r in results.values()),
+            "classes": results,
+        }
+        return self.last_sweep
+
+    def usage(self) -> Dict:
+        now = time.time()
+        usage = {}
+        for policy in self.policies:
+            entries = self.entries(policy)
+            usage[policy.name] = {
+                "entries": len(entries),
+                "bytes": sum(entry.size for entry in entries),
+                "max_bytes": policy.max_bytes,
+                "max_age_seconds": policy.max_age,
+                "oldest_seconds": max((now - entry.last_used for entry in entries), default=0),
+            }
+        return usage
+
+    def stats(self) -> Dict:
+        with self._lock:
+            held = len(self._holds)
+        return {"classes": self.usage(), "held": held, "interval_seconds": self.interval,
+                "last_sweep": self.last_sweep}
+
+    # Balayage périodique
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error("Retention sweep failed: %s", e)
+            await asyncio.sleep(self.interval)
@@ -4,12 +4,10 @@ import re
 import logging
 import json
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from src.logging_setup import log_sampling, sampled
+from src.request_blocking import RequestBlocker
+from src.scrolling import scroll_to_end
+
 logger = logging.getLogger('scraper')
 
 def clean_plant_state(state_text):
@@ -21,379 +19,285 @@ def clean_plant_state(state_text):
     cleaned_state = re.sub(r'\btext-[a-z0-9]+\b', '', state_text)
     return cleaned_state.strip()
 
-async def load_page(page: Page, url: str, verbose=True):
-    logger.info(f"Loading page: {url}")
-    await page.goto(url)
-    await page.wait_for_timeout(5000)
+async def load_page(page: Page, url: str, verbose=True, stats=None, blocker=None, block_resources=True,
+                    **scroll_options):
+    """
+    Charge la page et la fait défiler jusqu'à la fin de la timeline.
 
-    logger.info("Scrolling the page dynamically...")
-    last_height = await page.evaluate("document.body.scrollHeight")
-    while True:
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
-        await page.wait_for_timeout(2000)
-        new_height = await page.evaluate("document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
-        logger.debug(f"Scrolled to height: {last_height}")
+    Sauf si `block_resources` est faux, un `RequestBlocker` (celui fourni ou
+    un nouveau) est installé sur le contexte de la page. Si `stats` est un
+    dict, il reçoit les statistiques de défilement ("scroll") et de blocage
+    ("blocked").
+    """
+    if blocker is None and block_resources:
+        blocker = RequestBlocker()
+    if blocker is not None:
+        await blocker.install(page.context)
+
+    logger.info("Loading page: %s", url)
+    await page.goto(url)
 
     # Attendre que les éléments de la timeline se chargent
     await page.wait_for_selector("div[data-testid='growlog-page-timeline-card']")
+
+    logger.info("Scrolling the page dynamically...")
+    scroll_stats = await scroll_to_end(page, **scroll_options)
+    if stats is not None:
+        stats["scroll"] = scroll_stats.as_dict()
+    if blocker is not None:
+        report = blocker.report()
+        logger.info("Blocked requests: %s", report)
+        if stats is not None:
+            stats["blocked"] = report
+
     timeline_cards = await page.query_selector_all("div[data-testid='growlog-page-timeline-card']")
-    logger.info(f"Found {len(timeline_cards)} timeline cards")
+    logger.info("Found %s timeline cards", len(timeline_cards))
     return timeline_cards
 
-async def extract_logs(page: Page, verbose=True):
-    logger.info("Starting extraction of grow logs...")
+# Bloc de métadonnées seul (strain, stades, environnement)
+EXTRACT_METADATA_JS = """
+() => {
+    const q = (root, sel) => root ? root.querySelector(sel) : null;
+    const qa = (root, sel) => root ? Array.from(root.querySelectorAll(sel)) : [];
+    const text = (el) => el ? (el.textContent || "") : "";
 
-    metadata = await extract_metadata(page)
-    
-    # Extraire tous les changements de stade d'abord
-    stage_changes = await page.query_selector_all("div[data-testid='growlog-page-timeline-stage-change']")
-    stage_change_entries = []
-    stage_change_dates = []
-    
-    for i, stage_change in enumerate(stage_changes):
-        try:
-            logger.debug(f"Processing stage change {i+1}/{len(stage_changes)}")
-            entry_data = await extract_stage_change(stage_change, page, verbose)
-            if entry_data:
-                stage_change_entries.append(entry_data)
-                stage_change_dates.append(entry_data['full_date'])
-                logger.info(f"Extracted stage change for date: {entry_data['full_date']}")
-                logger.debug(f"Stage change details: {entry_data}")
-        except Exception as e:
-            logger.error(f"Failed to extract stage change: {e}", exc_info=True)
-    
-    # Extraire les entrées de journal normales
-    timeline_cards = await page.query_selector_all("div[data-testid='growlog-page-timeline-card']")
-    logger.info(f"Found {len(timeline_cards)} timeline cards")
+    const strainContainer = document.querySelector("div[data-testid='growlog-page-strain-breeder']");
+    const stages = qa(document.querySelector("div[data-testid='growlog-page-tree-stages']"),
+                      "div[data-testid='growlog-page-tree-stages-item']").map(stage => {
+        const name = q(stage, "span[data-testid='growlog-page-tree-stages-item-name-value']");
+        const date = q(stage, "div[data-testid='growlog-page-tree-stages-item-name-date'] span");
+        return name && date ? {name: text(name), date: text(date)} : null;
+    }).filter(stage => stage);
 
-    entries = []
-    current_stage = None
-    
-    for i, card in enumerate(timeline_cards):
-        try:
-            logger.debug(f"Processing timeline card {i+1}/{len(timeline_cards)}")
-            entry_data = await extract_entry_data(card, page, verbose)
-            
-            # Ne pas ajouter l'état de la plante à chaque entrée
-            # sauf si c'est un changement de stade
-            if entry_data['full_date'] not in stage_change_dates:
-                entry_data.pop('plant_state', None)
-                
-            entries.append(entry_data)
-            logger.info(f"Extracted log for date: {entry_data['full_date']}")
-            logger.debug(f"Entry details: {entry_data}")
-        except Exception as e:
-            logger.error(f"Failed to extract log entry: {e}", exc_info=True)
+    const env = document.querySelector("div[data-testid='growlog-page-environment-details']");
+    const envValue = (testid, sel) => {
+        const item = q(env, `div[data-testid='${testid}']`);
+        const value = q(item, sel);
+        return value ? text(value) : null;
+    };
+    const lightsValue = q(q(env, "div[data-testid='growlog-page-environment-details-lights']"),
+                          "span[data-testid='growlog-page-environment-details-lights-value']");
 
-    # Fusionner les entrées régulières et les changements de stade
-    all_entries = stage_change_entries + entries
-    
-    # Trier par date (du plus récent au plus ancien)
-    all_entries.sort(key=lambda x: x['full_date'], reverse=True)
-    
-    logger.info(f"Extraction completed. Total entries: {len(all_entries)}")
-    return all_entries, metadata
+    return {
+        strain: strainContainer ? text(q(strainContainer, "span.text-lg.font-bold")) : null,
+        stages: stages,
+        environment: env ? {
+            "Name": envValue("growlog-page-environment-details-name", "span[data-testid='growlog-page-environment-details-name']"),
+            "Type": envValue("growlog-page-environment-details-type", "span.text-lg"),
+            "Exposure Time": envValue("growlog-page-environment-details-exposure-time", "span.text-lg"),
+            "Environment Size": envValue("growlog-page-environment-details-indoor-size", "span.text-lg"),
+            "Lights": lightsValue ? qa(lightsValue, "p").map(p => text(p).trim()) : null,
+        } : null,
+    };
+}
+"""
 
-async def extract_entry_data(card, page, verbose=True):
-    logger.debug("Extracting entry data from timeline card...")
+# Extraction complète de la page en un seul aller-retour navigateur :
+# métadonnées, état courant de la plante, changements de stade et cartes.
+EXTRACT_PAGE_JS = """
+() => {
+    const q = (root, sel) => root ? root.querySelector(sel) : null;
+    const qa = (root, sel) => root ? Array.from(root.querySelectorAll(sel)) : [];
+    const text = (el) => el ? (el.textContent || "") : "";
 
-    # Récupérer la date et le nombre de jours
-    date_section = await card.query_selector("div[data-testid='growlog-page-timeline-card-date']")
-    date_element = await date_section.query_selector("div:has(svg)")
-    date_text = await date_element.evaluate("el => el.textContent") if date_element else ""
-    
-    day_count_element = await date_section.query_selector("span")
-    day_count = await day_count_element.evaluate("el => el.textContent") if day_count_element else ""
-    
-    logger.debug(f"Date: {date_text}, Day count: {day_count}")
+    const dateInfo = (dateSection) => ({
+        full_date: text(q(dateSection, "div:has(svg)")),
+        day_count: text(q(dateSection, "span")),
+    });
+
+    // État courant de la plante (calculé une seule fois pour toute la page)
+    let plantState = null;
+    const stageEl = document.querySelector("div[data-testid='growlog-page-details-stage'] span.capitalize");
+    if (stageEl) {
+        plantState = text(stageEl);
+    } else {
+        const active = q(document.querySelector("div[data-testid='growlog-page-tree-stages']"),
+                         "span[data-testid='growlog-page-tree-stages-item-name-value'].text-primary");
+        if (active) plantState = text(active);
+    }
 
-    # Déterminer l'état de la plante (à partir des infos générales, pas directement dans la timeline)
-    plant_state = await extract_plant_state(page)
-    logger.debug(f"Plant state: {plant_state}")
+    const stageChanges = qa(document, "div[data-testid='growlog-page-timeline-stage-change']").map(sc => {
+        const stageSection = q(sc, "div[data-testid='growlog-page-timeline-stage-change-stage']");
+        const icon = q(stageSection, "i");
+        return {
+            ...dateInfo(q(sc, "div[data-testid='growlog-page-timeline-stage-change-date']")),
+            stage_change: text(q(stageSection, "div > div > span")),
+            icon_class: icon ? icon.getAttribute("class") : null,
+        };
+    });
 
-    # Extraire les actions (reminders) et les images
-    actions = await extract_actions(card, verbose)
-    images = await extract_images(card, verbose)
-    tree_logs = await extract_tree_logs(card, verbose)
-    logger.debug(f"Found {len(actions)} actions")
+    const cards = qa(document, "div[data-testid='growlog-page-timeline-card']").map(card => ({
+        ...dateInfo(q(card, "div[data-testid='growlog-page-timeline-card-date']")),
+        actions: qa(q(card, "div[data-testid='growlog-page-timeline-reminders']"),
+                    "div[data-testid='growlog-page-timeline-reminder-item']").map(item => ({
+            name: text(q(item, "span[data-testid='growlog-page-timeline-reminder-item-name']")),
+            amount: text(q(item, "span[data-testid='growlog-page-timeline-reminder-extra-data-amount-value']")),
+        })),
+        images: qa(q(card, "div[data-testid='growlog-page-timeline-photos']"),
+                   "div[data-testid='growlog-page-timeline-photos-item']")
+            .map(item => { const img = q(item, "img"); return img ? img.getAttribute("src") : null; })
+            .filter(src => src),
+        tree_logs: qa(q(card, "div[data-testid='growlog-page-timeline-tree-log']"),
+                      "div[data-testid='growlog-page-timeline-log-item']").map(item => ({
+            label: text(q(item, "div[data-testid='growlog-page-timeline-log-item-label']")),
+            value: text(q(item, "div[data-testid='growlog-page-timeline-log-item-value']")),
+        })),
+    }));
 
     return {
-        "full_date": date_text.strip(),
-        "day_count": day_count.strip(),
-        "plant_state": plant_state,
-        "actions": actions,
-        "images": images,
-        "tree_logs": tree_logs
-    }
+        plant_state: plantState,
+        stage_changes: stageChanges,
+        cards: cards,
+        metadata: (%s)(),
+    };
+}
+""" % EXTRACT_METADATA_JS.strip()
 
-async def extract_stage_change(stage_change, page, verbose=True):
-    logger.debug("Extracting stage change data...")
-    try:
-        # Récupérer la date et le nombre de jours
-        date_section = await stage_change.query_selector("div[data-testid='growlog-page-timeline-stage-change-date']")
-        date_element = await date_section.query_selector("div:has(svg)")
-        date_text = await date_element.evaluate("el => el.textContent") if date_element else ""
-        day_count_element = await date_section.query_selector("span")
-        day_count = await day_count_element.evaluate("el => el.textContent") if day_count_element else ""
-        logger.info(f"Stage change date: '{date_text}', day_count: '{day_count}'")
-        # Extraire l'étape de croissance
-        stage_section = await stage_change.query_selector("div[data-testid='growlog-page-timeline-stage-change-stage']")
-        stage_text_element = await stage_section.query_selector("div > div > span")
-        stage_text = await stage_text_element.evaluate("el => el.textContent") if stage_text_element else ""
-        logger.info(f"Stage change text: '{stage_text}'")
-        # Récupérer l'icône pour déterminer le state
-        icon_element = await stage_section.query_selector("i")
-        if icon_element:
-            icon_class = await icon_element.get_attribute("class")
-            logger.info(f"Stage change icon class: '{icon_class}'")
-            plant_state = clean_plant_state(icon_class.replace("icon-", "")) if "icon-" in icon_class else "Unknown"
-        else:
-            plant_state = "Unknown"
-        logger.info(f"Stage change plant_state: '{plant_state}'")
-        result = {
-            "full_date": date_text.strip(),
-            "day_count": day_count.strip(),
-            "plant_state": plant_state,
-            "stage_change": stage_text.strip(),
+DEFAULT_ENVIRONMENT = {
+    "Name": "Hydro mars",
+    "Type": "Indoor",
+    "Exposure Time": "16 Hours",
+    "Environment Size": "80 cm x 160 cm x 80 cm",
+    "Lights": "LED - 150 W"
+}
+
+
+async def extract_page_data(page: Page):
+    """Retourne les données brutes de toute la page via un unique `page.evaluate`"""
+    return await page.evaluate(EXTRACT_PAGE_JS)
+
+
+async def extract_logs(page: Page, verbose=True):
+    logger.info("Starting extraction of grow logs...")
+    with log_sampling(logger):
+        return await _extract_logs(page)
+
+
+async def _extract_logs(page: Page):
+    return parse_page_data(await extract_page_data(page))
+
+
+def parse_page_data(raw):
+    """Construit les entrées de journal et les métadonnées à partir du résultat d'`extract_page_data`"""
+    metadata = build_metadata(raw["metadata"])
+
+    # Valeur de niveau page : calculée une seule fois et non plus pour chaque carte
+    plant_state = clean_plant_state(raw["plant_state"].strip().lower()) if raw["plant_state"] else "Unknown"
+    logger.debug("Plant state: %s", plant_state)
+
+    # Extraire tous les changements de stade d'abord
+    stage_change_entries = []
+    stage_change_dates = []
+    for sc in raw["stage_changes"]:
+        icon_class = sc["icon_class"] or ""
+        entry_data = {
+            "full_date": sc["full_date"].strip(),
+            "day_count": sc["day_count"].strip(),
+            "plant_state": clean_plant_state(icon_class.replace("icon-", "")) if "icon-" in icon_class else "Unknown",
+            "stage_change": sc["stage_change"].strip(),
             "actions": [],
             "images": [],
             "tree_logs": {}
         }
-        logger.info(f"Extracted stage change entry: {result}")
-        return result
-    except Exception as e:
-        logger.error(f"Error extracting stage change: {e}", exc_info=True)
-        return None
+        stage_change_entries.append(entry_data)
+        stage_change_dates.append(entry_data['full_date'])
+        if logger.isEnabledFor(logging.DEBUG) and sampled("stage_change"):
+            logger.debug("Stage change details: %s", entry_data)
+    logger.info("Found %s stage changes", len(stage_change_entries))
 
-async def extract_plant_state(page):
-    logger.debug("Extracting plant state...")
-    try:
-        # Dans la nouvelle interface, l'état courant de la plante est affiché dans la colonne de gauche
-        stage_element = await page.query_selector("div[data-testid='growlog-page-details-stage'] span.capitalize")
-        if stage_element:
-            stage_name = await stage_element.text_content()
-            logger.debug(f"Found current stage: {stage_name}")
-            return clean_plant_state(stage_name.strip().lower())
-            
-        # Essayer une autre méthode si la première échoue
-        tree_stages = await page.query_selector("div[data-testid='growlog-page-tree-stages']")
-        if tree_stages:
-            active_stage = await tree_stages.query_selector("span[data-testid='growlog-page-tree-stages-item-name-value'].text-primary")
-            if active_stage:
-                stage_name = await active_stage.text_content()
-                logger.debug(f"Found active stage from tree stages: {stage_name}")
-                return clean_plant_state(stage_name.strip().lower())
-    except Exception as e:
-        logger.error(f"Error extracting plant state: {e}", exc_info=True)
+    # Extraire les entrées de journal normales
+    logger.info("Found %s timeline cards", len(raw['cards']))
+    entries = []
+    for card in raw["cards"]:
+        actions = []
+        for action in card["actions"]:
+            if action["name"] and action["amount"]:
+                actions.append(f"{action['name'].strip()}: {action['amount'].strip()}")
+            elif action["name"]:
+                actions.append(action["name"].strip())
 
-    logger.debug("No state found, defaulting to 'Unknown'")
-    return "Unknown"
+        entry_data = {
+            "full_date": card["full_date"].strip(),
+            "day_count": card["day_count"].strip(),
+            "plant_state": plant_state,
+            "actions": actions,
+            "images": [src.replace("_thumb@480_", "_") for src in card["images"]],
+            "tree_logs": {
+                log["label"].strip(): log["value"].strip()
+                for log in card["tree_logs"] if log["label"] and log["value"]
+            }
+        }
 
-async def extract_actions(card, verbose=True):
-    logger.debug("Extracting actions from timeline card...")
-    actions = []
-    
-    try:
-        # Vérifier s'il y a une section "Actions"
-        reminders_section = await card.query_selector("div[data-testid='growlog-page-timeline-reminders']")
-        if not reminders_section:
-            logger.debug("No actions section found in this card")
-            return actions
-            
-        # Trouver tous les éléments d'action
-        reminder_items = await reminders_section.query_selector_all("div[data-testid='growlog-page-timeline-reminder-item']")
-        logger.debug(f"Found {len(reminder_items)} reminder items")
-        
-        for item in reminder_items:
-            try:
-                # Extraire le nom de l'action
-                name_element = await item.query_selector("span[data-testid='growlog-page-timeline-reminder-item-name']")
-                action_name = await name_element.text_content() if name_element else ""
-                
-                # Extraire la valeur des données supplémentaires
-                amount_element = await item.query_selector("span[data-testid='growlog-page-timeline-reminder-extra-data-amount-value']")
-                amount_text = await amount_element.text_content() if amount_element else ""
-                
-                # Combiner le nom et la valeur
-                if action_name and amount_text:
-                    actions.append(f"{action_name.strip()}: {amount_text.strip()}")
-                    logger.debug(f"Added action with value: '{action_name.strip()}: {amount_text.strip()}'")
-                elif action_name:
-                    actions.append(action_name.strip())
-                    logger.debug(f"Added action: '{action_name.strip()}'")
-                        
-            except Exception as e:
-                logger.error(f"Error processing action item: {e}", exc_info=True)
-                
-    except Exception as e:
-        logger.error(f"Error extracting actions: {e}", exc_info=True)
-    
-    return actions
+        # Ne pas ajouter l'état de la plante à chaque entrée
+        # sauf si c'est un changement de stade
+        if entry_data['full_date'] not in stage_change_dates:
+            entry_data.pop('plant_state', None)
 
-async def extract_images(card, verbose=True):
-    logger.debug("Extracting images from timeline card...")
-    images = []
-    try:
-        photos_section = await card.query_selector("div[data-testid='growlog-page-timeline-photos']")
-        if not photos_section:
-            logger.debug("No photos section found in this card")
-            return images
-        photo_items = await photos_section.query_selector_all("div[data-testid='growlog-page-timeline-photos-item']")
-        for item in photo_items:
-            try:
-                img_element = await item.query_selector("img")
-                if img_element:
-                    src = await img_element.get_attribute("src")
-                    if src:
-                        src = src.replace("_thumb@480_", "_")
-                        images.append(src)
-            except Exception as e:
-                logger.error(f"Error processing image item: {e}", exc_info=True)
-    except Exception as e:
-        logger.error(f"Error extracting images: {e}", exc_info=True)
-    return images
+        entries.append(entry_data)
+        if logger.isEnabledFor(logging.DEBUG) and sampled("card"):
+            logger.debug("Entry details: %s", entry_data)
 
-async def extract_tree_logs(card, verbose=True):
-    logger.debug("Extracting tree logs from timeline card...")
-    tree_logs = {}
-    try:
-        tree_log_section = await card.query_selector("div[data-testid='growlog-page-timeline-tree-log']")
-        if not tree_log_section:
-            logger.debug("No tree log section found in this card")
-            return tree_logs
-        else:
-            logger.info("Tree log section found!")
-
-        log_items = await tree_log_section.query_selector_all("div[data-testid='growlog-page-timeline-log-item']")
-        logger.info(f"Found {len(log_items)} tree log items")
-        for item in log_items:
-            label_el = await item.query_selector("div[data-testid='growlog-page-timeline-log-item-label']")
-            value_el = await item.query_selector("div[data-testid='growlog-page-timeline-log-item-value']")
-            label = await label_el.text_content() if label_el else ""
-            value = await value_el.text_content() if value_el else ""
-            logger.info(f"Tree log item: label='{label}', value='{value}'")
-            if label and value:
-                tree_logs[label.strip()] = value.strip()
-    except Exception as e:
-        logger.error(f"Error extracting tree logs: {e}", exc_info=True)
-    logger.info(f"Extracted tree_logs: {tree_logs}")
-    return tree_logs
+    # Fusionner les entrées régulières et les changements de stade
+    all_entries = stage_change_entries + entries
 
-async def extract_metadata(page: Page):
-    logger.info("Extracting grow metadata block...")
+    # Trier par date (du plus récent au plus ancien)
+    all_entries.sort(key=lambda x: x['full_date'], reverse=True)
+
+    logger.info("Extraction completed. Total entries: %s", len(all_entries))
+    return all_entries, metadata
+
+
+def build_metadata(raw_metadata):
+    """Construit le bloc de métadonnées (strain, stages, environment) à partir des données brutes"""
     metadata = {
         "strain": {},
         "stages": [],
         "environment": {}
     }
 
-    try:
-        # STRAIN - Extraire les informations sur la souche
-        logger.debug("Extracting strain information...")
-        strain_container = await page.query_selector("div[data-testid='growlog-page-strain-breeder']")
-        if strain_container:
-            strain_name_element = await strain_container.query_selector("span[data-testid='growlog-page-strain-breeder-strain-name']")
-            strain_name = await strain_name_element.text_content() if strain_name_element else ""
-            
-            strain_value_element = await strain_container.query_selector("span.text-lg.font-bold")
-            strain_value = await strain_value_element.text_content() if strain_value_element else ""
-            
-            metadata["strain"] = {
-                "brand": "Unknown breeder",  # Valeur par défaut
-                "name": strain_value.strip()
-            }
-            
-            # Ajouter à l'environnement aussi
-            metadata["environment"]["Strain"] = strain_value.strip()
-            logger.debug(f"Found strain: {strain_value}")
-        else:
-            logger.debug("Strain container not found")
-            # Valeurs par défaut si on ne trouve pas la souche
-            metadata["strain"] = {
-                "brand": "Unknown breeder",
-                "name": "Unknown strain"
-            }
-        
-        # TREE STAGES - Extraire les étapes de croissance
-        logger.debug("Extracting stages information...")
-        stage_container = await page.query_selector("div[data-testid='growlog-page-tree-stages']")
-        if stage_container:
-            stage_items = await stage_container.query_selector_all("div[data-testid='growlog-page-tree-stages-item']")
-            for stage in stage_items:
-                name_el = await stage.query_selector("span[data-testid='growlog-page-tree-stages-item-name-value']")
-                date_el = await stage.query_selector("div[data-testid='growlog-page-tree-stages-item-name-date'] span")
-                
-                if name_el and date_el:
-                    name = await name_el.text_content()
-                    date = await date_el.text_content()
-                    metadata["stages"].append({"name": name.strip(), "date": date.strip()})
-                    logger.debug(f"Found stage: {name} - {date}")
-
-        # ENVIRONMENT - Extraire les informations sur l'environnement
-        logger.debug("Extracting environment information...")
-        env_section = await page.query_selector("div[data-testid='growlog-page-environment-details']")
-        
-        if env_section:
-            # Extraire le nom
-            name_item = await env_section.query_selector("div[data-testid='growlog-page-environment-details-name']")
-            if name_item:
-                name_value = await name_item.query_selector("span[data-testid='growlog-page-environment-details-name']")
-                if name_value:
-                    env_name = await name_value.text_content()
-                    metadata["environment"]["Name"] = env_name.strip()
-            
-            # Extraire le type (Indoor/Outdoor)
-            type_item = await env_section.query_selector("div[data-testid='growlog-page-environment-details-type']")
-            if type_item:
-                type_value = await type_item.query_selector("span.text-lg")
-                if type_value:
-                    env_type = await type_value.text_content()
-                    metadata["environment"]["Type"] = env_type.strip()
-            
-            # Extraire le temps d'exposition
-            exposure_item = await env_section.query_selector("div[data-testid='growlog-page-environment-details-exposure-time']")
-            if exposure_item:
-                exposure_value = await exposure_item.query_selector("span.text-lg")
-                if exposure_value:
-                    exposure = await exposure_value.text_content()
-                    metadata["environment"]["Exposure Time"] = exposure.strip()
-            
-            # Extraire la taille de l'environnement
-            size_item = await env_section.query_selector("div[data-testid='growlog-page-environment-details-indoor-size']")
-            if size_item:
-                size_value = await size_item.query_selector("span.text-lg")
-                if size_value:
-                    size = await size_value.text_content()
-                    metadata["environment"]["Environment Size"] = size.strip()
-            
-            # Extraire les informations sur les lumières
-            lights_item = await env_section.query_selector("div[data-testid='growlog-page-environment-details-lights']")
-            if lights_item:
-                lights_value = await lights_item.query_selector("span[data-testid='growlog-page-environment-details-lights-value']")
-                if lights_value:
-                    light_items = await lights_value.query_selector_all("p")
-                    lights = []
-                    for light in light_items:
-                        light_text = await light.text_content()
-                        lights.append(light_text.strip())
-                    
-                    metadata["environment"]["Lights"] = " | ".join(lights)
-        
-        # Si aucune information d'environnement n'a été trouvée, utiliser des valeurs par défaut
-        if not metadata["environment"]:
-            metadata["environment"] = {
-                "Name": "Hydro mars",
-                "Type": "Indoor", 
-                "Exposure Time": "16 Hours",
-                "Environment Size": "80 cm x 160 cm x 80 cm",
-                "Lights": "LED - 150 W"
-            }
+    if raw_metadata["strain"] is not None:
+        strain_value = raw_metadata["strain"].strip()
+        metadata["strain"] = {
+            "brand": "Unknown breeder",  # Valeur par défaut
+            "name": strain_value
+        }
+        # Ajouter à l'environnement aussi
+        metadata["environment"]["Strain"] = strain_value
+    else:
+        logger.debug("Strain container not found")
+        # Valeurs par défaut si on ne trouve pas la souche
+        metadata["strain"] = {
+            "brand": "Unknown breeder",
+            "name": "Unknown strain"
+        }
 
-        logger.info(f"Metadata extracted: {metadata}")
-    except Exception as e:
-        logger.error(f"Failed to extract metadata: {e}", exc_info=True)
+    metadata["stages"] = [
+        {"name": stage["name"].strip(), "date": stage["date"].strip()} for stage in raw_metadata["stages"]
+    ]
+
+    for label, value in (raw_metadata["environment"] or {}).items():
+        if value is None:
+            continue
+        metadata["environment"][label] = " | ".join(value) if isinstance(value, list) else value.strip()
+
+    # Si aucune information d'environnement n'a été trouvée, utiliser des valeurs par défaut
+    if not metadata["environment"]:
+        metadata["environment"] = dict(DEFAULT_ENVIRONMENT)
 
-    return metadata
\ No newline at end of file
+    logger.info("Metadata extracted: %s", metadata)
+    return metadata
+
+
+async def extract_metadata(page: Page, raw=None):
+    """
+    Métadonnées du growlog. Si `raw` (résultat d'`extract_page_data`) est
+    fourni, il est réutilisé sans nouvel aller-retour navigateur ; sinon seul
+    le bloc de métadonnées est évalué.
+    """
+    logger.info("Extracting grow metadata block...")
+    try:
+        raw_metadata = raw["metadata"] if raw is not None else await page.evaluate(EXTRACT_METADATA_JS)
+        return build_metadata(raw_metadata)
+    except Exception as e:
+        logger.error("Failed to extract metadata: %s", e, exc_info=True)
+        return {"strain": {}, "stages": [], "environment": {}}
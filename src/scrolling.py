@@ -0,0 +1,129 @@
+"""Scrolling module.
+End-of-timeline detection shared by both scraping engines: scroll, then wait
+only as long as the page is actually loading more timeline items.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import Page
+
+logger = logging.getLogger('scrolling')
+
+TIMELINE_ITEMS_SELECTOR = (
+    "div[data-testid='growlog-page-timeline-card'], "
+    "div[data-testid='growlog-page-timeline-stage-change']"
+)
+
+# Un seul aller-retour navigateur pour lire le nombre d'éléments et la hauteur
+_MEASURE_JS = "sel => [document.querySelectorAll(sel).length, document.body.scrollHeight]"
+
+
+@dataclass
+class ScrollStats:
+    steps: int = 0
+    items: int = 0
+    duration: float = 0.0
+    stop_reason: str = ""
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class NetworkActivity:
+    """Suit les requêtes en cours d'une page pour détecter le calme réseau"""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.in_flight = 0
+        self.last_activity = time.monotonic()
+
+    def _on_request(self, request):
+        self.in_flight += 1
+        self.last_activity = time.monotonic()
+
+    def _on_done(self, request):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.last_activity = time.monotonic()
+
+    def attach(self):
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_done)
+        self.page.on("requestfailed", self._on_done)
+
+    def detach(self):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_done)
+        self.page.remove_listener("requestfailed", self._on_done)
+
+    def quiet_for(self) -> float:
+        """Durée depuis la dernière activité réseau (0 si des requêtes sont en cours)"""
+        if self.in_flight:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+
+async def scroll_to_end(
+    page: Page,
+    item_selector: str = TIMELINE_ITEMS_SELECTOR,
+    max_steps: int = 300,
+    growth_timeout: float = 10.0,
+    quiet_time: float = 0.75,
+    poll_interval: float = 0.1,
+    stop_condition: Optional[Callable[[Page], Awaitable[bool]]] = None,
+) -> ScrollStats:
+    """
+    Fait défiler la page jusqu'à la fin de la timeline.
+
+    Après chaque défilement, on attend que le nombre d'éléments (ou la hauteur
+    de la page) augmente. Si rien n'a bougé et que le réseau est resté calme
+    pendant `quiet_time` secondes, la fin est atteinte. `growth_timeout` borne
+    l'attente d'une étape quand le réseau reste occupé, et `max_steps` borne
+    le nombre total d'étapes. `stop_condition` permet d'arrêter plus tôt
+    (par exemple quand des cartes déjà connues apparaissent).
+    """
+    stats = ScrollStats()
+    start = time.perf_counter()
+    network = NetworkActivity(page)
+    network.attach()
+    try:
+        items, height = await page.evaluate(_MEASURE_JS, item_selector)
+        while True:
+            if stop_condition is not None and await stop_condition(page):
+                stats.stop_reason = "stop_condition"
+                break
+            if stats.steps >= max_steps:
+                stats.stop_reason = "max_steps"
+                break
+
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            stats.steps += 1
+            step_start = time.monotonic()
+
+            grew = False
+            while True:
+                await asyncio.sleep(poll_interval)
+                new_items, new_height = await page.evaluate(_MEASURE_JS, item_selector)
+                if new_items > items or new_height > height:
+                    items, height = new_items, new_height
+                    grew = True
+                    break
+                elapsed = time.monotonic() - step_start
+                if elapsed >= quiet_time and network.quiet_for() >= quiet_time:
+                    break
+                if elapsed >= growth_timeout:
+                    break
+
+            if not grew:
+                stats.stop_reason = "network_idle" if network.quiet_for() >= quiet_time else "growth_timeout"
+                break
+    finally:
+        network.detach()
+
+    stats.items = items
+    stats.duration = time.perf_counter() - start
+    logger.info("Scrolling finished: %s items, %s steps, %.2fs, stop reason: %s",
+                stats.items, stats.steps, stats.duration, stats.stop_reason)
+    return stats
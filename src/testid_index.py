@@ -0,0 +1,116 @@
+"""data-testid index module.
+Walks a parsed growlog page once and indexes its elements by `data-testid`,
+so the `_extract_*` helpers no longer search the whole document each time.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Éléments qui délimitent une portée : leurs descendants sont aussi indexés à part
+SCOPE_TESTIDS = frozenset({
+    'growlog-page-timeline-card',
+    'growlog-page-timeline-stage-change',
+})
+INDEXED_TAGS = ('h1', 'img')
+INDEXED_LABELS = ('Tree Stages',)
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """Analyse le HTML avec lxml s'il est installé, sinon avec html.parser"""
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+class DataTestIdIndex:
+    """
+    Index `data-testid` -> éléments (ordre du document), plus quelques tags
+    (`h1`, `img`) et libellés textuels utilisés par l'extracteur.
+
+    Chaque carte de timeline et chaque changement de stage a sa propre
+    portée (`scope(element)`), indexée pendant le même parcours.
+    """
+
+    def __init__(self):
+        self._by_testid: Dict[str, List[Tag]] = defaultdict(list)
+        self._by_tag: Dict[str, List[Tag]] = defaultdict(list)
+        self._by_label: Dict[str, List[Tag]] = defaultdict(list)
+        self._scopes: Dict[int, 'DataTestIdIndex'] = {}
+
+    @classmethod
+    def build(cls, root: Tag, tags: Iterable[str] = INDEXED_TAGS,
+              labels: Iterable[str] = INDEXED_LABELS) -> 'DataTestIdIndex':
+        index = cls()
+        tags = frozenset(tags)
+        labels = frozenset(labels)
+        stack = [(child, None) for child in reversed(root.contents) if isinstance(child, Tag)]
+        while stack:
+            node, scope = stack.pop()
+            testid = node.attrs.get('data-testid')
+            targets = (index,) if scope is None else (index, scope)
+            if testid:
+                for target in targets:
+                    target._by_testid[testid].append(node)
+            if node.name in tags:
+                for target in targets:
+                    target._by_tag[node.name].append(node)
+            if labels and node.name == 'div' and len(node.contents) == 1:
+                text = node.string
+                if text is not None and text in labels:
+                    index._by_label[str(text)].append(node)
+            if testid in SCOPE_TESTIDS:
+                scope = cls()
+                index._scopes[id(node)] = scope
+            stack.extend((child, scope) for child in reversed(node.contents) if isinstance(child, Tag))
+        return index
+
+    def all(self, testid: str, name: Optional[str] = None) -> List[Tag]:
+        elements = self._by_testid.get(testid, [])
+        if name is None:
+            return list(elements)
+        return [el for el in elements if el.name == name]
+
+    def first(self, testid: str, name: Optional[str] = None) -> Optional[Tag]:
+        for el in self._by_testid.get(testid, []):
+            if name is None or el.name == name:
+                return el
+        return None
+
+    def tags(self, name: str) -> List[Tag]:
+        return list(self._by_tag.get(name, []))
+
+    def labelled(self, label: str) -> List[Tag]:
+        return list(self._by_label.get(label, []))
+
+    def scope(self, element: Tag) -> 'DataTestIdIndex':
+        return self._scopes.get(id(element)) or DataTestIdIndex()
+
+
+class SoupLookup:
+    """
+    Même interface que `DataTestIdIndex`, mais chaque appel parcourt l'arbre.
+    Implémentation de référence utilisée par les tests et les benchmarks.
+    """
+
+    def __init__(self, root: Tag):
+        self.root = root
+
+    def all(self, testid: str, name: Optional[str] = None) -> List[Tag]:
+        return self.root.find_all(name or True, attrs={'data-testid': testid})
+
+    def first(self, testid: str, name: Optional[str] = None) -> Optional[Tag]:
+        return self.root.find(name or True, attrs={'data-testid': testid})
+
+    def tags(self, name: str) -> List[Tag]:
+        return self.root.find_all(name)
+
+    def labelled(self, label: str) -> List[Tag]:
+        return self.root.find_all('div', string=label)
+
+    def scope(self, element: Tag) -> 'SoupLookup':
+        return SoupLookup(element)
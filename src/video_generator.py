@@ -1,11 +1,36 @@
 import fitz  # PyMuPDF
-import cv2
-import numpy as np
-import moviepy.video.io.ImageSequenceClip as ImageSequenceClip
+import hashlib
+import imageio_ffmpeg
 from PIL import Image, ImageDraw, ImageFont
 import io
+import logging
 import os
 import re
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from PIL import ImageOps
+from src.manifest import load_manifest, manifest_photos
+from src.metrics import VIDEO_FRAMES, stage
+from src.video_profiles import DEFAULT_VIDEO_PROFILE, get_video_profile
+
+logger = logging.getLogger('video_generator')
+
+# Dossier des vidéos générées
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
+# Images datées conservées, un dossier par vidéo
+FRAMES_DIR = os.path.join(OUTPUT_DIR, "frames")
+# Taille maximale des images de la vidéo
+FRAME_MAX_SIZE = (1920, 1920)
+# Threads de préparation des images (date, normalisation, export JPEG)
+FRAME_PREP_WORKERS = min(4, os.cpu_count() or 1)
+# Les images plus petites (logos, icônes) ne sont pas des photos du growlog
+PDF_IMAGE_MIN_SIZE = 300
+# Durée maximale de la vidéo avant réduction de la durée par image (secondes)
+MAX_VIDEO_SECONDS = 360
 
 def clean_filename(filename):
     base, ext = os.path.splitext(filename)  # Sépare le nom et l'extension
@@ -14,32 +39,71 @@ def clean_filename(filename):
     return f"{base}{ext}"  # Recolle l'extension
 
 
-def save_images_to_folder(images, dates, video_name):
-    """Sauvegarde les images dans un dossier spécifique avec le format photo_DateLier_id"""
-    # Créer le dossier output/NomDeLaVideo
-    output_dir = os.path.join("output", video_name.replace('.mp4', ''))
+def load_frame(source, max_size=FRAME_MAX_SIZE, fit=None):
+    """
+    Image RVB prête pour la vidéo depuis un chemin ou une image PIL, avec
+    l'orientation EXIF appliquée. Sans `fit`, elle est réduite pour tenir
+    dans `max_size` ; avec "letterbox" ou "crop", elle est mise exactement
+    à la taille `max_size` (bandes noires ou recadrage centré).
+    """
+    img = Image.open(source) if isinstance(source, (str, os.PathLike)) else source
+    try:
+        if max_size is not None:
+            # Décodage JPEG à échelle réduite pour les originaux de plusieurs mégapixels
+            img.draft('RGB', max_size)
+        frame = ImageOps.exif_transpose(img)
+        if frame.mode != 'RGB':
+            frame = frame.convert('RGB')
+        if max_size is None:
+            return frame
+        if fit == "letterbox":
+            return ImageOps.pad(frame, max_size, Image.LANCZOS, color=(0, 0, 0))
+        if fit == "crop":
+            return ImageOps.fit(frame, max_size, Image.LANCZOS)
+        frame.thumbnail(max_size)
+        return frame
+    finally:
+        if img is not source:
+            img.close()
+
+def _prepare_frame(index, source, date, output_dir, add_dates, max_size, fit):
+    try:
+        frame = load_frame(source, max_size, fit)
+    except Exception as e:
+        logger.warning("Erreur lors du chargement d'une photo: %s", e)
+        return None
+    if add_dates:
+        frame = add_date_to_image(frame, date, load_date_font())
+    # Nom du fichier au format photo_DateLier_id
+    image_path = os.path.join(output_dir, f"photo_{clean_filename(date)}_{index:03d}.jpg")
+    frame.save(image_path, "JPEG", quality=95)
+    return image_path
+
+def prepare_frames(frames, output_dir, add_dates=True, max_size=FRAME_MAX_SIZE, fit=None, max_workers=None):
+    """
+    Prépare les paires (source, date) en parallèle — `source` est un chemin
+    ou une image PIL — : chargement et normalisation (voir `load_frame`), date incrustée, export
+    JPEG dans `output_dir`. Retourne les chemins des images dans l'ordre
+    d'entrée ; les sources illisibles sont ignorées.
+
+    `frames` peut être un générateur : au plus deux images par thread sont
+    en cours de préparation à un instant donné.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    
+    max_workers = max_workers or FRAME_PREP_WORKERS
     saved_images = []
-    for i, (img, date) in enumerate(zip(images, dates)):
-        # Nettoyer la date pour le nom de fichier
-        clean_date = clean_filename(date)
-        # Générer le nom du fichier avec le format photo_DateLier_id
-        image_filename = f"photo_{clean_date}_{i:03d}.jpg"
-        image_path = os.path.join(output_dir, image_filename)
-        
-        # Sauvegarder l'image
-        img.save(image_path, "JPEG", quality=95)
-        saved_images.append(image_path)
-    
-    return output_dir, saved_images
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for i, (source, date) in enumerate(frames):
+            pending.append(executor.submit(_prepare_frame, i, source, date, output_dir, add_dates, max_size, fit))
+            if len(pending) >= 2 * max_workers:
+                saved_images.append(pending.popleft().result())
+        while pending:
+            saved_images.append(pending.popleft().result())
+    return [path for path in saved_images if path is not None]
 
-def extract_images_and_dates_from_pdf(pdf_path):
-    """Extrait les images et dates en maintenant la correspondance correcte"""
-    doc = fitz.open(pdf_path)
-    all_images = []
-    all_dates = []
-    
+def extract_pdf_dates(doc):
+    """Dates uniques des entrées du PDF, dans l'ordre du document"""
     # Extraire toutes les dates du document
     all_date_entries = []
     for page_num in range(len(doc)):
@@ -52,209 +116,316 @@ def extract_images_and_dates_from_pdf(pdf_path):
                     all_date_entries.append(line)
     
     # Éliminer les doublons tout en préservant l'ordre
-    unique_dates = []
-    for date in all_date_entries:
-        if date not in unique_dates:
-            unique_dates.append(date)
-    
-    # Extraire les images et filtrer
-    image_hashes = set()  # Pour filtrer les doublons
+    return list(dict.fromkeys(all_date_entries))
+
+def perceptual_hash(img, hash_size=8):
+    """dHash : compare chaque pixel à son voisin de droite sur une vignette en niveaux de gris"""
+    img.draft('L', (hash_size * 4, hash_size * 4))
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.load()
+    bits = 0
+    for y in range(hash_size):
+        for x in range(hash_size):
+            bits = (bits << 1) | (pixels[x, y] > pixels[x + 1, y])
+    return bits
+
+def _open_pdf_image(doc, xref):
+    return Image.open(io.BytesIO(doc.extract_image(xref)["image"]))
+
+def find_pdf_images(doc, min_size=PDF_IMAGE_MIN_SIZE, near_duplicate_distance=None):
+    """
+    xrefs des photos du PDF, dans l'ordre du document, sans décoder les images :
+    les doublons sont écartés par xref puis par empreinte du flux compressé.
+    Avec `near_duplicate_distance`, les quasi-doublons (distance de Hamming
+    entre dHash au plus égale) sont aussi écartés, au prix d'un décodage
+    à échelle réduite.
+    """
+    seen_xrefs = set()
+    seen_digests = set()
+    seen_hashes = []
+    xrefs = []
     for page_num in range(len(doc)):
-        page = doc[page_num]
-        image_list = page.get_images(full=True)
+        for img_info in doc[page_num].get_images(full=True):
+            xref, width, height = img_info[0], img_info[2], img_info[3]
+            if xref in seen_xrefs:
+                continue
+            seen_xrefs.add(xref)
+            # Filtrer les images trop petites ou non pertinentes
+            if width < min_size or height < min_size:
+                continue
+            digest = hashlib.sha1(doc.xref_stream_raw(xref)).digest()
+            if digest in seen_digests:
+                continue
+            seen_digests.add(digest)
+            if near_duplicate_distance is not None:
+                try:
+                    with _open_pdf_image(doc, xref) as img:
+                        img_hash = perceptual_hash(img)
+                except Exception as e:
+                    logger.warning("Erreur lors du traitement d'une image: %s", e)
+                    continue
+                if any((img_hash ^ other).bit_count() <= near_duplicate_distance for other in seen_hashes):
+                    continue
+                seen_hashes.append(img_hash)
+            xrefs.append(xref)
+    return xrefs
+
+def iter_images_and_dates_from_pdf(pdf_path, near_duplicate_distance=None):
+    """
+    Génère les paires (image, date) du PDF, de la plus ancienne à la plus
+    récente. Les images sont décodées au fur et à mesure de l'itération.
+    """
+    with fitz.open(pdf_path) as doc:
+        unique_dates = extract_pdf_dates(doc)
+        xrefs = find_pdf_images(doc, near_duplicate_distance=near_duplicate_distance)
+        
+        logger.info("Nombre total d'images valides: %s", len(xrefs))
+        logger.info("Nombre total de dates uniques: %s", len(unique_dates))
+        if not xrefs or not unique_dates:
+            return
+        
+        # Inverser les deux listes pour commencer par la fin
+        xrefs.reverse()
+        unique_dates.reverse()
+        
+        # Calculer combien d'images par date en moyenne
+        images_per_date = len(xrefs) / len(unique_dates)
+        logger.info("Estimation: environ %.1f images par date", images_per_date)
         
-        for img_info in image_list:
-            xref = img_info[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            
+        for i, xref in enumerate(xrefs):
+            date_index = min(int(i / images_per_date), len(unique_dates) - 1)
             try:
-                img = Image.open(io.BytesIO(image_bytes))
-                
-                # Filtrer les images trop petites ou non pertinentes
-                if img.width >= 300 and img.height >= 300:
-                    # Vérifier si c'est un doublon
-                    img_hash = hash(img.tobytes())
-                    if img_hash not in image_hashes:
-                        image_hashes.add(img_hash)
-                        all_images.append(img)
+                # Seul l'en-tête est lu ici : le décodage a lieu lors de la préparation des images
+                img = _open_pdf_image(doc, xref)
             except Exception as e:
-                print(f"Erreur lors du traitement d'une image: {e}")
+                logger.warning("Erreur lors du traitement d'une image: %s", e)
                 continue
-    
-    print(f"Nombre total d'images valides: {len(all_images)}")
-    print(f"Nombre total de dates uniques: {len(unique_dates)}")
-    
-    # Inverser les deux listes pour commencer par la fin
-    all_images.reverse()
-    unique_dates.reverse()
-    
-    # Associer les dates aux images
+            yield img, unique_dates[date_index]
+
+def extract_images_and_dates_from_pdf(pdf_path, near_duplicate_distance=None):
+    """Extrait les images et dates en maintenant la correspondance correcte"""
     result_images = []
     result_dates = []
-    
-    if len(all_images) > 0 and len(unique_dates) > 0:
-        # Calculer combien d'images par date en moyenne
-        images_per_date = len(all_images) / len(unique_dates)
-        print(f"Estimation: environ {images_per_date:.1f} images par date")
-        
-        for i, img in enumerate(all_images):
-            date_index = min(int(i / images_per_date), len(unique_dates) - 1)
-            result_images.append(img)
-            result_dates.append(unique_dates[date_index])
-    
+    for img, date in iter_images_and_dates_from_pdf(pdf_path, near_duplicate_distance):
+        result_images.append(img)
+        result_dates.append(date)
     return result_images, result_dates
 
-def extract_dates_from_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
+def manifest_frames(manifest):
+    """Paires (chemin, date) des photos du manifest, déjà dans l'ordre chronologique ; None s'il est périmé"""
+    photos = manifest_photos(manifest)
+    if photos is None:
+        return None
+    return [(photo["path"], photo["date"]) for photo in photos]
+
+def iter_images_and_dates_from_manifest(manifest, max_size=FRAME_MAX_SIZE):
+    """Génère les paires (image, date) des photos du manifest, une photo décodée à la fois"""
+    for path, date in manifest_frames(manifest) or []:
+        try:
+            frame = load_frame(path, max_size)
+        except Exception as e:
+            logger.warning("Erreur lors du chargement d'une photo: %s", e)
+            continue
+        yield frame, date
+
+def load_images_and_dates_from_manifest(manifest, max_size=FRAME_MAX_SIZE):
+    """Charge les photos du manifest (déjà dans l'ordre chronologique) avec leur date réelle"""
+    images = []
     dates = []
-    for page in doc:
-        text = page.get_text("text")
-        for line in text.split("\n"):
-            if any(month in line for month in ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]):
-                dates.append(line.strip())
-    return dates
+    for img, date in iter_images_and_dates_from_manifest(manifest, max_size):
+        images.append(img)
+        dates.append(date)
+    return images, dates
 
-def add_date_to_images(images, dates):
-    edited_images = []
+@lru_cache(maxsize=None)
+def load_date_font():
     try:
-        font = ImageFont.truetype("Arial", 20)  # Essayez d'utiliser Arial
+        return ImageFont.truetype("Arial", 20)  # Essayez d'utiliser Arial
     except:
-        font = ImageFont.load_default()  # Fallback si Arial n'est pas disponible
-    
-    # Les dates sont déjà inversées dans extract_images_and_dates_from_pdf
-    # Ne pas les inverser une seconde fois ici
-    
-    # Préparer les dates pour les distribuer sur les images
-    if len(dates) > 0 and len(images) > 0:
-        # Calculer combien d'images en moyenne par date
-        avg_images_per_date = len(images) / len(dates)
-        print(f"En moyenne, il y a {avg_images_per_date:.2f} images par date")
-        
-        # Assigner les dates aux images
-        image_dates = []
-        for i in range(len(images)):
-            # Trouver la date correspondante
-            date_index = min(int(i / avg_images_per_date), len(dates) - 1)
-            image_dates.append(dates[date_index])
-    else:
-        image_dates = [""] * len(images)
-    
-    print(f"Distribution des dates : {len(dates)} dates pour {len(images)} images")
-    
-    for i, img in enumerate(images):
-        # Convertir en mode RGB si nécessaire
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-            
-        img_copy = img.copy()  # Créer une copie pour ne pas modifier l'original
-        draw = ImageDraw.Draw(img_copy)
-        
-        # Positionner la date en bas à gauche
-        text_position = (10, img_copy.height - 30)
-        date = image_dates[i] if i < len(image_dates) else ""
-        
-        # Ajouter un fond noir sous le texte pour meilleure lisibilité
-        # Utiliser la nouvelle méthode dans PIL récent
-        if hasattr(font, 'getbbox'):
-            bbox = font.getbbox(date)
-            text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        elif hasattr(draw, 'textsize'):
-            text_width, text_height = draw.textsize(date, font=font)
-        else:
-            # Estimation approximative si aucune méthode n'est disponible
-            text_width, text_height = len(date) * 10, 20
-        
-        draw.rectangle(
-            [text_position[0], text_position[1], text_position[0] + text_width, text_position[1] + text_height],
-            fill=(0, 0, 0, 128)
-        )
-        
-        # Ajouter le texte
-        draw.text(text_position, date, fill=(255, 255, 255), font=font)
-        edited_images.append(img_copy)
-    
-    return edited_images
+        return ImageFont.load_default()  # Fallback si Arial n'est pas disponible
 
-def images_to_video(images, dates, output_path, duration=2, fps=1):
-    """Crée une vidéo à partir des images avec leur date"""
-    if not images:
-        print("Aucune image à inclure dans la vidéo.")
-        return
+def add_date_to_image(img, date, font):
+    """Copie de l'image avec la date incrustée en bas à gauche"""
+    # Convertir en mode RGB si nécessaire
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
         
-    # Limiter la durée totale de la vidéo à 3 minutes maximum
-    total_images = len(images)
-    if total_images * duration > 360:  # 3 minutes = 180 secondes
-        duration = max(1, int(180 / total_images))
-        print(f"Durée ajustée à {duration} secondes par image pour limiter la vidéo à 6 minutes")
-    
-    # Normaliser la taille des images si nécessaire
-    max_width = max(img.width for img in images)
-    max_height = max(img.height for img in images)
+    img_copy = img.copy()  # Créer une copie pour ne pas modifier l'original
+    draw = ImageDraw.Draw(img_copy)
     
-    normalized_images = []
-    for img in images:
-        if img.width != max_width or img.height != max_height:
-            # Créer une nouvelle image avec la taille maximale
-            new_img = Image.new('RGB', (max_width, max_height), (0, 0, 0))
-            # Centrer l'image originale
-            x_offset = (max_width - img.width) // 2
-            y_offset = (max_height - img.height) // 2
-            new_img.paste(img, (x_offset, y_offset))
-            normalized_images.append(new_img)
-        else:
-            normalized_images.append(img)
+    # Positionner la date en bas à gauche
+    text_position = (10, img_copy.height - 30)
     
-    # Convertir les images PIL en tableaux numpy
-    np_images = [np.array(img) for img in normalized_images]
-    
-    # Répéter chaque image pour atteindre la durée souhaitée
-    # Par exemple, si fps=1 et duration=2, chaque image apparaît 2 fois
-    expanded_frames = []
-    for img in np_images:
-        frames_for_this_img = [img] * int(fps * duration)
-        expanded_frames.extend(frames_for_this_img)
+    # Ajouter un fond noir sous le texte pour meilleure lisibilité
+    # Utiliser la nouvelle méthode dans PIL récent
+    if hasattr(font, 'getbbox'):
+        bbox = font.getbbox(date)
+        text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    elif hasattr(draw, 'textsize'):
+        text_width, text_height = draw.textsize(date, font=font)
+    else:
+        # Estimation approximative si aucune méthode n'est disponible
+        text_width, text_height = len(date) * 10, 20
     
-    # Créer la vidéo avec les frames répétées
-    clip = ImageSequenceClip.ImageSequenceClip(expanded_frames, fps=fps)
+    draw.rectangle(
+        [text_position[0], text_position[1], text_position[0] + text_width, text_position[1] + text_height],
+        fill=(0, 0, 0, 128)
+    )
     
-    # Écrire la vidéo
-    print(f"Nom du fichier vidéo généré : {output_path}")
-    clip.write_videofile(output_path, fps=fps, codec="libx264")
+    # Ajouter le texte
+    draw.text(text_position, date, fill=(255, 255, 255), font=font)
+    return img_copy
+
+def frame_size(image_paths):
+    """Plus grande largeur et hauteur des images (lecture des en-têtes seulement), arrondies au pair pour x264"""
+    max_width = max_height = 0
+    for path in image_paths:
+        with Image.open(path) as img:
+            max_width = max(max_width, img.width)
+            max_height = max(max_height, img.height)
+    return max_width + max_width % 2, max_height + max_height % 2
+
+def _concat_path(path):
+    return os.path.abspath(path).replace("'", "'\\''")
+
+def encode_video(image_paths, durations, output_path, fps=1, crf=None, preset=None):
+    """
+    Encode les images (fichiers) en H.264 en streaming : ffmpeg lit la liste
+    via le démultiplexeur concat, qui donne à chaque image sa propre durée
+    (arrondie à 1/fps), et décode une image à la fois. Les images plus petites
+    que la plus grande sont centrées sur fond noir. `crf` et `preset` sont
+    passés à libx264 (ses valeurs par défaut sinon).
+    """
+    durations = list(durations)
+    if len(durations) != len(image_paths):
+        raise ValueError(f"{len(durations)} durées pour {len(image_paths)} images")
+    width, height = frame_size(image_paths)
+    fd, list_path = tempfile.mkstemp(prefix='.tmp-', suffix='.ffconcat', dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write("ffconcat version 1.0\n")
+            for path, seconds in zip(image_paths, durations):
+                f.write(f"file '{_concat_path(path)}'\nduration {seconds}\n")
+            # La durée de la dernière entrée n'est prise en compte que si elle
+            # est suivie d'une autre ; `-frames:v` coupe ensuite cette copie
+            f.write(f"file '{_concat_path(image_paths[-1])}'\n")
+        command = [
+            imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-vf', f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,format=yuv420p",
+            '-r', str(fps), '-frames:v', str(max(1, round(sum(durations) * fps))), '-c:v', 'libx264',
+        ]
+        if crf is not None:
+            command += ['-crf', str(crf)]
+        if preset is not None:
+            command += ['-preset', preset]
+        command += ['-movflags', '+faststart', output_path]
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg a échoué ({result.returncode}): {result.stderr.strip()[-1000:]}")
+    finally:
+        os.remove(list_path)
+
+def images_to_video(images, output_path, duration=2, fps=1, durations=None, crf=None, preset=None):
+    """
+    Crée une vidéo à partir des images, déjà datées par `prepare_frames`.
+
+    `images` : images PIL ou chemins de fichiers (liste ou générateur).
+    `durations` : durée de chaque image en secondes ; à défaut `duration`
+    pour toutes.
+    """
+    with tempfile.TemporaryDirectory(prefix='.tmp-frames-', dir=os.path.dirname(os.path.abspath(output_path))) as tmp_dir:
+        # Les images PIL sont écrites une à une sur disque : ffmpeg les relit au fil de l'encodage
+        image_paths = []
+        for i, img in enumerate(images):
+            if isinstance(img, Image.Image):
+                path = os.path.join(tmp_dir, f"frame_{i:05d}.jpg")
+                img.save(path, "JPEG", quality=95)
+                img = path
+            image_paths.append(img)
+
+        if not image_paths:
+            logger.warning("Aucune image à inclure dans la vidéo.")
+            return
+
+        if durations is None:
+            # Limiter la durée totale de la vidéo à MAX_VIDEO_SECONDS (1 s par image au minimum)
+            total_images = len(image_paths)
+            if total_images * duration > MAX_VIDEO_SECONDS:
+                duration = max(1, int(MAX_VIDEO_SECONDS / total_images))
+                logger.info("Durée ajustée à %s secondes par image pour limiter la vidéo à %s secondes",
+                            duration, MAX_VIDEO_SECONDS)
+            durations = [duration] * total_images
+
+        logger.info("Nom du fichier vidéo généré : %s", output_path)
+        encode_video(image_paths, durations, output_path, fps=fps, crf=crf, preset=preset)
+
+def generate_video(pdf_file, output_path, verbose=False, duration=2, durations=None,
+                   near_duplicate_distance=None, keep_frames=True, frame_workers=None,
+                   profile=DEFAULT_VIDEO_PROFILE, output_dir=None):
+    """
+    Génère une vidéo à partir du PDF (`durations` : durée de chaque photo, en
+    secondes ; `near_duplicate_distance` : voir `find_pdf_images` ; `profile` :
+    nom d'un profil de `VIDEO_PROFILES`, qui fixe taille, cadrage, fps et
+    réglages d'encodage ; `output_dir` : dossier de la vidéo, `output/` par
+    défaut).
+
+    Avec `keep_frames`, les images datées restent dans `output/frames/<nom
+    de la vidéo>/` ; sinon elles ne sont écrites que dans un dossier temporaire,
+    le temps de l'encodage.
+    """
+    video_profile = get_video_profile(profile)
+    # Images à la taille du profil, ou bornées par FRAME_MAX_SIZE pour le profil "original"
+    if video_profile.size:
+        frame_options = dict(max_size=video_profile.size, fit=video_profile.fit, max_workers=frame_workers)
+    else:
+        frame_options = dict(max_size=FRAME_MAX_SIZE, max_workers=frame_workers)
 
-def generate_video(pdf_file, output_path, verbose=False):
-    """Génère une vidéo à partir du PDF."""
     # Créer le dossier output s'il n'existe pas
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
+    output_dir = output_dir or OUTPUT_DIR
     os.makedirs(output_dir, exist_ok=True)
 
     # Chemin complet pour la vidéo
     video_path = os.path.join(output_dir, clean_filename(output_path))
     
-    if verbose:
-        print("Extraction des images et dates du PDF...")
-    
-    images, dates = extract_images_and_dates_from_pdf(pdf_file)
+    if keep_frames:
+        frames_dir = nullcontext(os.path.join(FRAMES_DIR, os.path.basename(output_path).replace('.mp4', '')))
+    else:
+        frames_dir = tempfile.TemporaryDirectory(prefix='.tmp-frames-', dir=output_dir)
 
-    if len(images) == 0:
-        print("Aucune image n'a été trouvée dans le PDF. Vérifiez que le PDF contient bien des images.")
-        return
+    with frames_dir as images_dir:
+        # Photos et dates réelles depuis le manifest écrit avec le PDF ; l'analyse
+        # du PDF ne sert que pour les PDFs sans manifest. Les images sont
+        # préparées en parallèle, puis ffmpeg les encode depuis le disque.
+        saved_images = []
+        manifest = load_manifest(pdf_file)
+        frames = manifest_frames(manifest) if manifest is not None else None
+        if frames:
+            if verbose:
+                logger.info("Chargement des photos depuis le manifest...")
+            with stage("video", "frames"):
+                saved_images = prepare_frames(frames, images_dir, **frame_options)
 
-    if verbose:
-        print("Ajout des dates aux images...")
-    edited_images = add_date_to_images(images, dates)
-    
-    if verbose:
-        print("Sauvegarde des images...")
-    images_dir, _ = save_images_to_folder(edited_images, dates, os.path.basename(output_path))
-    
-    if verbose:
-        print(f"Images sauvegardées dans : {images_dir}")
-        print("Création de la vidéo...")
+        if len(saved_images) == 0:
+            if verbose:
+                logger.info("Extraction des images et dates du PDF...")
+            with stage("video", "pdf_frames"):
+                saved_images = prepare_frames(iter_images_and_dates_from_pdf(pdf_file, near_duplicate_distance),
+                                              images_dir, **frame_options)
+            if len(saved_images) == 0:
+                logger.error("Aucune image n'a été trouvée dans le PDF. Vérifiez que le PDF contient bien des images.")
+                return
+
+        if verbose:
+            logger.info("Images sauvegardées dans : %s", images_dir)
+            logger.info("Création de la vidéo...")
 
-    images_to_video(edited_images, dates, video_path, duration=2)
+        with stage("video", "encode"):
+            images_to_video(saved_images, video_path, duration=duration, durations=durations,
+                            fps=video_profile.fps, crf=video_profile.crf, preset=video_profile.preset)
+        VIDEO_FRAMES.inc(len(saved_images))
     
     if verbose:
-        print(f"Vidéo créée avec succès: {video_path}")
+        logger.info("Vidéo créée avec succès: %s", video_path)
         
-    return video_path
\ No newline at end of file
+    return video_path
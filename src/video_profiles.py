@@ -0,0 +1,53 @@
+"""Video profiles module.
+Named output formats for the time-lapse video: frame size, how photos are
+fitted into it, frame rate and x264 settings.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class VideoProfile:
+    """
+    `width`/`height` : taille des images de la vidéo ; None garde l'ancien
+    comportement (taille de la plus grande photo, bornée par FRAME_MAX_SIZE).
+    `fit` : "letterbox" (photo entière, bandes noires) ou "crop" (photo
+    recadrée pour remplir l'image).
+    `fps` : les durées des photos sont arrondies à 1/fps.
+    `crf`/`preset` : qualité et vitesse d'encodage libx264.
+    """
+    name: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fit: str = "letterbox"
+    fps: int = 1
+    crf: int = 23
+    preset: str = "medium"
+
+    @property
+    def size(self):
+        if self.width is None or self.height is None:
+            return None
+        return self.width, self.height
+
+
+VIDEO_PROFILES: Dict[str, VideoProfile] = {
+    profile.name: profile
+    for profile in (
+        VideoProfile("720p", 1280, 720, fit="letterbox", fps=2, crf=23, preset="veryfast"),
+        VideoProfile("1080p", 1920, 1080, fit="letterbox", fps=2, crf=21, preset="fast"),
+        # Réseaux sociaux : format carré plein cadre, 30 images/s pour les lecteurs qui refusent les bas débits
+        VideoProfile("square-social", 1080, 1080, fit="crop", fps=30, crf=23, preset="veryfast"),
+        VideoProfile("original", fps=1, crf=23, preset="medium"),
+    )
+}
+
+DEFAULT_VIDEO_PROFILE = "1080p"
+
+
+def get_video_profile(name: Optional[str]) -> VideoProfile:
+    """Profil nommé (le profil par défaut si `name` est vide) ; ValueError si inconnu"""
+    profile = VIDEO_PROFILES.get(name or DEFAULT_VIDEO_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown video profile: {name} (available: {', '.join(VIDEO_PROFILES)})")
+    return profile
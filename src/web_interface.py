@@ -6,26 +6,158 @@ import uvicorn
 import asyncio
 from src.utils import load_config
 from src.grow_with_jane_scraper import GrowWithJaneScraper
-from src.pdf_generator import generate_pdf
-from src.video_generator import generate_video
+from src.pdf_generator import render_growlog_pdf
+from src.video_generator import FRAMES_DIR, generate_video
+from src.video_profiles import DEFAULT_VIDEO_PROFILE, VIDEO_PROFILES
+from src.photo_cache import PhotoCache
+from src.browser_pool import BrowserPool
+from src.growlog_state import GrowlogStateStore
+from src.jobs import DONE, JobQueue, JobStore
+from src.render_pool import RenderPool
+from src.render_cache import RenderCache
+from src.image_prep import ImagePrepOptions
+from src.artifacts import ArtifactStore, growlog_slug
+from src.downloads import file_response
+from src.retention import RetentionManager, RetentionPolicy
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS
+from src.logging_setup import sampled, setup_logging
 import os
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
+import json
 import logging
-from datetime import datetime
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
+# Configuration du logging : un seul handler, niveau LOG_LEVEL, format LOG_FORMAT (text/json)
+setup_logging()
 logger = logging.getLogger('web_interface')
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")
+# Un dossier de travail par job
+JOBS_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "jobs")
+
+# Nombre maximal de photos téléchargées en parallèle pour un growlog
+PHOTO_DOWNLOAD_CONCURRENCY = int(os.getenv("PHOTO_DOWNLOAD_CONCURRENCY", 8))
+
+# Moteur d'extraction : "dom" ou "network" (réponses JSON, repli DOM ; expérimental)
+SCRAPER_ENGINE = os.getenv("SCRAPER_ENGINE", "dom")
+
+# Pool de navigateurs partagé entre les requêtes /generate
+BROWSER_POOL = BrowserPool(
+    size=int(os.getenv("BROWSER_POOL_SIZE", 2)),
+    max_jobs_per_browser=int(os.getenv("BROWSER_MAX_JOBS", 50)),
+    max_memory_mb=int(os.getenv("BROWSER_MAX_MEMORY_MB", 1024)),
+)
+
+# Pool de processus pour les rendus PDF et vidéo (CPU), hors de la boucle d'événements
+# Pool saturé : un rendu attend au plus RENDER_QUEUE_TIMEOUT secondes une place, puis
+# son job échoue ; les nouvelles soumissions reçoivent 503 avec ce délai en Retry-After
+RENDER_QUEUE_TIMEOUT = float(os.getenv("RENDER_QUEUE_TIMEOUT", 30))
+RENDER_POOL = RenderPool(
+    max_workers=int(os.getenv("RENDER_WORKERS", 2)),
+    max_queue=int(os.getenv("RENDER_MAX_QUEUE", 8)),
+    acquire_timeout=RENDER_QUEUE_TIMEOUT,
+)
+
+# Photos réduites à la résolution d'impression avant l'intégration dans le PDF
+PDF_IMAGE_OPTIONS = None
+if os.getenv("PDF_IMAGE_PREP", "true").lower() in ("true", "1", "yes", "on"):
+    PDF_IMAGE_OPTIONS = ImagePrepOptions(
+        dpi=int(os.getenv("PDF_IMAGE_DPI", 200)),
+        quality=int(os.getenv("PDF_IMAGE_QUALITY", 80)),
+        cache_dir=os.path.join(OUTPUT_DIR, "photos", "derived"),
+    )
+
+# Images datées de la vidéo : threads de préparation par rendu, et
+# conservation ou non dans output/frames/<nom de la vidéo>/
+VIDEO_FRAME_WORKERS = int(os.getenv("VIDEO_FRAME_WORKERS", 4))
+VIDEO_KEEP_FRAMES = os.getenv("VIDEO_KEEP_FRAMES", "true").lower() in ("true", "1", "yes", "on")
+
+# Stockages sous output/ (artefacts, caches, état des growlogs, rétention) :
+# créés par `open_stores` au démarrage, pas à l'import du module
+ARTIFACTS = None
+PHOTO_CACHE = None
+GROWLOG_STATE = None
+RENDER_CACHE = None
+RETENTION = None
+
+def open_stores():
+    """Crée les stockages sous output/ et leurs dossiers"""
+    global ARTIFACTS, PHOTO_CACHE, GROWLOG_STATE, RENDER_CACHE, RETENTION
+    # PDFs et vidéos publiés sous le hash de leur contenu, avec un alias par growlog
+    ARTIFACTS = ArtifactStore(os.getenv("ARTIFACTS_DIR", os.path.join(OUTPUT_DIR, "artifacts")))
+
+    # Cache de photos partagé entre les requêtes, borné en taille
+    PHOTO_CACHE = PhotoCache(
+        os.path.join(OUTPUT_DIR, "photos"),
+        max_bytes=int(os.getenv("PHOTO_CACHE_MAX_MB", 2048)) * 1024 * 1024,
+        fresh_for=float(os.getenv("PHOTO_CACHE_FRESH_SECONDS", 24 * 3600)),
+    )
+
+    # État du dernier scraping de chaque growlog (re-scraping incrémental)
+    if os.getenv("INCREMENTAL_SCRAPE", "true").lower() in ("true", "1", "yes", "on"):
+        GROWLOG_STATE = GrowlogStateStore(os.getenv("GROWLOG_STATE_DIR", os.path.join(OUTPUT_DIR, "state")))
+
+    # Cache des PDFs rendus, indexé par le hash des données, du template et des images
+    RENDER_CACHE = RenderCache(
+        os.getenv("RENDER_CACHE_DIR", os.path.join(OUTPUT_DIR, "render_cache")),
+        max_bytes=int(os.getenv("RENDER_CACHE_MAX_MB", 1024)) * 1024 * 1024,
+        max_age=float(os.getenv("RENDER_CACHE_MAX_AGE_DAYS", 30)) * 24 * 3600,
+    )
+
+    # Rétention de output/ : budget en octets et en âge par classe d'artefacts,
+    # appliqué par un balayage périodique (éviction LRU)
+    _MB = 1024 * 1024
+    _DAY = 24 * 3600
+    RETENTION = RetentionManager(
+        [
+            RetentionPolicy("artifacts", ARTIFACTS.root,
+                            max_bytes=int(os.getenv("ARTIFACTS_MAX_MB", 10240)) * _MB,
+                            max_age=float(os.getenv("ARTIFACTS_MAX_AGE_DAYS", 90)) * _DAY,
+                            cleanup=ARTIFACTS.prune_aliases),
+            RetentionPolicy("frames", FRAMES_DIR, unit="dir",
+                            max_bytes=int(os.getenv("FRAMES_MAX_MB", 2048)) * _MB,
+                            max_age=float(os.getenv("FRAMES_MAX_AGE_DAYS", 7)) * _DAY),
+            RetentionPolicy("jobs", JOBS_OUTPUT_DIR, unit="dir",
+                            max_bytes=int(os.getenv("JOB_DIRS_MAX_MB", 1024)) * _MB,
+                            max_age=float(os.getenv("JOB_DIRS_MAX_AGE_DAYS", 30)) * _DAY),
+            RetentionPolicy("photos", PHOTO_CACHE.cache_dir,
+                            max_bytes=PHOTO_CACHE.max_bytes,
+                            max_age=float(os.getenv("PHOTO_CACHE_MAX_AGE_DAYS", 90)) * _DAY),
+            RetentionPolicy("photos_derived", os.path.join(PHOTO_CACHE.cache_dir, "derived"),
+                            max_bytes=int(os.getenv("PDF_IMAGE_CACHE_MAX_MB", 2048)) * _MB,
+                            max_age=float(os.getenv("PDF_IMAGE_CACHE_MAX_AGE_DAYS", 30)) * _DAY),
+            RetentionPolicy("render_cache", RENDER_CACHE.cache_dir,
+                            max_bytes=RENDER_CACHE.max_bytes, max_age=RENDER_CACHE.max_age),
+        ],
+        grace=float(os.getenv("RETENTION_GRACE_SECONDS", 600)),
+        interval=float(os.getenv("RETENTION_SWEEP_SECONDS", 3600)),
+    )
 
 app = FastAPI()
 
+@app.on_event("startup")
+async def start_workers():
+    # Les stockages et la base des jobs ne sont ouverts qu'au démarrage, pas à l'import du module
+    global JOB_QUEUE
+    open_stores()
+    JOB_QUEUE = JobQueue(JobStore(JOBS_DB), {"pdf": run_pdf_job, "video": run_video_job}, concurrency=JOB_WORKERS)
+    await BROWSER_POOL.start()
+    await JOB_QUEUE.start()
+    await RETENTION.start()
+
+@app.on_event("shutdown")
+async def close_workers():
+    # Arrêter les jobs avant de fermer les navigateurs qu'ils utilisent
+    if RETENTION is not None:
+        await RETENTION.close()
+    if JOB_QUEUE is not None:
+        await JOB_QUEUE.close()
+        JOB_QUEUE.store.close()
+    await BROWSER_POOL.close()
+    await asyncio.to_thread(RENDER_POOL.close)
+
 # Obtenir le chemin absolu du dossier racine du projet
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -39,135 +171,254 @@ async def home(request: Request):
         {"request": request}
     )
 
+def _is_checked(value) -> bool:
+    return str(value or "false").lower() in ("true", "1", "yes", "on")
+
+def _download_name(job):
+    """Nom de téléchargement d'un artefact : l'alias stable du growlog"""
+    if job["kind"] == "video":
+        return f"{job['params']['name']}.mp4"
+    return f"{growlog_slug(job['params']['url'])}.pdf"
+
+def _artifact_response(request: Request, job):
+    # L'artefact d'un job ne change jamais : le client peut le garder en cache
+    media_type = "video/mp4" if job["kind"] == "video" else "application/pdf"
+    RETENTION.mark_used(job["artifact"])
+    return file_response(request, job["artifact"], media_type, filename=_download_name(job), immutable=True)
+
+async def run_pdf_job(job, set_stage):
+    """Scraping, photos puis rendu WeasyPrint d'un growlog ; retourne le chemin du PDF"""
+    url = job["params"]["url"]
+    verbose_mode = job["params"].get("verbose", False)
+    if verbose_mode:
+        logger.info("Starting scraping with verbose mode for URL: %s", url)
+
+    scraper = GrowWithJaneScraper(
+        verbose=verbose_mode,
+        max_concurrent_downloads=PHOTO_DOWNLOAD_CONCURRENCY,
+        photo_cache=PHOTO_CACHE,
+        browser_pool=BROWSER_POOL,
+        engine=SCRAPER_ENGINE,
+        state_store=GROWLOG_STATE,
+    )
+    set_stage("scraping")
+    growlog_data = await scraper.get_growlog_data(url, download_photos=False)
+    if not growlog_data:
+        raise RuntimeError("Impossible de récupérer les données du growlog")
+
+    set_stage("downloading_photos")
+    await scraper.download_growlog_photos(growlog_data)
+
+    if verbose_mode:
+        logger.info("Processing data for growlog: %s", growlog_data.get('title'))
+        logger.info("Found %s timeline entries", len(growlog_data.get('timeline', [])))
+        logger.info("Found %s photos", len(growlog_data.get('photos', [])))
+        for failure in growlog_data.get("photo_errors", []):
+            if sampled("photo_error"):
+                logger.warning("Photo not downloaded: %s (%s)", failure['url'], failure['error'])
+
+    # Rendu dans le pool de processus, un dossier par job ; les données
+    # passent par un fichier JSON plutôt que par pickle
+    set_stage("rendering_pdf")
+    job_dir = os.path.join(JOBS_OUTPUT_DIR, job["id"])
+    # Le dossier du job et ses photos ne doivent pas être évincés pendant le rendu
+    with RETENTION.hold(job_dir, *_photo_paths(growlog_data)):
+        os.makedirs(job_dir, exist_ok=True)
+        data_path = os.path.join(job_dir, "growlog.json")
+        with open(data_path, 'w', encoding='utf-8') as f:
+            json.dump(growlog_data, f, ensure_ascii=False)
+        pdf_file = await RENDER_POOL.run(render_growlog_pdf, data_path, output_dir=job_dir, verbose=verbose_mode,
+                                         cache=RENDER_CACHE, image_options=PDF_IMAGE_OPTIONS)
+        if not os.path.exists(pdf_file):
+            raise RuntimeError("PDF file not found")
+        return await asyncio.to_thread(ARTIFACTS.publish, pdf_file, f"{growlog_slug(url)}.pdf")
+
+def _photo_paths(growlog_data):
+    photos = list(growlog_data.get("photos", []))
+    for event in growlog_data.get("timeline", []):
+        photos.extend(event.get("photos", []))
+    return [photo["local_path"] for photo in photos if photo.get("local_path")]
+
+async def run_video_job(job, set_stage):
+    """Vidéo timelapse à partir du PDF d'un job terminé ; retourne le chemin de la vidéo"""
+    pdf_path = job["params"]["pdf_path"]
+    if not os.path.exists(pdf_path):
+        raise RuntimeError("PDF file not found")
+    set_stage("rendering_video")
+    name = job["params"].get("name") or os.path.splitext(os.path.basename(pdf_path))[0]
+    video_output = f"{name}_{job['id'][:8]}.mp4"
+    # Le PDF source et le dossier des images restent en place pendant l'encodage
+    with RETENTION.hold(pdf_path, os.path.join(FRAMES_DIR, video_output.replace('.mp4', ''))):
+        video_file = await RENDER_POOL.run(generate_video, pdf_path, video_output, verbose=True,
+                                           keep_frames=VIDEO_KEEP_FRAMES, frame_workers=VIDEO_FRAME_WORKERS,
+                                           profile=job["params"].get("profile", DEFAULT_VIDEO_PROFILE))
+    if not video_file:
+        raise RuntimeError("No image found in the PDF")
+    return await asyncio.to_thread(ARTIFACTS.publish, video_file, f"{name}.mp4")
+
+# File de jobs : les workers exécutent les générations, la table SQLite garde
+# l'état et le chemin des artefacts entre les redémarrages (créée par `start_workers`)
+JOBS_DB = os.getenv("JOBS_DB", os.path.join(OUTPUT_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_QUEUE = None
+
+def _job_view(job):
+    view = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == DONE:
+        view["result_url"] = f"/jobs/{job['id']}/result"
+        view["filename"] = _download_name(job)
+    return view
+
+def _submit_video(form_data):
+    """
+    Soumet un job vidéo à partir d'un job PDF (`pdf_job`) ou d'un nom de PDF
+    (`pdf_filename`), au format `profile` (voir `VIDEO_PROFILES`)
+    """
+    profile = form_data.get("profile") or DEFAULT_VIDEO_PROFILE
+    if profile not in VIDEO_PROFILES:
+        return None, f"Unknown video profile: {profile} (available: {', '.join(VIDEO_PROFILES)})"
+    pdf_job_id = form_data.get("pdf_job")
+    pdf_filename = form_data.get("pdf_filename")
+    if pdf_job_id:
+        pdf_job = JOB_QUEUE.get(pdf_job_id)
+        if pdf_job is None or pdf_job["status"] != DONE:
+            return None, "PDF job not finished"
+        pdf_path = pdf_job["artifact"]
+        name = os.path.splitext(_download_name(pdf_job))[0]
+    elif pdf_filename:
+        pdf_filename = os.path.basename(pdf_filename)
+        # Alias du growlog (nom de téléchargement du PDF), puis anciens jobs et fichiers de output/
+        pdf_path = ARTIFACTS.resolve(pdf_filename)
+        if pdf_path is None:
+            pdf_job = JOB_QUEUE.store.find_by_artifact_name("pdf", pdf_filename)
+            pdf_path = pdf_job["artifact"] if pdf_job and pdf_job["status"] == DONE \
+                else os.path.join(OUTPUT_DIR, pdf_filename)
+        name = os.path.splitext(pdf_filename)[0]
+    else:
+        return None, "PDF filename not provided"
+    if not os.path.exists(pdf_path):
+        return None, "PDF file not found"
+    return JOB_QUEUE.submit("video", {"pdf_path": pdf_path, "profile": profile, "name": f"{name}_{profile}"},
+                            dedupe_key=f"{pdf_path}|{profile}"), None
+
+def _render_pool_full_response():
+    """Réponse 503 quand le pool de rendu est saturé, None sinon"""
+    if not RENDER_POOL.full():
+        return None
+    return JSONResponse({"error": "Render queue full, retry later"}, status_code=503,
+                        headers={"Retry-After": str(max(1, int(RENDER_QUEUE_TIMEOUT)))})
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request):
+    """Soumet une génération (kind=pdf avec `url`, kind=video avec `pdf_job`) et retourne son id"""
+    busy = _render_pool_full_response()
+    if busy is not None:
+        return busy
+    form_data = await request.form()
+    kind = form_data.get("kind", "pdf")
+    if kind == "video":
+        job, error = _submit_video(form_data)
+    elif kind == "pdf":
+        url = form_data.get("url")
+        job, error = (None, "URL non fournie") if not url else (
+            JOB_QUEUE.submit("pdf", {"url": url, "verbose": _is_checked(form_data.get("verbose"))}, dedupe_key=url),
+            None,
+        )
+    else:
+        job, error = None, f"Unknown job kind: {kind}"
+    if error:
+        return JSONResponse({"error": error}, status_code=400)
+    return _job_view(job)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return _job_view(job)
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str, request: Request):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    if job["status"] != DONE:
+        return JSONResponse(_job_view(job), status_code=409)
+    if not os.path.exists(job["artifact"]):
+        return JSONResponse({"error": "Artifact no longer available"}, status_code=410)
+    return _artifact_response(request, job)
+
+@app.get("/artifacts/growlogs/{alias}")
+async def growlog_artifact(alias: str, request: Request):
+    """Dernier artefact d'un growlog, par son alias stable (`<growlog>.pdf`, `<growlog>_<profil>.mp4`)"""
+    path = ARTIFACTS.resolve(alias)
+    if path is None:
+        return JSONResponse({"error": "Artifact not found"}, status_code=404)
+    media_type = "video/mp4" if alias.endswith(".mp4") else "application/pdf"
+    RETENTION.mark_used(path)
+    return file_response(request, path, media_type, filename=os.path.basename(alias))
+
 @app.post("/generate_video")
 async def generate_video_endpoint(request: Request):
+    """Compatibilité : soumet le job vidéo et attend son résultat"""
+    busy = _render_pool_full_response()
+    if busy is not None:
+        return busy
     form_data = await request.form()
-    pdf_filename = form_data.get("pdf_filename")
-    if not pdf_filename:
-        return {"error": "PDF filename not provided"}
-    pdf_path = os.path.join(OUTPUT_DIR, pdf_filename)
-    if not os.path.exists(pdf_path):
-        return {"error": "PDF file not found"}
-    video_output = pdf_filename.replace('.pdf', '.mp4')
-    video_file = generate_video(pdf_path, video_output, verbose=True)
-    video_name = os.path.basename(video_file)
-    return FileResponse(
-        path=os.path.join(OUTPUT_DIR, video_name),
-        filename=video_name,
-        media_type="video/mp4",
-        headers={"Content-Disposition": f"attachment; filename={video_name}"}
-    )
+    job, error = _submit_video(form_data)
+    if error:
+        return {"error": error}
+    job = await JOB_QUEUE.wait(job["id"])
+    if job["status"] != DONE:
+        return {"error": job["error"] or "Video generation failed"}
+    return _artifact_response(request, job)
 
 @app.post("/generate")
 async def generate(request: Request):
+    """Compatibilité : soumet le job PDF et attend son résultat"""
+    busy = _render_pool_full_response()
+    if busy is not None:
+        return busy
     try:
         form_data = await request.form()
         url = form_data.get("url")
         if not url:
             return {"error": "URL non fournie"}
-
-        verbose_mode = str(form_data.get("verbose", "false")).lower() in ("true", "1", "yes", "on")
-
-        if verbose_mode:
-            logger.info(f"Starting scraping with verbose mode for URL: {url}")
-
-        # Utiliser notre nouveau scraper
-        scraper = GrowWithJaneScraper(verbose=verbose_mode)
-        growlog_data = await scraper.get_growlog_data(url)
-
-        if not growlog_data:
-            if verbose_mode:
-                logger.error("No data retrieved from the growlog")
-            return {"error": "Impossible de récupérer les données du growlog"}
-
-        # Préparer les données pour le template
-        title = growlog_data.get("title", "Growlog")
-        if not title or not title.strip():
-            title = "Growlog"
-        
-        if verbose_mode:
-            logger.info(f"Processing data for growlog: {title}")
-            logger.info(f"Found {len(growlog_data.get('timeline', []))} timeline entries")
-            logger.info(f"Found {len(growlog_data.get('photos', []))} photos")
-        
-        # Convertir les données du scraper au format attendu par le template
-        def parse_date(date_str):
-            for suffix in ['st', 'nd', 'rd', 'th']:
-                date_str = date_str.replace(suffix, '')
-            try:
-                return datetime.strptime(date_str.strip(), "%b %d %y")
-            except Exception:
-                return None
-        stage_changes = []
-        for sc in growlog_data.get("stage_changes", []):
-            d = parse_date(sc.get("date", ""))
-            if d and sc.get("plant_state"):
-                stage_changes.append({"date": d, "plant_state": sc.get("plant_state")})
-        stage_changes.sort(key=lambda x: x["date"])
-        entries = []
-        for event in growlog_data.get("timeline", []):
-            event_date = parse_date(event.get("date", ""))
-            plant_state = None
-            for sc in reversed(stage_changes):
-                if event_date and sc["date"] <= event_date:
-                    plant_state = sc["plant_state"]
-                    break
-            entry = {
-                "full_date": event.get("date", ""),
-                "day_count": event.get("day_count", ""),
-                "plant_state": plant_state,
-                "stage_change": event.get("stage_change", ""),
-                "actions": event.get("actions", []),
-                "images": event.get("photos", []),
-                "tree_logs": event.get("tree_logs", {})
-            }
-            entries.append(entry)
-
-        # Préparer le metadata avec les stages, strain et environment enrichis
-        metadata = {
-            "strain": {
-                "brand": "Unknown",  # Peut être enrichi si tu as la marque
-                "name": growlog_data.get("strain", "Unknown strain")
-            },
-            "environment": growlog_data.get("environment", {}),
-            "stages": growlog_data.get("stages", [])
-        }
-
-        if verbose_mode:
-            logger.info("Generating PDF...")
-
-        # Générer le PDF
-        pdf_file = generate_pdf(title, entries, metadata, verbose=verbose_mode)
-        pdf_name = os.path.basename(pdf_file)
-
-        if verbose_mode:
-            logger.info(f"PDF generated: {pdf_name}")
-
-        if not os.path.exists(os.path.join(OUTPUT_DIR, pdf_name)):
-            logger.error(f"PDF file not found: {os.path.join(OUTPUT_DIR, pdf_name)}")
-            return {"error": "PDF file not found"}
-
-        logger.info(f"Retour du PDF (POST): {os.path.abspath(os.path.join(OUTPUT_DIR, pdf_name))}")
-        logger.info(f"Fichier existe: {os.path.exists(os.path.abspath(os.path.join(OUTPUT_DIR, pdf_name)))}")
-
-        # Retourner le PDF pour téléchargement
-        try:
-            return FileResponse(
-                path=os.path.abspath(os.path.join(OUTPUT_DIR, pdf_name)),
-                filename=pdf_name,
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={pdf_name}"}
-            )
-        except Exception as e:
-            logger.error(f"Erreur lors du retour du PDF: {e}")
-            return {"error": str(e)}
+        job = JOB_QUEUE.submit("pdf", {"url": url, "verbose": _is_checked(form_data.get("verbose"))}, dedupe_key=url)
+        job = await JOB_QUEUE.wait(job["id"])
+        if job["status"] != DONE:
+            return {"error": job["error"] or "PDF generation failed"}
+        logger.info("Retour du PDF (POST): %s", job['artifact'])
+        return _artifact_response(request, job)
     except Exception as e:
-        import traceback
-        if 'verbose_mode' in locals() and verbose_mode:
-            logger.error("Debug - Traceback complet:")
-            logger.error(traceback.format_exc())
+        logger.error("Erreur lors de la génération: %s", e)
         return {"error": str(e)}
 
+@app.get("/stats")
+async def stats():
+    return {
+        "jobs": JOB_QUEUE.stats(),
+        "render_pool": RENDER_POOL.stats(),
+        "render_cache": RENDER_CACHE.usage(),
+        "browser_pool": BROWSER_POOL.stats(),
+        "photo_cache": {**PHOTO_CACHE.stats, **PHOTO_CACHE.usage()},
+        "retention": await asyncio.to_thread(RETENTION.stats),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Durées par étape, compteurs et étapes en cours, au format texte Prometheus"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/test_download")
 async def test_download():
     test_path = os.path.abspath(os.path.join(OUTPUT_DIR, "Growlog.pdf"))
@@ -0,0 +1,141 @@
+"""
+Tests for content-addressed artifacts and conditional / ranged downloads.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import unittest
+
+from starlette.requests import Request
+
+from src.artifacts import ArtifactStore
+from src.downloads import RangeNotSatisfiable, file_response, parse_byte_range
+from src.manifest import manifest_path_for
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+async def send_response(response, request):
+    messages = []
+
+    async def receive():
+        # Le client reste connecté pendant toute la réponse
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await response(request.scope, receive, send)
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(os.path.join(self.tmp.name, "artifacts"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_same_file_name_from_two_growlogs_does_not_collide(self):
+        first = self.store.publish(self.write("Hulkberry.pdf", b"%PDF first"), "grow_a.pdf")
+        second = self.store.publish(self.write("Hulkberry.pdf", b"%PDF second"), "grow_b.pdf")
+        self.assertNotEqual(first, second)
+        self.assertEqual(os.path.basename(first), hashlib.sha256(b"%PDF first").hexdigest() + ".pdf")
+        self.assertEqual(self.store.resolve("grow_a.pdf"), first)
+        self.assertEqual(self.store.resolve("grow_b.pdf"), second)
+        self.assertIsNone(self.store.resolve("grow_c.pdf"))
+
+    def test_alias_follows_latest_version_and_manifest_moves_along(self):
+        source = self.write("grow.pdf", b"%PDF v1")
+        self.write("grow.manifest.json", b"{}")
+        v1 = self.store.publish(source, "grow.pdf")
+        self.assertTrue(os.path.exists(manifest_path_for(v1)))
+        v2 = self.store.publish(self.write("grow.pdf", b"%PDF v2"), "grow.pdf")
+        self.assertEqual(self.store.resolve("grow.pdf"), v2)
+        # Republier un contenu identique garde l'artefact existant
+        again = self.store.publish(self.write("grow.pdf", b"%PDF v2"), "grow.pdf")
+        self.assertEqual(again, v2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "grow.pdf")))
+
+
+class TestParseByteRange(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_byte_range("bytes=50-500", 100), (50, 99))
+        # Plusieurs plages ou syntaxe invalide : fichier entier
+        self.assertIsNone(parse_byte_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(parse_byte_range("items=0-1", 100))
+        for header in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_byte_range(header, 100)
+
+
+class TestFileResponse(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = bytes(range(256)) * 1000
+        store = ArtifactStore(self.tmp.name)
+        source = os.path.join(self.tmp.name, "video.mp4")
+        with open(source, 'wb') as f:
+            f.write(self.content)
+        self.path = store.publish(source, "grow.mp4")
+        self.etag = f'"{hashlib.sha256(self.content).hexdigest()}"'
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def fetch(self, **headers):
+        request = make_request(**headers)
+        return await send_response(file_response(request, self.path, "video/mp4", filename="grow.mp4"), request)
+
+    async def test_full_download_has_strong_etag(self):
+        status, headers, body = await self.fetch()
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["etag"], self.etag)
+        self.assertEqual(headers["accept-ranges"], "bytes")
+        self.assertEqual(body, self.content)
+
+    async def test_if_none_match(self):
+        status, headers, body = await self.fetch(if_none_match=f'W/"other", {self.etag}')
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(headers["etag"], self.etag)
+
+    async def test_range_and_resume(self):
+        status, headers, body = await self.fetch(range="bytes=1000-199999")
+        self.assertEqual(status, 206)
+        self.assertEqual(headers["content-range"], f"bytes 1000-199999/{len(self.content)}")
+        self.assertEqual(body, self.content[1000:200000])
+
+        status, _, body = await self.fetch(range="bytes=200000-", if_range=self.etag)
+        self.assertEqual((status, body), (206, self.content[200000:]))
+
+    async def test_stale_if_range_and_unsatisfiable_range(self):
+        status, _, body = await self.fetch(range="bytes=0-9", if_range='"stale"')
+        self.assertEqual((status, len(body)), (200, len(self.content)))
+
+        status, headers, _ = await self.fetch(range=f"bytes={len(self.content)}-")
+        self.assertEqual(status, 416)
+        self.assertEqual(headers["content-range"], f"bytes */{len(self.content)}")
+
+
+if __name__ == '__main__':
+    unittest.main()
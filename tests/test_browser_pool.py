@@ -0,0 +1,128 @@
+"""
+Tests for the browser pool, with a fake Playwright instead of Chromium.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+from src.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, headless=True):
+        self.launched.append(FakeBrowser())
+        return self.launched[-1]
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+class FakeRssPool(BrowserPool):
+    """RSS des navigateurs imposée par le test au lieu d'être lue via CDP"""
+    rss_bytes = 0
+
+    async def browser_rss_bytes(self, browser):
+        return self.rss_bytes
+
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.playwright = FakePlaywright()
+        patcher = mock.patch('src.browser_pool.async_playwright', return_value=self.playwright)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def run_jobs(self, pool, n):
+        for _ in range(n):
+            async with pool.context() as context:
+                self.assertFalse(context.closed)
+            self.assertTrue(context.closed)
+
+    async def test_browser_recycled_after_max_jobs(self):
+        pool = FakeRssPool(size=1, max_jobs_per_browser=2)
+        await self.run_jobs(pool, 5)
+        browsers = self.playwright.chromium.launched
+        self.assertEqual(len(browsers), 3)
+        self.assertEqual([len(b.contexts) for b in browsers], [2, 2, 1])
+        self.assertFalse(browsers[0].connected)
+        stats = pool.stats()
+        self.assertEqual((stats["acquired"], stats["hits"], stats["launches"], stats["recycled"]), (5, 2, 3, 2))
+        self.assertAlmostEqual(stats["hit_ratio"], 0.4)
+        self.assertEqual(stats["running_browsers"], 1)
+        await pool.close()
+        self.assertEqual(pool.stats()["running_browsers"], 0)
+
+    async def test_browser_recycled_above_memory_threshold(self):
+        pool = FakeRssPool(size=1, max_jobs_per_browser=0, max_memory_mb=100)
+        pool.rss_bytes = 50 * 1024 * 1024
+        await self.run_jobs(pool, 2)
+        self.assertEqual(pool.stats()["recycled"], 0)
+        pool.rss_bytes = 150 * 1024 * 1024
+        await self.run_jobs(pool, 2)
+        stats = pool.stats()
+        self.assertEqual(stats["recycled"], 2)
+        self.assertEqual(stats["launches"], 2)
+        self.assertEqual(stats["hits"], 2)
+
+    async def test_disconnected_browser_is_relaunched(self):
+        pool = FakeRssPool(size=1)
+        await self.run_jobs(pool, 1)
+        self.playwright.chromium.launched[0].connected = False
+        await self.run_jobs(pool, 1)
+        self.assertEqual(pool.stats()["launches"], 2)
+        self.assertEqual(pool.stats()["hits"], 0)
+
+    async def test_jobs_wait_for_a_free_browser(self):
+        pool = FakeRssPool(size=1)
+
+        async def job():
+            async with pool.context():
+                await asyncio.sleep(0.1)
+
+        await asyncio.gather(job(), job(), job())
+        stats = pool.stats()
+        self.assertEqual(stats["acquired"], 3)
+        self.assertEqual(stats["hits"], 2)
+        # Un seul navigateur : le dernier job a attendu les deux premiers
+        self.assertGreaterEqual(stats["wait_seconds_max"], 0.18)
+        self.assertGreater(stats["wait_seconds_avg"], 0)
+        self.assertEqual(stats["idle"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for the staged bulk pipeline (resume from the journal).
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.bulk import BulkPipeline, read_urls
+
+
+class FakeScraper:
+    def __init__(self, fail_photos=()):
+        self.fail_photos = set(fail_photos)
+        self.scraped = []
+
+    async def get_growlog_data(self, url, download_photos=True):
+        self.scraped.append(url)
+        return {"url": url, "title": url, "timeline": [{"date": "Mar 5th 25", "photos": []}],
+                "pending_photos": {"url": url}}
+
+    async def download_growlog_photos(self, growlog_data):
+        if growlog_data["url"] in self.fail_photos:
+            raise RuntimeError("CDN down")
+        growlog_data.pop("pending_photos", None)
+        growlog_data["photo_errors"] = []
+        return []
+
+
+def fake_render_pdf(data_path, output_dir=None, filename=None, **kwargs):
+    path = os.path.join(output_dir, filename)
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4")
+    return path
+
+
+class TestBulkPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_resumes_after_failed_stage(self):
+        urls = ["https://growithjane.com/growlog/a", "https://growithjane.com/growlog/b"]
+        concurrency = {"scrape": 1, "photos": 2, "pdf": 1}
+        with tempfile.TemporaryDirectory() as workdir, mock.patch('src.bulk.render_growlog_pdf', fake_render_pdf):
+            first = FakeScraper(fail_photos={urls[1]})
+            summary = await BulkPipeline(workdir, first, concurrency).run(urls)
+            self.assertEqual(summary["completed"], 1)
+            self.assertEqual(summary["failures"][0]["stage"], "photos")
+
+            second = FakeScraper()
+            summary = await BulkPipeline(workdir, second, concurrency).run(urls)
+            self.assertEqual(second.scraped, [])
+            self.assertEqual(summary["completed"], 2)
+            self.assertEqual(summary["stages"]["scrape"]["skipped"], 2)
+            self.assertEqual(summary["stages"]["photos"]["done"], 1)
+            self.assertEqual(summary["stages"]["pdf"]["done"], 1)
+
+    async def test_videos_stay_in_the_workdir(self):
+        calls = []
+
+        def fake_generate_video(pdf_path, output_path, **kwargs):
+            calls.append(kwargs)
+            path = os.path.join(kwargs["output_dir"], output_path)
+            os.makedirs(kwargs["output_dir"], exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b"mp4")
+            return path
+
+        url = "https://growithjane.com/growlog/a"
+        with tempfile.TemporaryDirectory() as workdir, mock.patch('src.bulk.render_growlog_pdf', fake_render_pdf), \
+                mock.patch('src.bulk.generate_video', fake_generate_video):
+            summary = await BulkPipeline(workdir, FakeScraper(), {}, video=True).run([url])
+            self.assertEqual(summary["completed"], 1)
+            self.assertEqual(calls[0]["output_dir"], os.path.join(workdir, "video"))
+            self.assertFalse(calls[0]["keep_frames"])
+            self.assertEqual(len(os.listdir(os.path.join(workdir, "video"))), 1)
+
+    def test_read_urls_skips_comments_and_duplicates(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write("# growlogs\nhttps://a\n\nhttps://b\nhttps://a\n")
+        try:
+            self.assertEqual(read_urls(f.name), ["https://a", "https://b"])
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
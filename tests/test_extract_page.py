@@ -0,0 +1,115 @@
+"""
+Tests for the one-pass page extraction of src/scraper.py, checked against
+the DOM parser on the mock GrowWithJane site.
+"""
+import tempfile
+import unittest
+
+from aiohttp.test_utils import TestServer
+
+from benchmarks.mock_site import MockGrowlogSite
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.photo_cache import PhotoCache
+from src.scraper import EXTRACT_PAGE_JS, extract_logs, extract_metadata, load_page, parse_page_data
+from src.testid_index import make_soup
+
+RAW_PAGE = {
+    "plant_state": "Flowering text-2xl",
+    "stage_changes": [
+        {"full_date": " Mar 3rd 25 ", "day_count": "Day 30", "stage_change": "Stage changed to Flowering",
+         "icon_class": "icon-flowering text-2xl"},
+    ],
+    "cards": [
+        {"full_date": "Mar 3rd 25", "day_count": "Day 30", "actions": [{"name": "Water", "amount": "2 L"}],
+         "images": ["https://cdn/p_thumb@480_.jpg"], "tree_logs": [{"label": "Height", "value": "40 cm"}]},
+        {"full_date": "Mar 4th 25", "day_count": "Day 31", "actions": [{"name": "Topping", "amount": ""}],
+         "images": [], "tree_logs": [{"label": "pH", "value": ""}]},
+    ],
+    "metadata": {"strain": "Gorilla Glue", "stages": [{"name": "Flowering", "date": "Mar 3rd 25"}],
+                 "environment": {"Name": "Tent", "Lights": ["LED", "150 W"]}},
+}
+
+
+class FakePage:
+    """Page qui retourne `RAW_PAGE` et compte les appels à `evaluate`"""
+
+    def __init__(self):
+        self.evaluated = []
+
+    async def evaluate(self, expression):
+        self.evaluated.append(expression)
+        return RAW_PAGE if expression == EXTRACT_PAGE_JS else RAW_PAGE["metadata"]
+
+
+class TestParsePageData(unittest.IsolatedAsyncioTestCase):
+    async def test_one_evaluate_for_logs_and_metadata(self):
+        page = FakePage()
+        entries, metadata = await extract_logs(page)
+        self.assertEqual(page.evaluated, [EXTRACT_PAGE_JS])
+        self.assertEqual(metadata["strain"]["name"], "Gorilla Glue")
+        self.assertEqual(metadata["environment"]["Lights"], "LED | 150 W")
+        # Le résultat de l'extraction complète est réutilisé tel quel
+        self.assertEqual(await extract_metadata(page, RAW_PAGE), metadata)
+        self.assertEqual(len(page.evaluated), 1)
+        # Seul, `extract_metadata` n'évalue que le bloc de métadonnées
+        self.assertEqual(await extract_metadata(page), metadata)
+        self.assertNotEqual(page.evaluated[-1], EXTRACT_PAGE_JS)
+
+    def test_entries(self):
+        entries, _ = parse_page_data(RAW_PAGE)
+        self.assertEqual([e["full_date"] for e in entries], ["Mar 4th 25", "Mar 3rd 25", "Mar 3rd 25"])
+        topping, stage_change, card = entries
+        self.assertEqual(topping["actions"], ["Topping"])
+        self.assertEqual(topping["tree_logs"], {})
+        self.assertNotIn("plant_state", topping)
+        self.assertEqual(stage_change["plant_state"], "flowering")
+        self.assertEqual(card["plant_state"], "flowering")
+        self.assertEqual(card["images"], ["https://cdn/p_.jpg"])
+        self.assertEqual(card["tree_logs"], {"Height": "40 cm"})
+
+
+class TestExtractPageOnMockSite(unittest.IsolatedAsyncioTestCase):
+    """Extraction JS dans un vrai Chromium, ignorée si aucun navigateur ne peut être lancé"""
+
+    async def asyncSetUp(self):
+        from playwright.async_api import async_playwright
+        self.playwright = await async_playwright().start()
+        self.addAsyncCleanup(self.playwright.stop)
+        try:
+            self.browser = await self.playwright.chromium.launch()
+        except Exception as e:
+            self.skipTest(f"Chromium unavailable: {str(e).splitlines()[0]}")
+        self.addAsyncCleanup(self.browser.close)
+        self.server = TestServer(MockGrowlogSite(cards=25, photos_per_card=2, stage_changes=3, page_size=10,
+                                                 latency=0, photo_latency=0, photo_size=(64, 48)).app())
+        await self.server.start_server()
+        self.addAsyncCleanup(self.server.close)
+
+    async def test_matches_dom_parser(self):
+        page = await self.browser.new_page()
+        url = str(self.server.make_url('/growlogs/abc'))
+        await load_page(page, url, block_resources=False, quiet_time=0.3)
+        raw = await page.evaluate(EXTRACT_PAGE_JS)
+        entries, metadata = parse_page_data(raw)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = GrowWithJaneScraper(photo_cache=PhotoCache(tmp))
+            dom, dom_photos, _ = scraper._parse_growlog(make_soup(await page.content()), url)
+
+        self.assertEqual(len(raw["cards"]), 25)
+        self.assertEqual([(card["full_date"].strip(), card["images"]) for card in raw["cards"]],
+                         [(event["date"], photos) for event, photos in zip(dom["timeline"], dom_photos)])
+        cards = [e for e in entries if "stage_change" not in e]
+        self.assertCountEqual([(e["full_date"], e["actions"], e["tree_logs"]) for e in cards],
+                              [(event["date"], event["actions"], event["tree_logs"]) for event in dom["timeline"]])
+        stage_changes = [e for e in entries if "stage_change" in e]
+        self.assertCountEqual([(e["full_date"], e["day_count"], e["stage_change"], e["plant_state"])
+                               for e in stage_changes],
+                              [(sc["date"], sc["day_count"], sc["stage_change"], sc["plant_state"])
+                               for sc in dom["stage_changes"]])
+        self.assertEqual(metadata["strain"]["name"], dom["strain"])
+        self.assertEqual(metadata["stages"], dom["stages"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests for the per-URL growlog state used by incremental re-scrapes.
+"""
+import tempfile
+import unittest
+
+from src.growlog_state import GrowlogStateStore, merge_items
+
+
+class TestMergeItems(unittest.TestCase):
+    def test_new_head_is_prepended_to_stored_tail(self):
+        stored_keys = ["d5", "d4", "d3", "d2", "d1"]
+        fresh_keys = ["d7", "d6", "d5", "d4"]
+        items, keys, new_count = merge_items(
+            [k.upper() for k in fresh_keys], fresh_keys, [k.upper() for k in stored_keys], stored_keys
+        )
+        self.assertEqual(keys, ["d7", "d6", "d5", "d4", "d3", "d2", "d1"])
+        self.assertEqual(items, [k.upper() for k in keys])
+        self.assertEqual(new_count, 2)
+
+    def test_fresh_items_replace_stored_head(self):
+        items, keys, new_count = merge_items(["new d2", "new d1"], ["d2", "d1"], ["old d2", "old d1"], ["d2", "d1"])
+        self.assertEqual(items, ["new d2", "new d1"])
+        self.assertEqual(new_count, 0)
+
+    def test_no_overlap_keeps_fresh_only(self):
+        items, keys, new_count = merge_items(["b"], ["b"], ["a"], ["a"])
+        self.assertEqual(keys, ["b"])
+        self.assertEqual(new_count, 1)
+
+
+class TestGrowlogStateStore(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            store = GrowlogStateStore(state_dir)
+            self.assertIsNone(store.load("https://growithjane.com/growlog/a"))
+            store.save("https://growithjane.com/growlog/a", {"timeline": [{"date": "Mar 5th 25"}]},
+                       [["u1"]], [], ["card:k1"], ["k1"], [])
+            record = store.load("https://growithjane.com/growlog/a/")
+            self.assertEqual(record["card_keys"], ["k1"])
+            self.assertEqual(record["growlog_data"]["timeline"][0]["date"], "Mar 5th 25")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the print-resolution photo derivatives embedded in PDFs.
+"""
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from src.image_prep import ImagePrepOptions, prepare_entries, prepare_image
+
+
+class TestImagePrep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.options = ImagePrepOptions(dpi=96, quality=80, cache_dir=os.path.join(self.tmp.name, "derived"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def photo(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        Image.effect_noise(size, 40).convert('RGB').save(path, 'JPEG', quality=95)
+        return path
+
+    def test_derivative_covers_slot_and_is_cached(self):
+        source = self.photo("big.jpg", (2400, 1200))
+        derived = prepare_image(source, self.options)
+        self.assertNotEqual(derived, source)
+        with Image.open(derived) as img:
+            # 300x200 en `cover` : la hauteur fixe l'échelle
+            self.assertEqual(img.size, (400, 200))
+        self.assertLess(os.path.getsize(derived), os.path.getsize(source))
+        self.assertEqual(prepare_image(source, self.options), derived)
+        # Le cache de photos rafraîchit la mtime à chaque hit : même dérivé
+        st = os.stat(source)
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(prepare_image(source, self.options), derived)
+        self.assertEqual(os.listdir(self.options.cache_dir), [os.path.basename(derived)])
+
+    def test_entries_point_to_derivatives(self):
+        big = self.photo("big.jpg", (1600, 1200))
+        small = self.photo("small.jpg", (120, 80))
+        entries = [{"images": [{"url": "a", "local_path": big}, {"url": "b", "local_path": small}]},
+                   {"images": [{"url": "a", "local_path": big}]}]
+        stats = prepare_entries(entries, self.options, max_workers=2)
+        self.assertEqual(stats["images"], 2)
+        self.assertLess(stats["bytes_after"], stats["bytes_before"])
+        self.assertEqual(entries[0]["images"][0]["original_path"], big)
+        self.assertEqual(entries[0]["images"][0]["local_path"], entries[1]["images"][0]["local_path"])
+        # Déjà plus petite que l'emplacement : jamais agrandie
+        with Image.open(entries[0]["images"][1]["local_path"]) as img:
+            self.assertEqual(img.size, (120, 80))
+
+
+if __name__ == '__main__':
+    unittest.main()
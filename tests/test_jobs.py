@@ -0,0 +1,74 @@
+"""
+Tests for the job queue behind the /jobs API.
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.jobs import DONE, FAILED, JobQueue, JobStore
+
+
+class TestJobQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "jobs.sqlite3")
+        self.release = asyncio.Event()
+        self.runs = []
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def render(self, job, set_stage):
+        self.runs.append(job["params"]["url"])
+        set_stage("rendering_pdf")
+        await self.release.wait()
+        if job["params"]["url"] == "bad":
+            raise RuntimeError("boom")
+        return f"/artifacts/{job['id']}.pdf"
+
+    async def test_submit_dedupes_running_jobs_and_records_artifact(self):
+        store = JobStore(self.db)
+        queue = JobQueue(store, {"pdf": self.render}, concurrency=2)
+        await queue.start()
+        try:
+            first = queue.submit("pdf", {"url": "a"}, dedupe_key="a")
+            await asyncio.sleep(0.01)
+            self.assertEqual(queue.get(first["id"])["stage"], "rendering_pdf")
+            again = queue.submit("pdf", {"url": "a"}, dedupe_key="a")
+            self.assertEqual(again["id"], first["id"])
+            bad = queue.submit("pdf", {"url": "bad"}, dedupe_key="bad")
+
+            self.release.set()
+            done = await queue.wait(first["id"])
+            failed = await queue.wait(bad["id"])
+            self.assertEqual(done["status"], DONE)
+            self.assertEqual(done["artifact"], f"/artifacts/{first['id']}.pdf")
+            self.assertEqual(failed["status"], FAILED)
+            self.assertEqual(failed["error"], "boom")
+            self.assertEqual(self.runs, ["a", "bad"])
+        finally:
+            await queue.close()
+            store.close()
+
+    async def test_unfinished_jobs_resume_after_restart(self):
+        store = JobStore(self.db)
+        job = store.create("pdf", {"url": "a"}, dedupe_key="a")
+        store.update(job["id"], status="running", stage="scraping")
+        store.close()
+
+        self.release.set()
+        store = JobStore(self.db)
+        queue = JobQueue(store, {"pdf": self.render})
+        await queue.start()
+        try:
+            resumed = await queue.wait(job["id"])
+            self.assertEqual(resumed["status"], DONE)
+            self.assertEqual(store.counts(), {DONE: 1})
+        finally:
+            await queue.close()
+            store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the central logging setup and the sampling of repeated logs.
+"""
+import io
+import json
+import logging
+import tempfile
+import unittest
+
+from benchmarks.fixtures import generate_growlog_html
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.logging_setup import log_sampling, sampled, setup_logging
+from src.photo_cache import PhotoCache
+from src.testid_index import make_soup
+
+
+class TestLoggingSetup(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = (list(root.handlers), root.level)
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        root = logging.getLogger()
+        root.handlers[:] = self.saved[0]
+        root.setLevel(self.saved[1])
+
+    def test_setup_is_idempotent(self):
+        setup_logging("INFO", stream=self.stream)
+        setup_logging("INFO", stream=self.stream)
+        logging.getLogger('tests').info("once")
+        self.assertEqual(len(logging.getLogger().handlers), 1)
+        self.assertEqual(self.stream.getvalue().count("once"), 1)
+
+    def test_json_lines_carry_extra_fields(self):
+        setup_logging("DEBUG", "json", stream=self.stream)
+        logging.getLogger('tests').warning("%s cards", 3, extra={"growlog": "abc"})
+        record = json.loads(self.stream.getvalue())
+        self.assertEqual(record["level"], "WARNING")
+        self.assertEqual(record["logger"], "tests")
+        self.assertEqual(record["message"], "3 cards")
+        self.assertEqual(record["growlog"], "abc")
+
+    def test_sampling_is_bounded_and_scoped(self):
+        logger = logging.getLogger('tests')
+        with log_sampling(logger, first=2, every=10) as sampler:
+            allowed = [sampled("card") for _ in range(25)]
+            with log_sampling(logger) as inner:
+                self.assertIs(inner, sampler)
+                self.assertTrue(sampled("photo"))
+        self.assertEqual([i for i, ok in enumerate(allowed) if ok], [0, 1, 11, 21])
+        self.assertEqual(sampler.suppressed(), {"card": 21})
+        # Hors portée, rien n'est écarté
+        self.assertTrue(all(sampled("card") for _ in range(10)))
+
+    def test_verbose_scrapers_do_not_add_handlers(self):
+        setup_logging("INFO", stream=self.stream)
+        scraper_logger = logging.getLogger('grow_with_jane_scraper')
+        handlers = list(scraper_logger.handlers)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        scrapers = [GrowWithJaneScraper(verbose=True, photo_cache=PhotoCache(tmp.name)) for _ in range(3)]
+        self.assertEqual(scraper_logger.handlers, handlers)
+
+        soup = make_soup(generate_growlog_html(cards=40, stage_changes=2))
+        with log_sampling(scraper_logger, first=3):
+            scrapers[0]._parse_growlog(soup, 'test')
+        output = self.stream.getvalue()
+        self.assertEqual(output.count("Timeline card:"), 3)
+        self.assertIn("suppressed", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
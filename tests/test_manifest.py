@@ -0,0 +1,76 @@
+"""
+Tests for the photo manifest written next to each PDF and read by the video generator.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from src.manifest import load_manifest, manifest_path_for, manifest_photos
+from src.pdf_generator import generate_pdf
+from src.video_generator import load_images_and_dates_from_manifest
+
+
+class FakeHTML:
+    def __init__(self, string, base_url=None):
+        pass
+
+    pages = [None]
+
+    def render(self):
+        return self
+
+    def write_pdf(self, path):
+        with open(path, 'wb') as f:
+            f.write(b"%PDF-1.4")
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def photo(self, name, color):
+        path = os.path.join(self.tmp.name, name)
+        Image.new('RGB', (64, 48), color).save(path, 'JPEG')
+        return path
+
+    def test_pdf_manifest_lists_real_dates_and_photos_oldest_first(self):
+        newest = self.photo("newest.jpg", "red")
+        older = [self.photo("older_1.jpg", "green"), self.photo("older_2.jpg", "blue")]
+        entries = [
+            {"full_date": "Mar 12th 25", "day_count": "Day 12", "images": [{"url": "n", "local_path": newest}]},
+            {"full_date": "Mar 2nd 25", "day_count": "Day 2", "images": []},
+            {"full_date": "Mar 5th 25", "day_count": "Day 5",
+             "images": [{"url": "o1", "local_path": older[0]}, {"url": "o2", "local_path": older[1]}]},
+        ]
+        with mock.patch('src.pdf_generator.HTML', FakeHTML):
+            pdf = generate_pdf("T", entries, {}, output_dir=self.tmp.name, filename="grow.pdf")
+        self.assertTrue(os.path.exists(manifest_path_for(pdf)))
+
+        manifest = load_manifest(pdf)
+        self.assertEqual([e["date"] for e in manifest["entries"]], ["Mar 2nd 25", "Mar 5th 25", "Mar 12th 25"])
+        self.assertEqual(manifest["entries"][1]["photos"], older)
+
+        images, dates = load_images_and_dates_from_manifest(manifest)
+        self.assertEqual(dates, ["Mar 5th 25", "Mar 5th 25", "Mar 12th 25"])
+        self.assertEqual(images[2].getpixel((0, 0))[0] > 200, True)
+
+        # Une photo purgée du cache rend le manifest périmé : pas de vidéo à trous
+        os.remove(older[1])
+        with self.assertLogs('manifest', 'WARNING') as logs:
+            self.assertIsNone(manifest_photos(manifest))
+        self.assertIn("1 of 3 photos missing", logs.output[0])
+        with self.assertLogs('manifest', 'WARNING'):
+            self.assertEqual(load_images_and_dates_from_manifest(manifest), ([], []))
+
+    def test_missing_manifest(self):
+        self.assertIsNone(load_manifest(os.path.join(self.tmp.name, "none.pdf")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for the Prometheus text exposition of pipeline metrics.
+"""
+import unittest
+
+from src.metrics import Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge_exposition(self):
+        photos = self.registry.counter('photos_total', 'Photos fetched', ('result',))
+        in_flight = self.registry.gauge('in_flight', 'Running stages')
+        photos.inc(3, result="ok")
+        photos.inc(result='fa"iled')
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        text = self.registry.render()
+        self.assertIn('# TYPE photos_total counter\n', text)
+        self.assertIn('photos_total{result="ok"} 3\n', text)
+        self.assertIn('photos_total{result="fa\\"iled"} 1\n', text)
+        self.assertIn('in_flight 1\n', text)
+        with self.assertRaises(ValueError):
+            photos.inc(-1, result="ok")
+        with self.assertRaises(ValueError):
+            photos.inc(stage="scroll")
+
+    def test_histogram_buckets_are_cumulative(self):
+        seconds = self.registry.histogram('stage_seconds', 'Stage durations', ('stage',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            seconds.observe(value, stage="scroll")
+        lines = self.registry.render().splitlines()
+        self.assertIn('stage_seconds_bucket{stage="scroll",le="0.1"} 1', lines)
+        self.assertIn('stage_seconds_bucket{stage="scroll",le="1"} 3', lines)
+        self.assertIn('stage_seconds_bucket{stage="scroll",le="+Inf"} 4', lines)
+        self.assertIn('stage_seconds_sum{stage="scroll"} 4.25', lines)
+        self.assertIn('stage_seconds_count{stage="scroll"} 4', lines)
+
+    def test_drain_and_merge(self):
+        def metrics(registry):
+            return (registry.counter('pages_total', 'Pages'),
+                    registry.histogram('seconds', 'Durations', buckets=(1,)),
+                    registry.gauge('in_flight', 'Running'))
+
+        worker = Registry()
+        worker_pages, worker_seconds, worker_in_flight = metrics(worker)
+        pages, seconds, in_flight = metrics(self.registry)
+        worker_pages.inc(4)
+        worker_seconds.observe(0.5)
+        worker_in_flight.inc()
+        pages.inc(1)
+
+        self.registry.merge(worker.drain())
+
+        self.assertEqual(pages.value(), 5)
+        self.assertEqual(seconds.count(), 1)
+        self.assertEqual(in_flight.value(), 0)
+        self.assertEqual(worker_pages.value(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
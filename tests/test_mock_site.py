@@ -0,0 +1,66 @@
+"""
+Tests for the mock GrowWithJane site used by the load tests.
+"""
+import io
+import tempfile
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from PIL import Image
+
+from benchmarks.load_test import percentile
+from benchmarks.mock_site import MockGrowlogSite
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.photo_cache import PhotoCache
+from src.testid_index import make_soup
+
+
+class TestMockSite(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.site = MockGrowlogSite(cards=25, photos_per_card=2, stage_changes=3, page_size=10, latency=0,
+                                    photo_latency=0, photo_size=(64, 48))
+        self.client = TestClient(TestServer(self.site.app()))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_scrolling_loads_the_whole_timeline(self):
+        response = await self.client.get('/growlogs/abc')
+        page = await response.text()
+        self.assertEqual(page.count('data-testid="growlog-page-timeline-card"')
+                         + page.count('data-testid="growlog-page-timeline-stage-change"'), 10)
+        self.assertIn("/growlogs/abc/items?cards=25", page)
+
+        fragments, offset = [], "10"
+        while offset:
+            response = await self.client.get(f'/growlogs/abc/items?cards=25&offset={offset}')
+            fragments.append(await response.text())
+            offset = response.headers.get('X-Next-Offset')
+        # Page complète : ce que le navigateur obtient après le défilement
+        full_page = page.replace('</section>', "".join(fragments) + '</section>')
+        with tempfile.TemporaryDirectory() as tmp:
+            scraper = GrowWithJaneScraper(photo_cache=PhotoCache(tmp))
+            growlog_data, card_photo_urls, _ = scraper._parse_growlog(make_soup(full_page), 'url')
+        self.assertEqual(len(growlog_data["timeline"]), 25)
+        self.assertEqual(len(growlog_data["stage_changes"]), 3)
+        self.assertTrue(card_photo_urls[0][0].startswith(f"http://{self.client.host}:{self.client.port}/photos/abc/"))
+
+    async def test_photo_cdn_serves_jpegs_with_etag(self):
+        response = await self.client.get('/photos/abc/00001_0.jpg')
+        self.assertEqual(response.content_type, 'image/jpeg')
+        self.assertEqual(Image.open(io.BytesIO(await response.read())).size, (64, 48))
+        etag = response.headers['ETag']
+        response = await self.client.get('/photos/abc/00001_0.jpg', headers={'If-None-Match': etag})
+        self.assertEqual(response.status, 304)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+        self.assertIsNone(percentile([], 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
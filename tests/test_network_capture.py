@@ -0,0 +1,83 @@
+"""
+Tests for the JSON (network) extraction engine, checked against the DOM
+parser on the same synthetic growlog.
+"""
+import tempfile
+import unittest
+
+from benchmarks.fixtures import generate_growlog_html, generate_growlog_payloads
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.network_capture import build_growlog_data, format_display_date, missing_rendered_items
+from src.photo_cache import PhotoCache
+from src.testid_index import make_soup
+
+
+class FakeCapture:
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.bytes = 0
+
+
+def rendered_items(growlog_data, card_photo_urls):
+    """Ce que `RENDERED_ITEMS_JS` retournerait pour la page du parseur DOM"""
+    return {
+        "cards": [[event["date"], len(urls)] for event, urls in zip(growlog_data["timeline"], card_photo_urls)],
+        "stage_changes": [sc["date"] for sc in growlog_data["stage_changes"]],
+    }
+
+
+class TestNetworkCapture(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.scraper = GrowWithJaneScraper(photo_cache=PhotoCache(tmp.name))
+        self.url = "https://growithjane.com/growlog/synthetic"
+
+    def parse_dom(self, **kwargs):
+        return self.scraper._parse_growlog(make_soup(generate_growlog_html(**kwargs)), self.url)
+
+    def test_matches_dom_parser(self):
+        for kwargs in ({"cards": 3, "stage_changes": 2}, {"cards": 45, "stage_changes": 7, "photos_per_card": 2}):
+            with self.subTest(**kwargs):
+                dom, dom_photos, _ = self.parse_dom(**kwargs)
+                network = build_growlog_data(generate_growlog_payloads(page_size=20, **kwargs), self.url)
+                network_photos = [event.pop("photo_urls") for event in network["timeline"]]
+                self.assertEqual(network_photos, dom_photos)
+                for key in ("title", "strain", "growing_stage", "environment", "stages", "timeline",
+                            "stage_changes"):
+                    self.assertEqual(network[key], dom[key], key)
+
+    def test_parse_captured_accepts_matching_payloads(self):
+        dom, dom_photos, _ = self.parse_dom(cards=30, stage_changes=3)
+        parsed = self.scraper._parse_captured(FakeCapture(generate_growlog_payloads(cards=30, stage_changes=3)),
+                                              self.url, rendered_items(dom, dom_photos))
+        self.assertIsNotNone(parsed)
+        self.assertEqual(parsed[1], dom_photos)
+
+    def test_falls_back_on_wrong_mapping(self):
+        dom, dom_photos, _ = self.parse_dom(cards=10, stage_changes=2)
+        rendered = rendered_items(dom, dom_photos)
+        payloads = generate_growlog_payloads(cards=10, stage_changes=2)
+        # Dates remplacées par un nombre de jours : les dates ne correspondent plus
+        for item in payloads[0][1]["growlog"]["timeline"]:
+            item["day"] = item.pop("date").count("-")
+        self.assertIsNone(self.scraper._parse_captured(FakeCapture(payloads), self.url, rendered))
+        # Une erreur du mapping ne fait pas échouer le scraping
+        self.assertIsNone(self.scraper._parse_captured(FakeCapture([("x", {"timeline": [None, 1]}), None]),
+                                                       self.url, rendered))
+
+    def test_missing_rendered_items(self):
+        growlog_data = {"timeline": [{"date": "Jan 1st 25", "photo_urls": ["a"]}], "stage_changes": []}
+        self.assertEqual(missing_rendered_items(growlog_data, {"cards": [["Jan 1st 25", 1]], "stage_changes": []}), 0)
+        self.assertEqual(missing_rendered_items(growlog_data, {"cards": [["Jan 1st 25", 2]],
+                                                               "stage_changes": ["Jan 1st 25"]}), 2)
+
+    def test_format_display_date(self):
+        self.assertEqual(format_display_date("2025-03-05T10:00:00Z"), "Mar 5th 25")
+        self.assertEqual(format_display_date(1741176000000), "Mar 5th 25")
+        self.assertEqual(format_display_date(10 ** 20), str(10 ** 20))
+        self.assertEqual(format_display_date("Day 12"), "Day 12")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the photo cache module.
+"""
+import os
+import tempfile
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from src.photo_cache import PhotoCache
+
+
+class TestPhotoCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+
+        async def photo(request):
+            self.requests.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            return web.Response(body=b"jpeg" * 256, headers={"ETag": '"v1"'})
+
+        app = web.Application()
+        app.router.add_get("/{name}", photo)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base = f"http://127.0.0.1:{port}"
+        self.tmp = tempfile.TemporaryDirectory()
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+        self.tmp.cleanup()
+
+    async def test_same_url_maps_to_same_file(self):
+        cache = PhotoCache(self.tmp.name)
+        async with aiohttp.ClientSession() as session:
+            first = await cache.fetch(f"{self.base}/a.jpg", session)
+            second = await cache.fetch(f"{self.base}/a.jpg", session)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(cache.stats["hits"], 1)
+
+    async def test_stale_entry_is_revalidated_with_etag(self):
+        cache = PhotoCache(self.tmp.name, fresh_for=0)
+        async with aiohttp.ClientSession() as session:
+            await cache.fetch(f"{self.base}/a.jpg", session)
+            await cache.fetch(f"{self.base}/a.jpg", session)
+        self.assertEqual(self.requests[1].headers.get("If-None-Match"), '"v1"')
+        self.assertEqual(cache.stats["revalidated"], 1)
+        self.assertEqual(cache.stats["downloads"], 1)
+
+    async def test_evict_respects_budget_and_keeps_pinned(self):
+        cache = PhotoCache(self.tmp.name, max_bytes=1024)
+        async with aiohttp.ClientSession() as session:
+            paths = [await cache.fetch(f"{self.base}/{i}.jpg", session) for i in range(3)]
+        for age, path in enumerate(reversed(paths)):
+            os.utime(path, (1000 - age, 1000 - age))
+        cache.evict(keep=[paths[0]])
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertEqual(cache.usage()["files"], 1)
+        self.assertFalse(any(name.startswith(".tmp-") for name in os.listdir(self.tmp.name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for the content-hash keyed PDF render cache.
+"""
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.pdf_generator import generate_pdf
+from src.render_cache import RenderCache, render_key
+
+
+class FakeHTML:
+    renders = 0
+
+    def __init__(self, string, base_url=None):
+        self.string = string
+
+    pages = [None]
+
+    def render(self):
+        return self
+
+    def write_pdf(self, path):
+        FakeHTML.renders += 1
+        with open(path, 'wb') as f:
+            f.write(b"%PDF-" + self.string.encode('utf-8')[:64])
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.photo = os.path.join(self.tmp.name, "photo.jpg")
+        with open(self.photo, 'wb') as f:
+            f.write(b"jpeg-1")
+        FakeHTML.renders = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entries(self):
+        return [{"full_date": "Mar 5th 25", "images": [{"url": "u", "local_path": self.photo}]}]
+
+    def test_key_covers_image_content_and_template(self):
+        key = render_key("T", self.entries(), {}, b"<html>")
+        self.assertEqual(key, render_key("T", self.entries(), {}, b"<html>"))
+        self.assertNotEqual(key, render_key("T", self.entries(), {}, b"<html> "))
+        time.sleep(0.01)
+        with open(self.photo, 'wb') as f:
+            f.write(b"jpeg-2")
+        self.assertNotEqual(key, render_key("T", self.entries(), {}, b"<html>"))
+
+    def test_generate_pdf_renders_once(self):
+        cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+        out = os.path.join(self.tmp.name, "out")
+        with mock.patch('src.pdf_generator.HTML', FakeHTML):
+            first = generate_pdf("T", self.entries(), {}, output_dir=out, filename="a.pdf", cache=cache)
+            second = generate_pdf("T", self.entries(), {}, output_dir=out, filename="b.pdf", cache=cache)
+        self.assertEqual(FakeHTML.renders, 1)
+        with open(first, 'rb') as a, open(second, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(cache.usage()["files"], 1)
+
+    def test_evicts_by_age_then_size(self):
+        cache = RenderCache(os.path.join(self.tmp.name, "cache"), max_bytes=250, max_age=3600)
+        for i, age in enumerate((7200, 30, 20, 10)):
+            source = os.path.join(self.tmp.name, f"{i}.pdf")
+            with open(source, 'wb') as f:
+                f.write(b"x" * 100)
+            cache.store(f"key{i}", source)
+            mtime = time.time() - age
+            os.utime(os.path.join(cache.cache_dir, f"key{i}.pdf"), (mtime, mtime))
+        cache.evict()
+        remaining = sorted(os.listdir(cache.cache_dir))
+        self.assertEqual(remaining, ["key2.pdf", "key3.pdf"])
+
+
+if __name__ == '__main__':
+    unittest.main()
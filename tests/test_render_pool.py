@@ -0,0 +1,85 @@
+"""
+Tests for the process pool used for PDF and video rendering.
+"""
+import asyncio
+import os
+import time
+import unittest
+
+from src.metrics import PDF_PAGES, STAGE_SECONDS, stage
+from src.render_pool import RenderPool, RenderPoolFull
+
+
+def slow_pid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def count_pages(pages):
+    with stage("pdf", "layout"):
+        PDF_PAGES.inc(pages)
+    return pages
+
+
+def fail():
+    raise ValueError("render failed")
+
+
+class TestRenderPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = RenderPool(max_workers=1, max_queue=1)
+
+    async def asyncTearDown(self):
+        self.pool.close()
+
+    async def test_runs_in_worker_process_and_reports_wait_time(self):
+        self.pool.acquire_timeout = 5
+        pids = await asyncio.gather(*(self.pool.run(slow_pid, 0.2) for _ in range(3)))
+        self.assertNotIn(os.getpid(), pids)
+        stats = self.pool.stats()
+        self.assertEqual(stats["completed"], 3)
+        self.assertEqual(stats["in_flight"], 0)
+        # Un seul worker : le dernier rendu a attendu les deux premiers
+        self.assertGreaterEqual(stats["wait_seconds_max"], 0.35)
+        self.assertGreaterEqual(stats["exec_seconds_total"], 0.6)
+        self.assertEqual(stats["tasks"]["slow_pid"]["count"], 3)
+
+    async def test_full_pool_rejects_instead_of_waiting(self):
+        # Un worker et une place en file : le troisième rendu est refusé sans attendre
+        results = await asyncio.gather(*(self.pool.run(slow_pid, 0.3) for _ in range(3)), return_exceptions=True)
+        self.assertIsInstance(results[2], RenderPoolFull)
+        self.assertTrue(all(isinstance(pid, int) for pid in results[:2]))
+        stats = self.pool.stats()
+        self.assertEqual((stats["completed"], stats["rejected"], stats["failed"]), (2, 1, 0))
+        self.assertFalse(self.pool.full())
+
+    async def test_rejects_after_acquire_timeout(self):
+        self.pool.acquire_timeout = 0.1
+        first = [asyncio.create_task(self.pool.run(slow_pid, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertTrue(self.pool.full())
+        start = time.perf_counter()
+        with self.assertRaises(RenderPoolFull):
+            await self.pool.run(slow_pid, 0)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        await asyncio.gather(*first)
+        # Une place libre : le rendu suivant passe
+        self.assertIsInstance(await self.pool.run(slow_pid, 0), int)
+
+    async def test_worker_exceptions_are_raised_to_caller(self):
+        with self.assertRaises(ValueError):
+            await self.pool.run(fail)
+        self.assertEqual(self.pool.stats()["failed"], 1)
+
+    async def test_worker_metrics_are_merged_into_parent(self):
+        pages_before = PDF_PAGES.value()
+        layouts_before = STAGE_SECONDS.count(pipeline="pdf", stage="layout")
+        await self.pool.run(count_pages, 3)
+        await self.pool.run(count_pages, 2)
+        self.assertEqual(PDF_PAGES.value() - pages_before, 5)
+        self.assertEqual(STAGE_SECONDS.count(pipeline="pdf", stage="layout") - layouts_before, 2)
+        self.assertEqual(STAGE_SECONDS.count(pipeline="render_pool", stage="count_pages"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for the request filter installed on scraping sessions.
+"""
+import unittest
+
+from src.request_blocking import DEFAULT_ESTIMATED_BYTES, RequestBlocker
+
+# (type de ressource, URL, catégorie de blocage attendue ou None)
+CASES = [
+    ("document", "https://growithjane.com/growlog/abc", None),
+    ("script", "https://growithjane.com/_next/static/chunks/main.js", None),
+    ("xhr", "https://growithjane.com/api/growlogs/abc", None),
+    ("fetch", "https://api.growithjane.com/v1/timeline?page=2", None),
+    ("stylesheet", "https://growithjane.com/_next/static/css/app.css", None),
+    # Photos du growlog bloquées aussi : le scraper les télécharge lui-même
+    ("image", "https://growithjane.com/images/photo.jpg", "image"),
+    ("image", "https://cdn.growithjane.com/photos/00001_0_thumb@480_.jpg", "image"),
+    ("font", "https://growithjane.com/_next/static/media/inter.woff2", "font"),
+    ("image", "data:image/png;base64,iVBORw0KGgo=", None),
+    ("image", "https://images.example.com/ad.png", "image"),
+    ("font", "https://fonts.gstatic.com/s/inter.woff2", "font"),
+    ("media", "https://videos.example.com/intro.mp4", "media"),
+    ("script", "https://www.googletagmanager.com/gtag/js?id=G-1", "tracker"),
+    ("xhr", "https://region1.google-analytics.com/g/collect", "tracker"),
+    ("script", "https://static.hotjar.com/c/hotjar.js", "tracker"),
+    ("image", "https://connect.facebook.com/tr?id=1", "image"),
+    # Un domaine qui se termine comme un tracker sans en être un sous-domaine
+    ("script", "https://notsentry.io/app.js", None),
+    ("script", "https://growithjane.com.evil.example/x.js", None),
+]
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url, timing=None):
+        self.resource_type = resource_type
+        self.url = url
+        self.timing = timing
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+
+class FakeResponse:
+    def __init__(self, length):
+        self.headers = {"content-length": str(length)}
+
+
+class TestRequestBlocker(unittest.IsolatedAsyncioTestCase):
+    def test_classification(self):
+        blocker = RequestBlocker()
+        for resource_type, url, expected in CASES:
+            with self.subTest(resource_type=resource_type, url=url):
+                self.assertEqual(blocker.should_block(resource_type, url), expected)
+
+    def test_custom_lists(self):
+        blocker = RequestBlocker(resource_types=("font",), tracker_domains=("example.com",),
+                                 allowed_domains=("cdn.example.com",))
+        self.assertIsNone(blocker.should_block("image", "https://images.example.org/a.png"))
+        # La liste autorisée ne protège que de la règle des trackers
+        self.assertEqual(blocker.should_block("font", "https://cdn.example.com/a.woff2"), "font")
+        self.assertIsNone(blocker.should_block("script", "https://cdn.example.com/app.js"))
+        self.assertEqual(blocker.should_block("script", "https://stats.example.com/t.js"), "tracker")
+        self.assertIsNone(blocker.should_block("script", "https://www.googletagmanager.com/gtag/js"))
+
+    async def test_report(self):
+        blocker = RequestBlocker()
+        routes = [FakeRoute(resource_type, url) for resource_type, url, _ in CASES]
+        for route in routes:
+            await blocker._handle_route(route)
+        for route, (_, _, expected) in zip(routes, CASES):
+            self.assertEqual(route.outcome, "continued" if expected is None else "aborted", route.request.url)
+
+        blocker._on_response(FakeResponse(200_000))
+        blocker._on_request_finished(FakeRequest("document", "https://growithjane.com/", {"responseEnd": 500}))
+        report = blocker.report()
+        self.assertEqual(report["blocked"], {"image": 4, "font": 2, "media": 1, "tracker": 3})
+        self.assertEqual(report["blocked_total"], 10)
+        self.assertEqual(report["loaded_requests"], 1)
+        self.assertEqual(report["loaded_bytes"], 200_000)
+        expected_bytes = (4 * DEFAULT_ESTIMATED_BYTES["image"] + 2 * DEFAULT_ESTIMATED_BYTES["font"]
+                          + DEFAULT_ESTIMATED_BYTES["media"] + 2 * DEFAULT_ESTIMATED_BYTES["script"] + 10_000)
+        self.assertEqual(report["estimated_bytes_saved"], expected_bytes)
+        # 200 ko en 0,5 s : 400 ko/s
+        self.assertAlmostEqual(report["estimated_seconds_saved"], expected_bytes / 400_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the output directory retention manager.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from src.artifacts import ArtifactStore
+from src.retention import RetentionManager, RetentionPolicy
+
+
+def write(path, size, age=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestRetentionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def manager(self, max_bytes=10 ** 9, max_age=10 ** 9, unit="file", cleanup=None, grace=0):
+        policy = RetentionPolicy("test", self.root, max_bytes=max_bytes, max_age=max_age, unit=unit, cleanup=cleanup)
+        return RetentionManager([policy], grace=grace)
+
+    def test_evicts_least_recently_used_until_under_budget(self):
+        old = write(os.path.join(self.root, "a.pdf"), 100, age=300)
+        old_manifest = write(os.path.join(self.root, "a.manifest.json"), 10, age=300)
+        middle = write(os.path.join(self.root, "b.pdf"), 100, age=200)
+        new = write(os.path.join(self.root, "c.pdf"), 100, age=100)
+
+        result = self.manager(max_bytes=250).sweep()
+
+        self.assertFalse(os.path.exists(old))
+        self.assertFalse(os.path.exists(old_manifest))
+        self.assertTrue(os.path.exists(middle))
+        self.assertTrue(os.path.exists(new))
+        self.assertEqual(result["removed"], 1)
+        self.assertEqual(result["freed_bytes"], 110)
+
+    def test_evicts_expired_entries(self):
+        expired = write(os.path.join(self.root, "a.pdf"), 10, age=3600)
+        recent = write(os.path.join(self.root, "b.pdf"), 10, age=60)
+        self.manager(max_age=600).sweep()
+        self.assertFalse(os.path.exists(expired))
+        self.assertTrue(os.path.exists(recent))
+
+    def test_skips_held_and_recent_entries(self):
+        held = write(os.path.join(self.root, "a.pdf"), 100, age=3600)
+        recent = write(os.path.join(self.root, "b.pdf"), 100, age=10)
+        manager = self.manager(max_bytes=0, grace=60)
+        with manager.hold(held):
+            manager.sweep()
+            self.assertTrue(os.path.exists(held))
+        self.assertTrue(os.path.exists(recent))
+        manager.sweep()
+        self.assertFalse(os.path.exists(held))
+
+    def test_mark_used_refreshes_lru_order(self):
+        first = write(os.path.join(self.root, "a.pdf"), 100, age=300)
+        second = write(os.path.join(self.root, "b.pdf"), 100, age=200)
+        manager = self.manager(max_bytes=150)
+        manager.mark_used(first)
+        manager.sweep()
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+
+    def test_dir_unit_uses_newest_file(self):
+        write(os.path.join(self.root, "old", "photo_1.jpg"), 10, age=3600)
+        write(os.path.join(self.root, "active", "photo_1.jpg"), 10, age=3600)
+        write(os.path.join(self.root, "active", "photo_2.jpg"), 10, age=10)
+        self.manager(max_age=600, unit="dir").sweep()
+        self.assertFalse(os.path.exists(os.path.join(self.root, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "active")))
+
+    def test_ignores_temporary_files_and_subdirectories(self):
+        tmp_file = write(os.path.join(self.root, ".tmp-123-a.pdf"), 100, age=3600)
+        nested = write(os.path.join(self.root, "derived", "a.jpg"), 100, age=3600)
+        self.manager(max_bytes=0, max_age=0).sweep()
+        self.assertTrue(os.path.exists(tmp_file))
+        self.assertTrue(os.path.exists(nested))
+
+    def test_cleanup_prunes_dangling_aliases(self):
+        store = ArtifactStore(self.root)
+        source = write(os.path.join(self.root, "..", os.path.basename(self.root) + "-growlog.pdf"), 100)
+        artifact = store.publish(source, "growlog.pdf")
+        old = time.time() - 3600
+        os.utime(artifact, (old, old))
+
+        self.manager(max_age=600, cleanup=store.prune_aliases).sweep()
+
+        self.assertFalse(os.path.exists(artifact))
+        self.assertEqual(os.listdir(store.alias_dir), [])
+
+    def test_stats(self):
+        write(os.path.join(self.root, "a.pdf"), 100, age=300)
+        write(os.path.join(self.root, "a.manifest.json"), 20, age=300)
+        write(os.path.join(self.root, "b.pdf"), 50, age=10)
+        manager = self.manager(max_bytes=1000)
+        usage = manager.stats()["classes"]["test"]
+        self.assertEqual(usage["entries"], 2)
+        self.assertEqual(usage["bytes"], 170)
+        self.assertEqual(usage["max_bytes"], 1000)
+        self.assertGreaterEqual(usage["oldest_seconds"], 299)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,24 +1,114 @@
 """
-Tests for the scraper module.
+Tests for the scraper modules, on synthetic growlog pages.
 """
+import asyncio
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-from src.scraper import configure_driver, extract_plant_state
+from datetime import date
+
+from benchmarks.fixtures import display_date, generate_growlog_html
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.pdf_generator import growlog_to_report
+from src.photo_cache import PhotoCache
+from src.scraper import DEFAULT_ENVIRONMENT, build_metadata, clean_plant_state
+from src.testid_index import make_soup
+
 
 class TestScraper(unittest.TestCase):
-    @patch('selenium.webdriver.Chrome')
-    def test_configure_driver(self, mock_chrome):
-        """Test driver configuration."""
-        driver = configure_driver("/path/to/chromedriver")
-        self.assertTrue(mock_chrome.called)
-    
-    def test_extract_plant_state(self):
-        """Test plant state extraction."""
-        mock_entry = MagicMock()
-        mock_entry.find_element.return_value.get_attribute.return_value = "icon-seedling"
-        
-        state = extract_plant_state(mock_entry)
-        self.assertEqual(state, "seedling")
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.scraper = GrowWithJaneScraper(photo_cache=PhotoCache(os.path.join(self.tmp, "photos")))
+
+    def test_photo_dir_follows_output_dir(self):
+        """Sans cache fourni, les photos vont dans `output_dir`/photos, créé au premier usage."""
+        scraper = GrowWithJaneScraper(output_dir=os.path.join(self.tmp, "out"))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "out")))
+        self.assertEqual(scraper.photo_cache.cache_dir, os.path.join(self.tmp, "out", "photos"))
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, "out", "photos")))
+
+    def test_clean_plant_state(self):
+        """Les classes CSS sont retirées de l'état de la plante."""
+        self.assertEqual(clean_plant_state("seedling text-2xl"), "seedling")
+        self.assertEqual(clean_plant_state(""), "Unknown")
+
+    def test_build_metadata_defaults(self):
+        """Sans souche ni environnement, les valeurs par défaut sont utilisées."""
+        metadata = build_metadata({"strain": None, "stages": [], "environment": {}})
+        self.assertEqual(metadata["strain"]["name"], "Unknown strain")
+        self.assertEqual(metadata["environment"], DEFAULT_ENVIRONMENT)
+
+    def test_parse_growlog(self):
+        """Cartes, photos et changements de stade de la page synthétique."""
+        html = generate_growlog_html(cards=12, photos_per_card=2, stage_changes=7)
+        growlog_data, card_photo_urls, main_photo_urls = self.scraper._parse_growlog(make_soup(html), 'url')
+        self.assertEqual(growlog_data["title"], "Synthetic Growlog")
+        self.assertEqual(len(growlog_data["timeline"]), 12)
+        self.assertEqual(len(growlog_data["stage_changes"]), 7)
+        self.assertEqual(len(growlog_data["stages"]), 7)
+        self.assertTrue(all(len(urls) == 2 for urls in card_photo_urls))
+        self.assertEqual(len(main_photo_urls), 1)
+
+    def test_report_assigns_stage_to_entries(self):
+        """La conversion pour `/generate` attribue à chaque entrée le dernier stade atteint."""
+        html = generate_growlog_html(cards=10, photos_per_card=1, stage_changes=2)
+        growlog_data, _, _ = self.scraper._parse_growlog(make_soup(html), 'url')
+        title, entries, metadata = growlog_to_report(growlog_data)
+        self.assertEqual(len(entries), 10)
+        # Timeline du plus récent au plus ancien : changement de stade au 6e jour
+        states = {entry["full_date"]: entry["plant_state"] for entry in entries}
+        self.assertEqual(states[display_date(date(2025, 1, 1))], "germination")
+        self.assertEqual(states[display_date(date(2025, 1, 10))], "seedling")
+        self.assertEqual(metadata["strain"]["name"], "Synthetic Kush")
+
+
+
+class StubPhotoCache:
+    """Cache de photos sans réseau : chemin dérivé de l'URL, échec pour les URLs de `failing`"""
+
+    def __init__(self):
+        self.failing = set()
+        self.stats = {}
+        self.fetched = []
+
+    async def fetch(self, url, session):
+        self.fetched.append(url)
+        # Ordre de fin des téléchargements différent de l'ordre des URLs
+        await asyncio.sleep(0.001 * (hash(url) % 5))
+        if url in self.failing:
+            raise OSError("HTTP 500")
+        return "/photos/" + url.rsplit("/", 1)[-1]
+
+    def evict(self, keep=()):
+        pass
+
+
+class TestPhotoDownloads(unittest.IsolatedAsyncioTestCase):
+    async def test_photos_map_back_to_their_cards_despite_a_failure(self):
+        html = generate_growlog_html(cards=6, photos_per_card=3, stage_changes=1)
+        cache = StubPhotoCache()
+        scraper = GrowWithJaneScraper(max_concurrent_downloads=4, photo_cache=cache)
+        growlog_data, card_photo_urls, main_photo_urls = scraper._parse_growlog(make_soup(html), 'url')
+        failed = card_photo_urls[2][1]
+        cache.failing.add(failed)
+        growlog_data["pending_photos"] = {"url": "url", "cards": card_photo_urls, "main": main_photo_urls,
+                                          "head_keys": [], "card_keys": [], "stage_keys": []}
+
+        failures = await scraper.download_growlog_photos(growlog_data)
+
+        self.assertEqual(failures, [{"url": failed, "error": "HTTP 500"}])
+        self.assertEqual(growlog_data["photo_errors"], failures)
+        for event, urls in zip(growlog_data["timeline"], card_photo_urls):
+            expected = [url for url in urls if url != failed]
+            self.assertEqual([photo["url"] for photo in event["photos"]], expected)
+            self.assertEqual([photo["local_path"] for photo in event["photos"]],
+                             ["/photos/" + url.rsplit("/", 1)[-1] for url in expected])
+        self.assertEqual([photo["url"] for photo in growlog_data["photos"]], main_photo_urls)
+        # Chaque URL n'est demandée qu'une fois
+        self.assertEqual(len(cache.fetched), 6 * 3 + 1)
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Tests for the end-of-timeline detection.
+"""
+import unittest
+
+from src.scrolling import scroll_to_end
+
+
+class FakePage:
+    """Page whose timeline grows by 10 items per scroll until `total` is reached."""
+
+    def __init__(self, total, batch=10):
+        self.total = total
+        self.batch = batch
+        self.loaded = batch
+        self.scrolls = 0
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    async def evaluate(self, expression, arg=None):
+        if expression.startswith("window.scrollTo"):
+            self.scrolls += 1
+            self.loaded = min(self.total, self.loaded + self.batch)
+            return None
+        return [self.loaded, self.loaded * 100]
+
+
+class TestScrollToEnd(unittest.IsolatedAsyncioTestCase):
+    async def test_stops_when_timeline_stops_growing(self):
+        page = FakePage(total=50)
+        stats = await scroll_to_end(page, quiet_time=0.05, poll_interval=0.01)
+        self.assertEqual(stats.items, 50)
+        self.assertEqual(stats.stop_reason, "network_idle")
+        self.assertEqual(stats.steps, 5)
+        self.assertLess(stats.duration, 1.0)
+        self.assertFalse(any(page.listeners.values()))
+
+    async def test_max_steps_budget(self):
+        page = FakePage(total=1000)
+        stats = await scroll_to_end(page, max_steps=3, quiet_time=0.05, poll_interval=0.01)
+        self.assertEqual(stats.steps, 3)
+        self.assertEqual(stats.stop_reason, "max_steps")
+
+    async def test_stop_condition(self):
+        page = FakePage(total=1000)
+
+        async def seen_enough(p):
+            return p.loaded >= 30
+
+        stats = await scroll_to_end(page, stop_condition=seen_enough, quiet_time=0.05, poll_interval=0.01)
+        self.assertEqual(stats.items, 30)
+        self.assertEqual(stats.stop_reason, "stop_condition")
+
+
+if __name__ == '__main__':
+    unittest.main()
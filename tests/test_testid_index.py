@@ -0,0 +1,43 @@
+"""
+Tests for the data-testid index used by the BeautifulSoup extractor.
+"""
+import tempfile
+import unittest
+
+from benchmarks.fixtures import generate_growlog_html
+from src.grow_with_jane_scraper import GrowWithJaneScraper
+from src.photo_cache import PhotoCache
+from src.testid_index import DataTestIdIndex, SoupLookup, make_soup
+
+
+class TestDataTestIdIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.soup = make_soup(generate_growlog_html(cards=30, photos_per_card=2, stage_changes=3))
+        cls.index = DataTestIdIndex.build(cls.soup)
+
+    def test_scopes_only_see_their_card(self):
+        cards = self.index.all('growlog-page-timeline-card', 'div')
+        self.assertEqual(len(cards), 30)
+        scope = self.index.scope(cards[0])
+        self.assertEqual(len(scope.all('growlog-page-timeline-photos-item')), 2)
+        self.assertIsNone(scope.first('growlog-page-timeline-stage-change-date'))
+
+    def test_same_result_as_soup_searches(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        scraper = GrowWithJaneScraper(photo_cache=PhotoCache(tmp.name))
+        indexed = scraper._parse_growlog(self.soup, 'url', index=self.index)
+        searched = scraper._parse_growlog(self.soup, 'url', index=SoupLookup(self.soup))
+        self.assertEqual(indexed, searched)
+        growlog_data, card_photo_urls, main_photo_urls = indexed
+        self.assertEqual(len(growlog_data["timeline"]), 30)
+        self.assertEqual(len(growlog_data["stage_changes"]), 3)
+        self.assertEqual(growlog_data["environment"]["Medium"], "Coco")
+        self.assertEqual(growlog_data["strain"], "Synthetic Kush")
+        self.assertEqual(len(card_photo_urls[0]), 2)
+        self.assertEqual(len(main_photo_urls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+"""
+Tests for video generation: frame preparation, profiles and the streaming encoder.
+"""
+import io
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import fitz
+import imageio_ffmpeg
+import numpy as np
+from PIL import Image
+
+from src import video_generator
+from src.manifest import load_manifest, write_manifest
+from src.video_generator import (
+    frame_size, generate_video, images_to_video, iter_images_and_dates_from_pdf, manifest_frames, prepare_frames,
+)
+from src.video_profiles import get_video_profile
+
+
+def count_frames(path):
+    frames = imageio_ffmpeg.read_frames(path)
+    size = next(frames)["size"]
+    return sum(1 for _ in frames), size
+
+
+class TestImagesToVideo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_per_image_durations_from_a_generator(self):
+        images = (Image.new('RGB', size, (40 * i, 80, 0)) for i, size in enumerate([(641, 480), (480, 640), (300, 300)]))
+        output = os.path.join(self.tmp.name, "growlog.mp4")
+        images_to_video(images, output, fps=2, durations=[2, 0.5, 3])
+
+        frames, size = count_frames(output)
+        self.assertEqual(frames, 11)
+        # Plus grande largeur et hauteur, arrondies au pair
+        self.assertEqual(size, (642, 640))
+        # Aucun fichier temporaire ne reste à côté de la vidéo
+        self.assertEqual(os.listdir(self.tmp.name), ["growlog.mp4"])
+
+    def test_uniform_duration_from_files(self):
+        paths = []
+        for i in range(2):
+            path = os.path.join(self.tmp.name, f"{i}.jpg")
+            Image.new('RGB', (320, 240), (0, 0, 200)).save(path)
+            paths.append(path)
+        self.assertEqual(frame_size(paths), (320, 240))
+
+        output = os.path.join(self.tmp.name, "uniform.mp4")
+        images_to_video(paths, output, duration=2, fps=1)
+        self.assertEqual(count_frames(output)[0], 4)
+
+    def test_long_videos_are_capped(self):
+        path = os.path.join(self.tmp.name, "only.jpg")
+        Image.new('RGB', (64, 64)).save(path)
+        with mock.patch.object(video_generator, 'encode_video') as encode:
+            images_to_video([path] * 100, os.path.join(self.tmp.name, "x.mp4"), duration=5)
+        durations = encode.call_args.args[1]
+        self.assertEqual(durations, [int(video_generator.MAX_VIDEO_SECONDS / 100)] * 100)
+        self.assertLessEqual(sum(durations), video_generator.MAX_VIDEO_SECONDS)
+
+    def test_durations_must_match_images(self):
+        path = os.path.join(self.tmp.name, "only.jpg")
+        Image.new('RGB', (64, 64)).save(path)
+        with self.assertRaises(ValueError):
+            images_to_video([path], os.path.join(self.tmp.name, "x.mp4"), durations=[1, 2])
+
+
+class TestPrepareFrames(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_order_is_preserved_and_unreadable_sources_skipped(self):
+        sources = []
+        for i in range(12):
+            path = os.path.join(self.tmp.name, f"src_{i}.jpg")
+            Image.new('RGB', (200 + 10 * i, 100), (i * 20, 0, 0)).save(path)
+            sources.append((path, f"Mar {i + 1}th 25"))
+        sources.insert(3, (os.path.join(self.tmp.name, "missing.jpg"), "Mar 30th 25"))
+        sources.append((Image.new('RGB', (4000, 1000)), "Apr 1st 25"))
+
+        out = os.path.join(self.tmp.name, "frames")
+        paths = prepare_frames(iter(sources), out, max_size=(1000, 1000), max_workers=3)
+
+        self.assertEqual(len(paths), 13)
+        widths = [Image.open(path).width for path in paths]
+        self.assertEqual(widths, [200 + 10 * i for i in range(12)] + [1000])
+        self.assertTrue(os.path.basename(paths[0]).startswith("photo_Mar_1th_25_000"))
+
+    def test_generate_video_without_keeping_frames(self):
+        photo = os.path.join(self.tmp.name, "photo.jpg")
+        Image.new('RGB', (320, 240)).save(photo)
+        pdf = os.path.join(self.tmp.name, "grow.pdf")
+        write_manifest(pdf, "Grow", [{"date": "Mar 5th 25", "day_count": "Day 5", "photos": [photo]}])
+
+        encoded = []
+        with mock.patch.object(video_generator, 'images_to_video',
+                               side_effect=lambda paths, *a, **kw: encoded.extend(os.path.exists(p) for p in paths)):
+            video = generate_video(pdf, "grow.mp4", keep_frames=False, output_dir=os.path.join(self.tmp.name, "output"))
+
+        self.assertEqual(encoded, [True])
+        self.assertEqual(video, os.path.join(self.tmp.name, "output", "grow.mp4"))
+        # Le dossier temporaire des images est supprimé après l'encodage
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "output")), [])
+
+
+class TestVideoProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        photos = []
+        for i, size in enumerate([(4000, 3000), (900, 1600)]):
+            path = os.path.join(self.tmp.name, f"photo_{i}.jpg")
+            Image.new('RGB', size, (200, 40 * i, 0)).save(path)
+            photos.append(path)
+        self.pdf = os.path.join(self.tmp.name, "grow.pdf")
+        write_manifest(self.pdf, "Grow", [{"date": "Mar 5th 25", "day_count": "Day 5", "photos": photos}])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profile_bounds_resolution_whatever_the_photo_size(self):
+        output_dir = os.path.join(self.tmp.name, "out")
+        video = generate_video(self.pdf, "grow.mp4", keep_frames=False, profile="720p", output_dir=output_dir)
+        frames, size = count_frames(video)
+        self.assertEqual(size, (1280, 720))
+        # 2 photos x 2 s à 2 images/s
+        self.assertEqual(frames, 8)
+
+    def test_square_profile_crops_to_fill_the_frame(self):
+        frames_dir = os.path.join(self.tmp.name, "frames")
+        paths = prepare_frames(manifest_frames(load_manifest(self.pdf)), frames_dir,
+                               max_size=get_video_profile("square-social").size, fit="crop")
+        for path in paths:
+            with Image.open(path) as img:
+                self.assertEqual(img.size, (1080, 1080))
+                # Recadré : pas de bande noire sur les bords
+                self.assertGreater(img.getpixel((5, 540))[0], 150)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            generate_video(self.pdf, "grow.mp4", profile="8k", output_dir=self.tmp.name)
+
+
+def jpeg_bytes(seed, quality=90, size=(400, 320)):
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, size[0], dtype=np.uint8)
+    pixels = np.repeat((gradient if seed % 2 else gradient[::-1])[None, :], size[1], axis=0)
+    pixels = np.stack([pixels, np.full_like(pixels, seed * 60), rng.integers(0, 255, pixels.shape, dtype=np.uint8)], -1)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class TestPdfImageExtraction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "growlog.pdf")
+        doc = fitz.open()
+        # Le PDF liste les entrées de la plus récente à la plus ancienne
+        newest, oldest = jpeg_bytes(1), jpeg_bytes(2)
+        page = doc.new_page()
+        page.insert_text((50, 40), "Mar 12th 25")
+        xref = page.insert_image(fitz.Rect(50, 50, 250, 210), stream=newest)
+        # Même xref affichée deux fois, puis même flux dans une autre xref
+        page.insert_image(fitz.Rect(50, 220, 250, 380), xref=xref)
+        page.insert_image(fitz.Rect(50, 390, 250, 550), stream=newest)
+        page.insert_image(fitz.Rect(300, 50, 340, 90), stream=jpeg_bytes(3, size=(64, 64)))
+        page = doc.new_page()
+        page.insert_text((50, 40), "Mar 5th 25")
+        page.insert_image(fitz.Rect(50, 50, 250, 210), stream=oldest)
+        # Quasi-doublon : même photo recompressée
+        page.insert_image(fitz.Rect(50, 220, 250, 380), stream=jpeg_bytes(2, quality=60))
+        doc.save(self.pdf_path)
+        doc.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_duplicates_are_dropped_before_decoding_and_images_are_lazy(self):
+        frames = iter_images_and_dates_from_pdf(self.pdf_path)
+        self.assertIsInstance(frames, types.GeneratorType)
+        dates = [date for _, date in frames]
+        # Le recompressé reste : seuls xref et flux identiques sont écartés
+        self.assertEqual(len(dates), 3)
+        self.assertEqual(dates[0], "Mar 5th 25")
+        self.assertEqual(dates[-1], "Mar 12th 25")
+
+    def test_stale_manifest_falls_back_to_the_pdf(self):
+        photo = os.path.join(self.tmp.name, "photo.jpg")
+        Image.new('RGB', (320, 240)).save(photo)
+        write_manifest(self.pdf_path, "Grow", [
+            {"date": "Mar 5th 25", "day_count": "Day 5", "photos": [photo, os.path.join(self.tmp.name, "purged.jpg")]},
+        ])
+        encoded = []
+        with mock.patch.object(video_generator, 'images_to_video',
+                               side_effect=lambda paths, *a, **kw: encoded.extend(paths)), \
+                self.assertLogs('manifest', 'WARNING'):
+            generate_video(self.pdf_path, "grow.mp4", keep_frames=False, output_dir=os.path.join(self.tmp.name, "out"))
+        # Les 3 photos du PDF, pas la seule photo restante du manifest
+        self.assertEqual(len(encoded), 3)
+
+    def test_near_duplicates(self):
+        frames = list(iter_images_and_dates_from_pdf(self.pdf_path, near_duplicate_distance=6))
+        self.assertEqual([date for _, date in frames], ["Mar 5th 25", "Mar 12th 25"])
+        self.assertTrue(all(img.size == (400, 320) for img, _ in frames))
+
+
+if __name__ == '__main__':
+    unittest.main()